@@ -11,14 +11,28 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Importer les modules
-from utils.database import init_db
+from utils.database import init_db, get_pool_stats, get_read_pool_stats
+from utils.local_store import init_local_store
+from utils.ids import init_ids
+from utils.security import init_security
+from utils.rate_limit import init_rate_limit
+from utils.cache import init_cache
+from utils.iban_index import init_iban_index
+from utils.serialization import init_serialization
+from utils.metrics import init_metrics
+from utils.slow_queries import init_slow_query_log
 from routes.auth import auth_bp
 from routes.accounts import accounts_bp
 from routes.transactions import transactions_bp
+from routes.dashboard import dashboard_bp
+from commands import register_commands
 
 # Initialiser l'application Flask
 app = Flask(__name__)
 
+# Sérialisation JSON des Decimal et dates renvoyés par MySQL
+init_serialization(app)
+
 # Configuration
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
@@ -28,6 +42,33 @@ app.config['MYSQL_PORT'] = int(os.getenv('MYSQL_PORT', '3306'))
 app.config['MYSQL_USER'] = os.getenv('MYSQL_USER', 'root')
 app.config['MYSQL_PASSWORD'] = os.getenv('MYSQL_PASSWORD', 'root')
 app.config['MYSQL_DATABASE'] = os.getenv('MYSQL_DATABASE', 'banking_system')
+app.config['MYSQL_POOL_SIZE'] = int(os.getenv('MYSQL_POOL_SIZE', '5'))  # 32 maximum (mysql-connector)
+app.config['MYSQL_POOL_TIMEOUT'] = float(os.getenv('MYSQL_POOL_TIMEOUT', '5'))  # secondes
+app.config['MYSQL_READ_HOST'] = os.getenv('MYSQL_READ_HOST', '')  # vide = pas de réplica
+app.config['MYSQL_READ_PORT'] = int(os.getenv('MYSQL_READ_PORT', os.getenv('MYSQL_PORT', '3306')))
+app.config['MYSQL_READ_USER'] = os.getenv('MYSQL_READ_USER', '')  # vide = MYSQL_USER
+app.config['MYSQL_READ_PASSWORD'] = os.getenv('MYSQL_READ_PASSWORD', '')  # vide = MYSQL_PASSWORD
+app.config['MYSQL_READ_POOL_SIZE'] = int(os.getenv('MYSQL_READ_POOL_SIZE', '0'))  # 0 = MYSQL_POOL_SIZE
+app.config['READ_YOUR_WRITES_SECONDS'] = float(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
+app.config['LOCAL_STORE_PATH'] = os.getenv('LOCAL_STORE_PATH', '')  # vide = répertoire temporaire
+app.config['ID_NODE'] = int(os.getenv('ID_NODE', '0'))  # 0 à 31, distinct par machine (utils/ids.py)
+app.config['MYSQL_PREPARED_STATEMENTS'] = os.getenv('MYSQL_PREPARED_STATEMENTS', 'True').lower() in ('1', 'true', 'yes', 'on')
+app.config['MYSQL_PREPARED_MAX'] = int(os.getenv('MYSQL_PREPARED_MAX', '32'))  # par connexion
+app.config['ASYNC_MYSQL_POOL_SIZE'] = int(os.getenv('ASYNC_MYSQL_POOL_SIZE', '50'))  # asgi.py (aiomysql)
+app.config['BCRYPT_ROUNDS'] = int(os.getenv('BCRYPT_ROUNDS', '12'))  # cf. benchmarks/login_throughput.py
+app.config['BCRYPT_WORKERS'] = int(os.getenv('BCRYPT_WORKERS', '0'))  # 0 = moitié des CPU
+app.config['BCRYPT_MAX_PENDING'] = int(os.getenv('BCRYPT_MAX_PENDING', '32'))
+app.config['AUTH_IP_PER_MINUTE'] = int(os.getenv('AUTH_IP_PER_MINUTE', '30'))  # 0 = pas de limite
+app.config['AUTH_IP_BURST'] = int(os.getenv('AUTH_IP_BURST', '10'))
+app.config['AUTH_EMAIL_PER_MINUTE'] = int(os.getenv('AUTH_EMAIL_PER_MINUTE', '5'))  # 0 = pas de limite
+app.config['AUTH_EMAIL_BURST'] = int(os.getenv('AUTH_EMAIL_BURST', '5'))
+app.config['PROXY_COUNT'] = int(os.getenv('PROXY_COUNT', '0'))  # proxys devant l'application (Apache: 1)
+app.config['ACCOUNT_CACHE_SIZE'] = int(os.getenv('ACCOUNT_CACHE_SIZE', '10000'))
+app.config['ACCOUNT_CACHE_TTL'] = int(os.getenv('ACCOUNT_CACHE_TTL', '60'))  # secondes
+app.config['IBAN_INDEX'] = os.getenv('IBAN_INDEX', 'True').lower() in ('1', 'true', 'yes', 'on')
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')  # vide = /api/metrics sans authentification
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', '250'))  # 0 = journal désactivé
+app.config['SLOW_QUERY_LOG'] = os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.log')
 
 # Activer CORS pour permettre les requêtes du frontend
 CORS(app, resources={r"/api/*": {"origins": "*"}})
@@ -35,20 +76,50 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 # Initialiser JWT
 jwt = JWTManager(app)
 
+# Magasin local partagé par les workers (épinglage des lectures)
+init_local_store(app)
+
+# Générateur d'identifiants (références, numéros de compte) de la machine
+init_ids(app)
+
 # Initialiser la connexion à la base de données
 init_db(app)
 
+# Initialiser le pool de hachage des mots de passe
+init_security(app)
+
+# Limites des tentatives de connexion et d'inscription
+init_rate_limit(app)
+
+# Initialiser le cache des attributs de comptes
+init_cache(app)
+
+# Index des IBAN internes (routage des virements sans recherche en base)
+init_iban_index(app)
+
+# Métriques par route et par requête SQL (GET /api/metrics)
+init_metrics(app)
+
+# Journal des requêtes SQL lentes et de leurs plans d'exécution
+init_slow_query_log(app)
+
 # Enregistrer les blueprints (routes)
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(accounts_bp, url_prefix='/api/accounts')
 app.register_blueprint(transactions_bp, url_prefix='/api/transactions')
+app.register_blueprint(dashboard_bp, url_prefix='/api/dashboard')
+
+# Commandes d'administration (flask --app app rebuild-rollups, ...)
+register_commands(app)
 
 # Route de santé pour vérifier que l'API fonctionne
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'message': 'Banking API is running'
+        'message': 'Banking API is running',
+        'database_pool': get_pool_stats(),
+        'read_pool': get_read_pool_stats()
     }), 200
 
 # Gestionnaire d'erreur global
@@ -60,10 +131,11 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
-# Point d'entrée principal
+# Point d'entrée principal (serveur de développement; en production:
+# gunicorn -c gunicorn.conf.py app:app, cf. docs/INSTALLATION.md)
 if __name__ == '__main__':
     app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=True
+        host=os.getenv('FLASK_HOST', '0.0.0.0'),
+        port=int(os.getenv('FLASK_PORT', '5000')),
+        debug=os.getenv('FLASK_DEBUG', 'False').lower() in ('1', 'true', 'yes', 'on')
     )
@@ -0,0 +1,313 @@
+# backend/asgi.py
+"""
+Point d'entrée ASGI de l'API bancaire (asyncio + pool MySQL asynchrone)
+
+Usage (depuis backend/, dépendances de requirements-asgi.txt):
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Les lectures les plus fréquentes (profil, comptes, historique, tableau de
+bord, santé) sont servies nativement sur asyncio avec un pool aiomysql:
+une requête qui attend MySQL n'occupe ni thread ni connexion inutilement,
+un seul processus tient des milliers de requêtes simultanées.
+
+Toutes les autres routes (connexion, inscription, écritures du grand
+livre, lots, export) sont transmises telles quelles à l'application Flask
+(app.py) à travers un pont WSGI: mêmes règles, mêmes réponses.
+
+Les requêtes SQL et la mise en forme des réponses sont celles des
+blueprints (routes/*), seul l'accès à la base change.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from functools import wraps
+
+import aiomysql
+import jwt
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+from werkzeug.datastructures import MultiDict
+
+from app import app as flask_app
+from utils.serialization import dumps_bytes
+from utils.cache import ACCOUNT_META_QUERY, peek_account_meta, cache_account_meta, invalidate_account
+from routes.auth import PROFILE_QUERY
+from routes.accounts import (
+    ACCOUNTS_QUERY,
+    ACCOUNT_BALANCE_QUERY,
+    ACCOUNTS_SUMMARY_QUERY,
+    MONTHLY_STATS_QUERY,
+    add_monthly_stats,
+    account_details
+)
+from routes.transactions import (
+    USER_ACCOUNT_IDS_QUERY,
+    parse_history_page,
+    needs_account_ids,
+    history_page_query,
+    history_count_query,
+    history_pagination,
+    split_page
+)
+from routes.dashboard import DASHBOARD_USER_QUERY, dashboard_limit, build_dashboard
+
+config = flask_app.config
+
+# Pool de connexions aiomysql (créé au démarrage, cf. lifespan)
+pool = None
+
+class AuthError(Exception):
+    """Jeton absent ou invalide (mêmes statuts et messages que Flask-JWT-Extended)"""
+    
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+def json_response(payload, status_code=200):
+    """Réponse JSON identique à jsonify (mêmes conversions, clés triées)"""
+    return Response(
+        dumps_bytes(payload, sort_keys=True),
+        status_code=status_code,
+        media_type='application/json',
+        headers={'Access-Control-Allow-Origin': '*'}
+    )
+
+def get_identity(request):
+    """Décode le jeton d'accès de l'en-tête Authorization et retourne son identité"""
+    header = request.headers.get('Authorization')
+    if not header:
+        raise AuthError(401, 'Missing Authorization Header')
+    
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != 'Bearer':
+        raise AuthError(422, "Bad Authorization header. Expected 'Authorization: Bearer <JWT>'")
+    
+    try:
+        claims = jwt.decode(
+            parts[1],
+            config['JWT_SECRET_KEY'],
+            algorithms=[config.get('JWT_ALGORITHM', 'HS256')],
+            # L'identité est un dict ({'user_id': ...}), pas une chaîne
+            options={'verify_sub': False}
+        )
+    except jwt.ExpiredSignatureError:
+        raise AuthError(401, 'Token has expired')
+    except jwt.InvalidTokenError as e:
+        raise AuthError(422, str(e))
+    
+    if claims.get('type') != 'access':
+        raise AuthError(422, 'Only non-refresh tokens are allowed')
+    
+    return claims['sub']
+
+def jwt_required(handler):
+    """Équivalent asynchrone de @jwt_required(): passe user_id au gestionnaire"""
+    @wraps(handler)
+    async def wrapper(request):
+        try:
+            identity = get_identity(request)
+        except AuthError as e:
+            return json_response({'msg': e.message}, e.status_code)
+        return await handler(request, identity['user_id'])
+    return wrapper
+
+@asynccontextmanager
+async def db_cursor():
+    """
+    Emprunte une connexion au pool asynchrone (au plus MYSQL_POOL_TIMEOUT
+    secondes d'attente) et fournit un curseur dictionnaire
+    """
+    timeout = config['MYSQL_POOL_TIMEOUT']
+    try:
+        connection = await asyncio.wait_for(pool.acquire(), timeout)
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"Aucune connexion disponible après {timeout}s (pool épuisé)")
+    
+    try:
+        async with connection.cursor(aiomysql.DictCursor) as cursor:
+            yield cursor
+    finally:
+        pool.release(connection)
+
+async def fetch_all(cursor, query, params=()):
+    await cursor.execute(query, params)
+    return list(await cursor.fetchall())
+
+def query_args(request):
+    """Paramètres de la requête sous la forme attendue par les helpers des blueprints"""
+    return MultiDict(request.query_params.multi_items())
+
+@jwt_required
+async def get_profile(request, user_id):
+    """GET /api/auth/profile"""
+    try:
+        async with db_cursor() as cursor:
+            user = await fetch_all(cursor, PROFILE_QUERY, (user_id,))
+        
+        if not user:
+            return json_response({'error': 'Utilisateur non trouvé'}, 404)
+        
+        return json_response({'user': user[0]})
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération du profil: {str(e)}'}, 500)
+
+@jwt_required
+async def get_accounts(request, user_id):
+    """GET /api/accounts/"""
+    try:
+        async with db_cursor() as cursor:
+            accounts = await fetch_all(cursor, ACCOUNTS_QUERY, (user_id,))
+        
+        return json_response({'accounts': accounts})
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération des comptes: {str(e)}'}, 500)
+
+@jwt_required
+async def get_account_details(request, user_id):
+    """GET /api/accounts/{account_id}"""
+    account_id = request.path_params['account_id']
+    try:
+        async with db_cursor() as cursor:
+            meta = peek_account_meta(account_id)
+            if meta is None:
+                meta = cache_account_meta(account_id, await fetch_all(cursor, ACCOUNT_META_QUERY, (account_id,)))
+            
+            if not meta or meta['user_id'] != user_id:
+                return json_response({'error': 'Compte non trouvé'}, 404)
+            
+            balance = await fetch_all(cursor, ACCOUNT_BALANCE_QUERY, (account_id, user_id))
+        
+        if not balance:
+            invalidate_account(account_id)
+            return json_response({'error': 'Compte non trouvé'}, 404)
+        
+        return json_response({'account': account_details(meta, balance[0]['balance'])})
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération du compte: {str(e)}'}, 500)
+
+@jwt_required
+async def get_accounts_summary(request, user_id):
+    """GET /api/accounts/summary"""
+    try:
+        async with db_cursor() as cursor:
+            result = await fetch_all(cursor, ACCOUNTS_SUMMARY_QUERY, (user_id,))
+            monthly_stats = await fetch_all(cursor, MONTHLY_STATS_QUERY, (user_id,))
+        
+        return json_response({'summary': add_monthly_stats(result[0], monthly_stats)})
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération du résumé: {str(e)}'}, 500)
+
+@jwt_required
+async def get_transactions(request, user_id):
+    """GET /api/transactions/ (mêmes paramètres que la route Flask)"""
+    try:
+        try:
+            page = parse_history_page(query_args(request))
+        except ValueError as e:
+            return json_response({'error': str(e)}, 400)
+        
+        total = None
+        async with db_cursor() as cursor:
+            account_ids = None
+            if needs_account_ids(page['filters']):
+                account_ids = [row['id'] for row in await fetch_all(cursor, USER_ACCOUNT_IDS_QUERY, (user_id,))]
+            
+            query, params = history_page_query(
+                user_id,
+                page['per_page'],
+                filters=page['filters'],
+                after=page['after'],
+                offset=None if page['cursor_mode'] else (page['page'] - 1) * page['per_page'],
+                account_ids=account_ids
+            )
+            transactions, next_cursor = split_page(await fetch_all(cursor, query, params), page['per_page'])
+            if page['include_total']:
+                total = (await fetch_all(cursor, *history_count_query(user_id, page['filters'])))[0]['total']
+        
+        return json_response({
+            'transactions': transactions,
+            'pagination': history_pagination(page, next_cursor, total)
+        })
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération des transactions: {str(e)}'}, 500)
+
+@jwt_required
+async def get_dashboard(request, user_id):
+    """GET /api/dashboard/ (quatre requêtes sur une seule connexion)"""
+    try:
+        limit = dashboard_limit(query_args(request))
+        
+        async with db_cursor() as cursor:
+            user = await fetch_all(cursor, DASHBOARD_USER_QUERY, (user_id, user_id))
+            
+            if not user:
+                return json_response({'error': 'Utilisateur non trouvé'}, 404)
+            
+            accounts = await fetch_all(cursor, ACCOUNTS_QUERY, (user_id,))
+            account_ids = [row['id'] for row in await fetch_all(cursor, USER_ACCOUNT_IDS_QUERY, (user_id,))]
+            query, params = history_page_query(user_id, limit, account_ids=account_ids)
+            transactions, next_cursor = split_page(await fetch_all(cursor, query, params), limit)
+        
+        return json_response(build_dashboard(user[0], accounts, transactions, next_cursor, limit))
+        
+    except Exception as e:
+        return json_response({'error': f'Erreur lors de la récupération du tableau de bord: {str(e)}'}, 500)
+
+async def health_check(request):
+    """GET /api/health (état du pool asynchrone)"""
+    return json_response({
+        'status': 'healthy',
+        'message': 'Banking API is running',
+        'database_pool': {
+            'pool_size': pool.maxsize,
+            'open': pool.size,
+            'in_use': pool.size - pool.freesize
+        }
+    })
+
+@asynccontextmanager
+async def lifespan(app):
+    """Crée le pool aiomysql au démarrage du serveur et le ferme à l'arrêt"""
+    global pool
+    pool = await aiomysql.create_pool(
+        host=config['MYSQL_HOST'],
+        port=config['MYSQL_PORT'],
+        user=config['MYSQL_USER'],
+        password=config['MYSQL_PASSWORD'],
+        db=config['MYSQL_DATABASE'],
+        charset='utf8mb4',
+        autocommit=True,
+        minsize=1,
+        maxsize=config['ASYNC_MYSQL_POOL_SIZE'],
+        pool_recycle=3600
+    )
+    print(f"✓ Pool MySQL asynchrone prêt ({config['ASYNC_MYSQL_POOL_SIZE']} connexions maximum)")
+    try:
+        yield
+    finally:
+        pool.close()
+        await pool.wait_closed()
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/auth/profile', get_profile, methods=['GET']),
+        Route('/api/accounts/', get_accounts, methods=['GET']),
+        Route('/api/accounts/summary', get_accounts_summary, methods=['GET']),
+        Route('/api/accounts/{account_id:int}', get_account_details, methods=['GET']),
+        Route('/api/transactions/', get_transactions, methods=['GET']),
+        Route('/api/dashboard/', get_dashboard, methods=['GET']),
+        # Tout le reste (écritures, authentification, export, OPTIONS CORS...)
+        # est servi par l'application Flask dans un pool de threads borné
+        # par le pool de connexions synchrone
+        Mount('/', app=WSGIMiddleware(flask_app, workers=config['MYSQL_POOL_SIZE']))
+    ],
+    lifespan=lifespan
+)
@@ -0,0 +1,60 @@
+# backend/benchmarks/asgi_vs_wsgi.py
+"""
+Compare le point d'entrée WSGI (app.py) et le point d'entrée ASGI (asgi.py)
+sous un nombre croissant de requêtes simultanées sur le tableau de bord.
+
+Lancer les deux serveurs au préalable (depuis backend/), par exemple:
+    python app.py                                    # WSGI, port 5000
+    uvicorn asgi:app --port 5001                     # ASGI, port 5001
+
+Usage (depuis backend/):
+    python -m benchmarks.asgi_vs_wsgi
+    python -m benchmarks.asgi_vs_wsgi --concurrency 10 100 1000 --duration 15
+    python -m benchmarks.asgi_vs_wsgi --path /api/transactions/?cursor= --json bench_asgi.json
+
+Au-delà de quelques centaines de clients, relever la limite de fichiers
+ouverts (ulimit -n) du client et des serveurs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.http_load import login, run_load, summarize
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--wsgi-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--asgi-url', default='http://127.0.0.1:5001')
+    parser.add_argument('--email', default='jean.dupont@example.com')
+    parser.add_argument('--password', default='TestPassword123!')
+    parser.add_argument('--path', default='/api/dashboard/', help='route GET mesurée')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 100, 500, 1000])
+    parser.add_argument('--duration', type=float, default=10.0, help='secondes par mesure')
+    parser.add_argument('--json', dest='json_path', default=None, help='écrit les résultats dans ce fichier')
+    args = parser.parse_args()
+    
+    targets = [('wsgi', args.wsgi_url), ('asgi', args.asgi_url)]
+    # Le même jeton est accepté par les deux serveurs (même JWT_SECRET_KEY)
+    token = login(args.wsgi_url, args.email, args.password)
+    requests = [(args.path, 'GET', args.path, None)]
+    
+    print(f"{'serveur':>8} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+    results = []
+    for concurrency in args.concurrency:
+        for name, url in targets:
+            measured, elapsed = asyncio.run(run_load(url, requests, concurrency, args.duration, token))
+            result = dict(summarize(measured[args.path], elapsed), server=name, concurrency=concurrency)
+            results.append(result)
+            print(f"{name:>8} {concurrency:>8} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>8}")
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'path': args.path, 'duration': args.duration, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
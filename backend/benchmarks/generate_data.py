@@ -0,0 +1,464 @@
+# backend/benchmarks/generate_data.py
+"""
+Génère un jeu de données volumineux et cohérent dans banking_system.
+
+Utilisateurs, comptes (courant, épargne, joint) et plusieurs années
+d'historique: salaires, loyers, paiements par catégorie, retraits,
+virements internes et externes, intérêts et frais. Les montants suivent
+des distributions réalistes, chaque compte a une chaîne balance_after
+continue qui aboutit à son solde, et les cumuls mensuels
+(account_monthly_totals) sont écrits en même temps.
+
+Usage (depuis backend/, connexion MySQL lue dans .env):
+    python -m benchmarks.generate_data --users 1000 --years 2
+    python -m benchmarks.generate_data --users 1000000 --years 5 --processes 8 --method load-data
+
+Ordres de grandeur: ~30 transactions par utilisateur et par mois
+d'ancienneté (tirée entre 3 mois et --years ans), soit environ 350 000
+transactions pour 1 000 utilisateurs avec --years 2 et plus de 400 millions pour
+500 000 utilisateurs avec --years 5.
+
+Les données sont ajoutées (rien n'est supprimé). Les utilisateurs générés
+ont une adresse @example.test et le mot de passe --password. Chargement
+par INSERT multi-lignes (--method insert) ou LOAD DATA LOCAL INFILE
+(--method load-data, local_infile doit être activé sur le serveur).
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+import mysql.connector
+from dotenv import load_dotenv
+
+from utils.security import generate_iban
+from utils.ledger import INCOME_TYPES, EXPENSE_TYPES
+
+# Comptes par utilisateur au plus (identifiants réservés par utilisateur)
+ACCOUNTS_PER_USER = 3
+
+# Paiements par carte: catégorie -> (poids, montant médian en euros, dispersion)
+PAYMENT_CATEGORIES = {
+    'alimentation': (35, 32.0, 0.8),
+    'transport': (14, 18.0, 0.9),
+    'loisirs': (12, 25.0, 0.9),
+    'shopping': (15, 45.0, 1.0),
+    'sante': (5, 28.0, 0.7),
+    'services': (9, 22.0, 0.8),
+    'autres': (10, 20.0, 1.0)
+}
+
+MERCHANTS = {
+    'alimentation': ['Carrefour', 'Monoprix', 'Lidl', 'Auchan', 'Boulangerie', 'Picard'],
+    'transport': ['SNCF', 'RATP', 'TotalEnergies', 'Uber', 'Blablacar'],
+    'loisirs': ['Netflix', 'Spotify', 'Cinéma Pathé', 'Fnac', 'Restaurant'],
+    'shopping': ['Amazon', 'Zara', 'Decathlon', 'IKEA', 'Darty'],
+    'sante': ['Pharmacie', 'Médecin', 'Dentiste', 'Opticien'],
+    'services': ['Orange', 'EDF', 'Free', 'Assurance MAIF', 'Salle de sport'],
+    'autres': ['Divers', 'Cadeau', 'Association', 'Coiffeur']
+}
+
+FIRST_NAMES = ['Jean', 'Marie', 'Pierre', 'Sophie', 'Luc', 'Camille', 'Nicolas', 'Julie',
+               'Thomas', 'Emma', 'Hugo', 'Léa', 'Louis', 'Chloé', 'Paul', 'Inès']
+LAST_NAMES = ['Martin', 'Bernard', 'Dubois', 'Thomas', 'Robert', 'Richard', 'Petit',
+              'Durand', 'Leroy', 'Moreau', 'Simon', 'Laurent', 'Lefebvre', 'Michel']
+
+USER_COLUMNS = ('id', 'email', 'username', 'password_hash', 'first_name', 'last_name',
+                'phone_number', 'date_of_birth', 'address', 'created_at')
+ACCOUNT_COLUMNS = ('id', 'user_id', 'account_number', 'account_type', 'balance', 'iban',
+                   'status', 'overdraft_limit', 'interest_rate', 'created_at')
+TRANSACTION_COLUMNS = ('account_id', 'transaction_type', 'amount', 'balance_after', 'description',
+                       'recipient_account_id', 'recipient_iban', 'recipient_name', 'category',
+                       'transaction_date', 'reference_number')
+ROLLUP_COLUMNS = ('account_id', 'period', 'income', 'expenses', 'transaction_count')
+
+CREDIT_TYPES = ('deposit', 'transfer_in', 'interest')
+
+def cents(value):
+    """Euros (float) -> centimes (entier)"""
+    return max(1, int(round(value * 100)))
+
+def money(amount):
+    """Centimes (entier) -> chaîne décimale pour MySQL"""
+    sign = '-' if amount < 0 else ''
+    amount = abs(amount)
+    return f"{sign}{amount // 100}.{amount % 100:02d}"
+
+def poisson(rng, mean):
+    """Tirage de Poisson (Knuth, suffisant pour de petites moyennes)"""
+    if mean <= 0:
+        return 0
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def moment(rng, day):
+    """Heure aléatoire de la journée (entre 7h et 23h)"""
+    return datetime(day.year, day.month, day.day) + timedelta(seconds=rng.randint(7 * 3600, 23 * 3600))
+
+def month_starts(start, end):
+    current = date(start.year, start.month, 1)
+    while current <= end:
+        yield current
+        current = date(current.year + (current.month == 12), current.month % 12 + 1, 1)
+
+def days_in_month(month):
+    following = date(month.year + (month.month == 12), month.month % 12 + 1, 1)
+    return (following - month).days
+
+class UserGenerator:
+    """Génère les lignes d'un utilisateur (comptes, historique, cumuls)"""
+    
+    def __init__(self, options, password_hash, account_base, user_base):
+        self.options = options
+        self.password_hash = password_hash
+        self.account_base = account_base
+        self.user_base = user_base
+        self.today = date.today()
+    
+    def generate(self, index):
+        """Retourne (user, accounts, transactions, rollups) pour le n-ième utilisateur"""
+        rng = random.Random(f"{self.options.seed}-{index}")
+        user_id = self.user_base + index
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        
+        # Ancienneté: entre quelques mois et --years ans
+        opened = self.today - timedelta(days=rng.randint(90, max(91, int(self.options.years * 365))))
+        user = (
+            user_id, f"user{user_id}@example.test", f"user{user_id}", self.password_hash,
+            first_name, last_name, f"06{rng.randint(0, 99999999):08d}",
+            date(rng.randint(1950, 2004), rng.randint(1, 12), rng.randint(1, 28)),
+            f"{rng.randint(1, 200)} rue de la République, {rng.randint(10, 95)}000",
+            datetime(opened.year, opened.month, opened.day, 9)
+        )
+        
+        accounts = [self.new_account(rng, user_id, index, 0, 'courant', opened)]
+        if rng.random() < 0.6:
+            accounts.append(self.new_account(rng, user_id, index, 1, 'epargne', opened + timedelta(days=rng.randint(0, 60))))
+        if rng.random() < 0.1:
+            accounts.append(self.new_account(rng, user_id, index, 2, 'joint', opened + timedelta(days=rng.randint(0, 180))))
+        
+        events = self.events(rng, accounts)
+        transactions, rollups = self.apply(events, accounts, user_id)
+        
+        account_rows = [
+            (a['id'], user_id, a['number'], a['type'], money(a['balance']), a['iban'], a['status'],
+             money(a['overdraft']), f"{a['rate']:.4f}", a['created_at'])
+            for a in accounts
+        ]
+        return user, account_rows, transactions, rollups
+    
+    def new_account(self, rng, user_id, index, slot, account_type, opened):
+        account_id = self.account_base + index * ACCOUNTS_PER_USER + slot
+        # Numéro dérivé de l'identifiant (unique), préfixé par 9 pour repérer les comptes générés
+        number = f"9{account_id:010d}"
+        status = rng.choices(['active', 'frozen', 'closed'], weights=[97, 2, 1])[0]
+        return {
+            'id': account_id,
+            'type': account_type,
+            'number': number,
+            'iban': generate_iban(account_number=number),
+            'status': status,
+            'overdraft': rng.choice([0, 200, 500, 1000]) * 100 if account_type == 'courant' else 0,
+            'rate': rng.choice([0.005, 0.01, 0.02, 0.03]) if account_type == 'epargne' else 0.0,
+            'opened': min(opened, self.today),
+            'created_at': datetime(opened.year, opened.month, opened.day, 10),
+            'balance': 0
+        }
+    
+    def events(self, rng, accounts):
+        """
+        Mouvements bruts (date, compte, type, montant en centimes, attributs),
+        les débits sont confirmés ou écartés par apply selon le solde
+        """
+        checking = accounts[0]
+        savings = next((a for a in accounts if a['type'] == 'epargne'), None)
+        joint = next((a for a in accounts if a['type'] == 'joint'), None)
+        salary = rng.lognormvariate(math.log(2300), 0.35) if rng.random() < 0.85 else 0
+        rent = salary * rng.uniform(0.2, 0.35) if salary and rng.random() < 0.7 else 0
+        tx_per_month = self.options.tx_per_month * rng.uniform(0.5, 1.5)
+        names, weights = zip(*((name, spec[0]) for name, spec in PAYMENT_CATEGORIES.items()))
+        events = []
+        
+        for account in accounts:
+            events.append((moment(rng, account['opened']), 0, account, 'deposit',
+                           cents(rng.uniform(50, 3000)), {'description': 'Dépôt initial - Ouverture de compte'}))
+        
+        for month in month_starts(checking['opened'], self.today):
+            length = days_in_month(month)
+            
+            def day(low=1, high=length):
+                chosen = month + timedelta(days=rng.randint(low, min(high, length)) - 1)
+                return chosen if checking['opened'] <= chosen <= self.today else None
+            
+            if salary and (when := day(25, 28)):
+                events.append((moment(rng, when), 1, checking, 'deposit', cents(salary * rng.uniform(0.97, 1.05)),
+                               {'description': 'Salaire - Employeur', 'category': 'salary'}))
+            if rent and (when := day(1, 5)):
+                events.append((moment(rng, when), 2, checking, 'payment', cents(rent),
+                               {'description': 'Loyer - Agence Immobilière', 'category': 'logement',
+                                'recipient_name': 'Agence Immobilière'}))
+            
+            for _ in range(poisson(rng, tx_per_month)):
+                if when := day():
+                    category = rng.choices(names, weights=weights)[0]
+                    _, median, spread = PAYMENT_CATEGORIES[category]
+                    merchant = rng.choice(MERCHANTS[category])
+                    events.append((moment(rng, when), 3, checking, 'payment',
+                                   cents(rng.lognormvariate(math.log(median), spread)),
+                                   {'description': merchant, 'category': category, 'recipient_name': merchant}))
+            
+            for _ in range(poisson(rng, 1.5)):
+                if when := day():
+                    events.append((moment(rng, when), 3, checking, 'withdrawal',
+                                   cents(rng.choice([20, 40, 50, 60, 80, 100, 150, 200])),
+                                   {'description': 'Retrait DAB'}))
+            
+            for _ in range(poisson(rng, 0.4)):
+                if when := day():
+                    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                    events.append((moment(rng, when), 3, checking, 'transfer_out',
+                                   cents(rng.lognormvariate(math.log(80), 0.9)),
+                                   {'description': f'Virement à {name}', 'recipient_name': name,
+                                    'recipient_iban': f"FR76{rng.randint(10**22, 10**23 - 1)}"}))
+            
+            if poisson(rng, 0.2) and (when := day()):
+                events.append((moment(rng, when), 3, checking, 'deposit', cents(rng.uniform(10, 150)),
+                               {'description': 'Remboursement', 'category': 'refund'}))
+            
+            if when := day(length, length):
+                events.append((moment(rng, when), 4, checking, 'fee', 250,
+                               {'description': 'Frais de tenue de compte', 'category': 'services'}))
+            
+            if savings and salary and rng.random() < 0.7 and (when := day(26, 28)):
+                if when >= savings['opened']:
+                    events.append((moment(rng, when), 5, checking, 'internal', cents(salary * rng.uniform(0.05, 0.15)),
+                                   {'target': savings, 'description': 'Épargne mensuelle'}))
+            if savings and rng.random() < 0.05 and (when := day()):
+                if when >= savings['opened']:
+                    events.append((moment(rng, when), 5, savings, 'internal', cents(rng.uniform(100, 1500)),
+                                   {'target': checking, 'description': 'Retrait épargne'}))
+            if savings and month.month == 12 and (when := day(31, 31)) and when >= savings['opened']:
+                events.append((moment(rng, when), 6, savings, 'interest', 0,
+                               {'description': 'Intérêts annuels', 'category': 'autres'}))
+            
+            if joint:
+                for _ in range(poisson(rng, 4)):
+                    if (when := day()) and when >= joint['opened']:
+                        category = rng.choices(names, weights=weights)[0]
+                        merchant = rng.choice(MERCHANTS[category])
+                        events.append((moment(rng, when), 3, joint, 'payment',
+                                       cents(rng.lognormvariate(math.log(40), 0.8)),
+                                       {'description': merchant, 'category': category, 'recipient_name': merchant}))
+                if (when := day(1, 3)) and when >= joint['opened']:
+                    events.append((moment(rng, when), 1, joint, 'deposit', cents(rng.uniform(200, 800)),
+                                   {'description': 'Alimentation compte joint'}))
+        
+        # Ordre chronologique (à l'heure égale: crédits avant débits)
+        events.sort(key=lambda event: (event[0], event[1]))
+        return events
+    
+    def apply(self, events, accounts, user_id):
+        """Applique les mouvements dans l'ordre et construit les chaînes de soldes"""
+        transactions, totals = [], {}
+        sequence = 0
+        
+        def record(account, transaction_type, amount, when, details, reference):
+            account['balance'] += amount if transaction_type in CREDIT_TYPES else -amount
+            transactions.append((
+                account['id'], transaction_type, money(amount), money(account['balance']),
+                details.get('description'), details.get('recipient_account_id'),
+                details.get('recipient_iban'), details.get('recipient_name'), details.get('category'),
+                when, reference
+            ))
+            key = (account['id'], date(when.year, when.month, 1))
+            income, expenses, count = totals.get(key, (0, 0, 0))
+            if transaction_type in INCOME_TYPES:
+                income += amount
+            elif transaction_type in EXPENSE_TYPES:
+                expenses += amount
+            totals[key] = (income, expenses, count + 1)
+        
+        for when, _, account, transaction_type, amount, details in events:
+            sequence += 1
+            reference = f"GEN{user_id:09d}{sequence:07d}"
+            
+            if transaction_type == 'interest':
+                amount = int(account['balance'] * account['rate'])
+                if amount > 0:
+                    record(account, 'interest', amount, when, details, reference)
+                continue
+            
+            if transaction_type in CREDIT_TYPES:
+                record(account, transaction_type, amount, when, details, reference)
+                continue
+            
+            # Débit refusé s'il dépasse le découvert autorisé (comme le grand livre)
+            if account['balance'] - amount < -account['overdraft']:
+                continue
+            
+            if transaction_type == 'internal':
+                target = details['target']
+                record(account, 'transfer_out', amount, when,
+                       dict(details, recipient_account_id=target['id'], recipient_iban=target['iban'],
+                            recipient_name='Compte personnel'), reference)
+                record(target, 'transfer_in', amount, when,
+                       {'description': f"Virement reçu - {details['description']}"}, f"{reference}-1")
+            else:
+                record(account, transaction_type, amount, when, details, reference)
+        
+        rollups = [
+            (account_id, period, money(income), money(expenses), count)
+            for (account_id, period), (income, expenses, count) in sorted(totals.items())
+        ]
+        return transactions, rollups
+
+def connect(options):
+    return mysql.connector.connect(
+        host=os.getenv('MYSQL_HOST', 'localhost'),
+        port=int(os.getenv('MYSQL_PORT', '3306')),
+        user=os.getenv('MYSQL_USER', 'root'),
+        password=os.getenv('MYSQL_PASSWORD', 'root'),
+        database=os.getenv('MYSQL_DATABASE', 'banking_system'),
+        charset='utf8mb4',
+        autocommit=False,
+        allow_local_infile=options.method == 'load-data'
+    )
+
+def tsv_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+class Loader:
+    """Écrit des lots de lignes par INSERT multi-lignes ou LOAD DATA"""
+    
+    def __init__(self, connection, method, batch_size):
+        self.connection = connection
+        self.cursor = connection.cursor()
+        self.method = method
+        self.batch_size = batch_size
+        # Chargement en masse: contrôles d'unicité et de clés étrangères
+        # suspendus pour la session (les identifiants sont générés sans conflit)
+        self.cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+    
+    def load(self, table, columns, rows):
+        if not rows:
+            return
+        if self.method == 'load-data':
+            self._load_data(table, columns, rows)
+            return
+        query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        for start in range(0, len(rows), self.batch_size):
+            # mysql-connector envoie un seul INSERT ... VALUES (...), (...)
+            self.cursor.executemany(query, rows[start:start + self.batch_size])
+    
+    def _load_data(self, table, columns, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', delete=False) as f:
+            for row in rows:
+                f.write('\t'.join(tsv_value(value) for value in row) + '\n')
+            path = f.name
+        try:
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                (path,)
+            )
+        finally:
+            os.unlink(path)
+    
+    def commit(self):
+        self.connection.commit()
+
+_worker = {}
+
+def _init_worker(options, password_hash, account_base, user_base):
+    load_dotenv()
+    connection = connect(options)
+    _worker['loader'] = Loader(connection, options.method, options.batch_size)
+    _worker['generator'] = UserGenerator(options, password_hash, account_base, user_base)
+
+def _load_chunk(bounds):
+    """Génère et charge les utilisateurs [start, end) en une transaction"""
+    start, end = bounds
+    generator, loader = _worker['generator'], _worker['loader']
+    users, accounts, transactions, rollups = [], [], [], []
+    
+    for index in range(start, end):
+        user, user_accounts, user_transactions, user_rollups = generator.generate(index)
+        users.append(user)
+        accounts.extend(user_accounts)
+        transactions.extend(user_transactions)
+        rollups.extend(user_rollups)
+    
+    loader.load('users', USER_COLUMNS, users)
+    loader.load('accounts', ACCOUNT_COLUMNS, accounts)
+    loader.load('transactions', TRANSACTION_COLUMNS, transactions)
+    loader.load('account_monthly_totals', ROLLUP_COLUMNS, rollups)
+    loader.commit()
+    return len(users), len(accounts), len(transactions)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--years', type=float, default=2.0, help="profondeur d'historique maximale")
+    parser.add_argument('--tx-per-month', type=float, default=25.0, help='paiements par carte et par mois (moyenne)')
+    parser.add_argument('--users-per-chunk', type=int, default=200, help='utilisateurs par transaction')
+    parser.add_argument('--batch-size', type=int, default=5000, help='lignes par INSERT multi-lignes')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--method', choices=['insert', 'load-data'], default='insert')
+    parser.add_argument('--password', default='TestPassword123!', help='mot de passe des utilisateurs générés')
+    parser.add_argument('--password-rounds', type=int, default=10, help='coût bcrypt du hash (calculé une fois)')
+    parser.add_argument('--seed', type=int, default=42)
+    options = parser.parse_args()
+    
+    load_dotenv()
+    connection = connect(options)
+    cursor = connection.cursor()
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM users")
+    user_base = cursor.fetchone()[0] + 1
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM accounts")
+    account_base = cursor.fetchone()[0] + 1
+    
+    password_hash = bcrypt.hashpw(options.password.encode('utf-8'),
+                                  bcrypt.gensalt(rounds=options.password_rounds)).decode('utf-8')
+    
+    chunks = [(start, min(start + options.users_per_chunk, options.users))
+              for start in range(0, options.users, options.users_per_chunk)]
+    print(f"Génération de {options.users} utilisateurs (ids {user_base}-{user_base + options.users - 1}) "
+          f"en {len(chunks)} lots, {options.processes} processus, méthode {options.method}")
+    
+    started = time.perf_counter()
+    done = [0, 0, 0]
+    with Pool(options.processes, _init_worker, (options, password_hash, account_base, user_base)) as pool:
+        for users, accounts, transactions in pool.imap_unordered(_load_chunk, chunks):
+            done = [done[0] + users, done[1] + accounts, done[2] + transactions]
+            elapsed = time.perf_counter() - started
+            print(f"  {done[0]:>10} utilisateurs {done[1]:>10} comptes {done[2]:>12} transactions "
+                  f"({done[2] / elapsed:,.0f} transactions/s)")
+    
+    # Statistiques de l'optimiseur à jour pour les plans d'exécution
+    print("ANALYZE TABLE ...")
+    cursor.execute("ANALYZE TABLE users, accounts, transactions, account_monthly_totals")
+    cursor.fetchall()
+    connection.close()
+    
+    elapsed = time.perf_counter() - started
+    print(f"✓ {done[0]} utilisateurs, {done[1]} comptes, {done[2]} transactions en {elapsed:.1f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+# backend/benchmarks/http_load.py
+"""
+Générateur de charge HTTP/1.1 minimal sur asyncio (bibliothèque standard
+uniquement), partagé par les benchmarks qui visent un serveur lancé à part.
+
+Chaque client virtuel garde sa propre connexion (keep-alive quand le
+serveur l'accepte) et enchaîne les requêtes sans pause jusqu'à l'échéance.
+"""
+import asyncio
+import json
+import time
+import urllib.request
+from urllib.parse import quote, urlsplit
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def login(base_url, email, password):
+    """Retourne un jeton d'accès via /api/auth/login"""
+    request = urllib.request.Request(
+        f"{base_url.rstrip('/')}/api/auth/login",
+        data=json.dumps({'email': email, 'password': password}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())['access_token']
+
+class Connection:
+    """Connexion HTTP/1.1 réutilisable tant que le serveur ne la ferme pas"""
+    
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+    
+    async def request(self, method, path, headers, body=b''):
+        """Envoie une requête et retourne (statut, corps)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connexion fermée par le serveur')
+        version, status = status_line.decode('latin-1').split()[:2]
+        
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+        
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            payload = b''.join(chunks)
+        elif 'content-length' in response_headers:
+            payload = await self.reader.readexactly(int(response_headers['content-length']))
+        else:
+            payload = await self.reader.read()
+            response_headers['connection'] = 'close'
+        
+        if version == 'HTTP/1.0' or response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        
+        return int(status), payload
+    
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+def next_cursor(payload):
+    """pagination.next_cursor d'une réponse de GET /api/transactions/ (None en fin d'historique)"""
+    try:
+        return json.loads(payload)['pagination']['next_cursor']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+async def run_load(base_url, requests, concurrency, duration, token=None, follow=None):
+    """
+    Lance concurrency clients pendant duration secondes; chaque client
+    parcourt en boucle la liste requests de tuples (nom, méthode, chemin, corps)
+    
+    Args:
+        follow: {nom: pages} des requêtes paginées par curseur (chemin
+                terminé par "cursor="): chaque client suit next_cursor d'un
+                appel au suivant, sur au plus pages pages, puis revient à
+                la première
+    
+    Returns:
+        dict nom -> {'latencies': [ms...], 'errors': n, 'statuses': {code: n}}
+        et durée effective en secondes
+    """
+    target = urlsplit(base_url)
+    host, port = target.hostname, target.port or 80
+    prefix = target.path.rstrip('/')
+    
+    headers = {'Accept': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    
+    results = {name: {'latencies': [], 'errors': 0, 'statuses': {}} for name, _, _, _ in requests}
+    deadline = time.perf_counter() + duration
+    
+    follow = follow or {}
+    
+    async def client(offset):
+        connection = Connection(host, port)
+        index = offset
+        # Curseur et numéro de la prochaine page, par requête suivie
+        cursors = {name: (None, 1) for name in follow}
+        try:
+            while time.perf_counter() < deadline:
+                name, method, path, body = requests[index % len(requests)]
+                index += 1
+                if name in cursors and cursors[name][0]:
+                    path += quote(cursors[name][0], safe='')
+                payload = json.dumps(body).encode('utf-8') if body is not None else b''
+                request_headers = dict(headers, **({'Content-Type': 'application/json'} if body is not None else {}))
+                result = results[name]
+                started = time.perf_counter()
+                try:
+                    status, response = await connection.request(method, prefix + path, request_headers, payload)
+                except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+                    result['errors'] += 1
+                    connection.close()
+                    continue
+                result['latencies'].append((time.perf_counter() - started) * 1000)
+                result['statuses'][status] = result['statuses'].get(status, 0) + 1
+                if status >= 400:
+                    result['errors'] += 1
+                
+                if name in cursors:
+                    cursor, page = cursors[name]
+                    cursor = next_cursor(response) if status == 200 and page < follow[name] else None
+                    cursors[name] = (cursor, page + 1) if cursor else (None, 1)
+        finally:
+            connection.close()
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return results, time.perf_counter() - started
+
+def summarize(result, elapsed):
+    """Débit (requêtes/s) et percentiles de latence (ms) d'une route"""
+    latencies = result['latencies']
+    return {
+        'requests': len(latencies),
+        'errors': result['errors'],
+        'statuses': {str(code): count for code, count in sorted(result['statuses'].items())},
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'max_ms': max(latencies) if latencies else 0.0
+    }
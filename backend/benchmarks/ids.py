@@ -0,0 +1,149 @@
+# backend/benchmarks/ids.py
+"""
+Mesure le débit du générateur d'identifiants (utils/ids.py) et vérifie
+qu'il ne produit aucun doublon entre processus concurrents.
+
+Usage (depuis backend/):
+    python -m benchmarks.ids
+    python -m benchmarks.ids --processes 1 4 8 --count 2000000 --batch 10000
+    python -m benchmarks.ids --kind account --processes 8 --count 200000
+    python -m benchmarks.ids --legacy --json bench_ids.json
+
+Les --processes processus démarrent au même instant, partagent un magasin
+local (fichier temporaire, comme les workers gunicorn d'une machine) et
+génèrent chacun --count références (ou numéros de compte), une par appel
+ou par lots de --batch. Tous les identifiants sont ensuite comparés:
+doublons entre processus et ordre croissant dans chaque processus.
+--legacy mesure aussi les anciens générateurs aléatoires.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import ids
+
+def legacy_reference_number():
+    """Ancien generate_reference_number: horodatage à la seconde + 6 caractères aléatoires"""
+    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
+    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    return f"TRX{timestamp}{random_part}"
+
+def legacy_account_number():
+    """Ancien generate_account_number: 11 chiffres aléatoires"""
+    return ''.join(random.choices(string.digits, k=11))
+
+def generate(kind, count, batch):
+    """Liste de count identifiants du type kind"""
+    if kind == 'legacy-reference':
+        return [legacy_reference_number() for _ in range(count)]
+    if kind == 'legacy-account':
+        return [legacy_account_number() for _ in range(count)]
+    if kind == 'account':
+        return [ids.account_number() for _ in range(count)]
+    if not batch:
+        return [ids.reference_number() for _ in range(count)]
+    values = []
+    while len(values) < count:
+        values.extend(ids.reference_numbers(min(batch, count - len(values))))
+    return values
+
+def keys(kind, values):
+    """Clés 64 bits comparables: l'entier encodé, ou une empreinte des anciens formats"""
+    if kind == 'reference':
+        return np.fromiter((int(value[3:], 16) for value in values), dtype=np.uint64, count=len(values))
+    if kind == 'account':
+        return np.fromiter((int(value, 36) for value in values), dtype=np.uint64, count=len(values))
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big') for value in values),
+        dtype=np.uint64, count=len(values)
+    )
+
+def worker(kind, count, batch, start_at):
+    """Exécuté dans chaque processus: génération chronométrée, puis clés"""
+    ids.transaction_ids.next_id()  # réservation de l'emplacement hors chronométrage
+    time.sleep(max(0.0, start_at - time.time()))
+    
+    started = time.perf_counter()
+    values = generate(kind, count, batch)
+    elapsed = time.perf_counter() - started
+    
+    generated = keys(kind, values)
+    increasing = None if kind.startswith('legacy') else bool(np.all(generated[1:] > generated[:-1]))
+    return os.getpid(), elapsed, increasing, generated.tobytes()
+
+def run(kind, processes, count, batch):
+    """Génération concurrente dans processes processus et vérification des doublons"""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes) as pool:
+        # Démarrage commun, une fois tous les processus lancés
+        start_at = time.time() + 1.0 + 0.2 * processes
+        results = pool.starmap(worker, [(kind, count, batch, start_at)] * processes)
+    
+    generated = np.concatenate([np.frombuffer(result[3], dtype=np.uint64) for result in results])
+    duplicates = len(generated) - len(np.unique(generated))
+    elapsed = max(result[1] for result in results)
+    
+    return {
+        'kind': kind,
+        'processes': processes,
+        'count': count,
+        'batch': batch,
+        'total': len(generated),
+        'duplicates': duplicates,
+        'increasing': None if kind.startswith('legacy') else all(result[2] for result in results),
+        'per_process_per_second': [round(count / result[1]) for result in results],
+        'per_second': round(len(generated) / elapsed)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--kind', choices=['reference', 'account'], default='reference')
+    parser.add_argument('--processes', type=int, nargs='+', default=sorted({1, min(os.cpu_count() or 1, ids.WORKERS)}))
+    parser.add_argument('--count', type=int, default=None,
+                        help='identifiants par processus (1000000 références, 100000 numéros de compte)')
+    parser.add_argument('--batch', type=int, default=0, help='références par appel de reference_numbers (0 = une par appel)')
+    parser.add_argument('--legacy', action='store_true', help='mesure aussi les anciens générateurs aléatoires')
+    parser.add_argument('--json', dest='json_path', default=None, help='écrit les résultats dans ce fichier')
+    args = parser.parse_args()
+    
+    count = args.count or (1_000_000 if args.kind == 'reference' else 100_000)
+    kinds = [args.kind] + ([f"legacy-{args.kind}"] if args.legacy else [])
+    
+    # Magasin local propre au benchmark, hérité par les processus lancés
+    directory = tempfile.mkdtemp(prefix='bench-ids-')
+    os.environ['LOCAL_STORE_PATH'] = os.path.join(directory, 'local-store.sqlite3')
+    
+    results = []
+    failed = False
+    print(f"{'générateur':<18} {'processus':>9} {'total':>10} {'id/s':>11} {'id/s/proc':>10} {'doublons':>9} {'croissant':>9}")
+    for kind in kinds:
+        for processes in args.processes:
+            result = run(kind, processes, count, args.batch if kind == 'reference' else 0)
+            results.append(result)
+            increasing = '-' if result['increasing'] is None else ('oui' if result['increasing'] else 'NON')
+            print(f"{kind:<18} {processes:>9} {result['total']:>10} {result['per_second']:>11} "
+                  f"{min(result['per_process_per_second']):>10} {result['duplicates']:>9} {increasing:>9}")
+            if not kind.startswith('legacy') and (result['duplicates'] or not result['increasing']):
+                failed = True
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+    
+    if failed:
+        print("\n✗ doublons ou identifiants non croissants")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+# backend/benchmarks/loadtest.py
+"""
+Test de charge reproductible de l'API: latences p50/p95/p99 et débit par route.
+
+Démarre le backend (serveur de développement, gunicorn ou ASGI) sur la base
+MySQL locale, envoie un mélange pondéré de requêtes réalistes (connexion,
+tableau de bord, historique, écritures) et écrit les résultats en JSON pour
+comparer deux versions.
+
+Usage (depuis backend/, base initialisée avec database/seed_data.sql):
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --server gunicorn --mix mixed --concurrency 10 50 --json bench.json
+    python -m benchmarks.loadtest --server none --url http://127.0.0.1:5000 --mix read
+    python -m benchmarks.loadtest --json new.json --compare bench.json --max-regression 10
+
+history_cursor parcourt l'historique en suivant next_cursor, de la première
+page à la --cursor-pages-ième (20 lignes par page), puis recommence: ses
+latences couvrent les pages profondes, là où la pagination par curseur
+évite le coût croissant d'OFFSET (history_page_5: page 5 par OFFSET).
+
+Avec --compare, le code de sortie vaut 1 si le p95 ou le débit d'une route
+se dégrade de plus de --max-regression % par rapport au fichier de
+référence (même mélange, même concurrence).
+
+Les écritures sont équilibrées (autant de dépôts que de retraits, de
+virements aller que de virements retour entre les deux comptes de
+l'utilisateur): les soldes restent stables d'une exécution à l'autre.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.http_load import login, run_load, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Poids relatifs des requêtes de chaque mélange
+MIXES = {
+    'read': {
+        'dashboard': 40,
+        'accounts': 15,
+        'account_details': 10,
+        'history_first_page': 20,
+        'history_cursor': 10,
+        'history_page_5': 5
+    },
+    'mixed': {
+        'login': 5,
+        'dashboard': 30,
+        'accounts': 10,
+        'history_first_page': 15,
+        'history_cursor': 10,
+        'history_page_5': 6,
+        'deposit': 5,
+        'withdrawal': 5,
+        'transfer': 7,
+        'transfer_back': 7
+    },
+    'write': {
+        'deposit': 25,
+        'withdrawal': 25,
+        'transfer': 25,
+        'transfer_back': 25
+    },
+    'login': {
+        'login': 100
+    }
+}
+
+def build_requests(email, password, accounts):
+    """Requêtes nommées (méthode, chemin, corps) pour l'utilisateur de test"""
+    checking, savings = accounts[0], accounts[1] if len(accounts) > 1 else accounts[0]
+    return {
+        'login': ('POST', '/api/auth/login', {'email': email, 'password': password}),
+        'dashboard': ('GET', '/api/dashboard/', None),
+        'accounts': ('GET', '/api/accounts/', None),
+        'account_details': ('GET', f"/api/accounts/{checking['id']}", None),
+        'history_first_page': ('GET', '/api/transactions/?cursor=&per_page=20', None),
+        'history_cursor': ('GET', '/api/transactions/?per_page=20&cursor=', None),
+        'history_page_5': ('GET', '/api/transactions/?page=5&per_page=20', None),
+        'deposit': ('POST', '/api/transactions/deposit',
+                    {'account_id': checking['id'], 'amount': 1.00, 'description': 'Test de charge'}),
+        'withdrawal': ('POST', '/api/transactions/withdrawal',
+                       {'account_id': checking['id'], 'amount': 1.00, 'description': 'Test de charge'}),
+        'transfer': ('POST', '/api/transactions/transfer',
+                     {'source_account_id': checking['id'], 'recipient_iban': savings['iban'],
+                      'amount': 1.00, 'description': 'Test de charge'}),
+        'transfer_back': ('POST', '/api/transactions/transfer',
+                          {'source_account_id': savings['id'], 'recipient_iban': checking['iban'],
+                           'amount': 1.00, 'description': 'Test de charge'})
+    }
+
+def request_sequence(mix, requests, seed, blocks=10):
+    """
+    Séquence pondérée et mélangée (graine fixe: même ordre à chaque
+    exécution); chaque bloc respecte exactement les poids du mélange
+    """
+    block = [name for name, weight in MIXES[mix].items() for _ in range(weight)]
+    rng = random.Random(seed)
+    sequence = []
+    for _ in range(blocks):
+        rng.shuffle(block)
+        sequence.extend(block)
+    return [(name,) + requests[name] for name in sequence]
+
+def get_json(url, token):
+    request = urllib.request.Request(url, headers={'Authorization': f'Bearer {token}'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+def wait_until_healthy(url, process, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté au démarrage (code {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"{url}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.3)
+    raise RuntimeError(f"Le serveur ne répond pas sur {url}/api/health après {timeout}s")
+
+def start_server(server, port):
+    """Lance le backend dans un sous-processus (None pour --server none)"""
+    env = dict(
+        os.environ,
+        FLASK_DEBUG='0',
+        FLASK_PORT=str(port),
+        # Un seul client (une adresse IP, un email): limites de connexion levées
+        AUTH_IP_PER_MINUTE='0',
+        AUTH_EMAIL_PER_MINUTE='0',
+        GUNICORN_PIDFILE=os.path.join(tempfile.gettempdir(), f'banking-loadtest-{port}.pid')
+    )
+    commands = {
+        'flask': [sys.executable, 'app.py'],
+        'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app',
+                     '--bind', f'127.0.0.1:{port}', '--access-logfile', os.devnull],
+        'asgi': [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning']
+    }
+    if server == 'none':
+        return None
+    return subprocess.Popen(commands[server], cwd=BACKEND_DIR, env=env)
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def measure(url, sequence, concurrency, duration, warmup, token, cursor_pages=10):
+    """Une mesure (après échauffement non compté) pour un niveau de concurrence"""
+    follow = {'history_cursor': cursor_pages}
+    if warmup:
+        asyncio.run(run_load(url, sequence, concurrency, warmup, token, follow))
+    measured, elapsed = asyncio.run(run_load(url, sequence, concurrency, duration, token, follow))
+    
+    routes = {name: summarize(result, elapsed) for name, result in measured.items()}
+    combined = {
+        'latencies': [latency for result in measured.values() for latency in result['latencies']],
+        'errors': sum(result['errors'] for result in measured.values()),
+        'statuses': {}
+    }
+    for result in measured.values():
+        for status, count in result['statuses'].items():
+            combined['statuses'][status] = combined['statuses'].get(status, 0) + count
+    
+    return {'concurrency': concurrency, 'elapsed': elapsed, 'routes': routes, 'total': summarize(combined, elapsed)}
+
+def compare(report, baseline, max_regression):
+    """Liste des dégradations de plus de max_regression % par rapport à la référence"""
+    regressions = []
+    if baseline['meta']['mix'] != report['meta']['mix']:
+        print(f"⚠ mélange différent de la référence ({baseline['meta']['mix']}), comparaison ignorée")
+        return regressions
+    
+    reference = {run['concurrency']: run for run in baseline['runs']}
+    for run in report['runs']:
+        base_run = reference.get(run['concurrency'])
+        if not base_run:
+            continue
+        for name, current in run['routes'].items():
+            base = base_run['routes'].get(name)
+            if not base or not base['requests'] or not current['requests']:
+                continue
+            p95_change = (current['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+            rps_change = (base['rps'] - current['rps']) / base['rps'] * 100 if base['rps'] else 0
+            if p95_change > max_regression:
+                regressions.append(f"{name} (c={run['concurrency']}): p95 {base['p95_ms']:.1f} → {current['p95_ms']:.1f} ms (+{p95_change:.0f}%)")
+            if rps_change > max_regression:
+                regressions.append(f"{name} (c={run['concurrency']}): débit {base['rps']:.1f} → {current['rps']:.1f} req/s (-{rps_change:.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--server', choices=['flask', 'gunicorn', 'asgi', 'none'], default='gunicorn',
+                        help='backend à démarrer (none: serveur déjà lancé sur --url)')
+    parser.add_argument('--url', default=None, help='URL du serveur (défaut: http://127.0.0.1:--port)')
+    parser.add_argument('--port', type=int, default=5050)
+    parser.add_argument('--email', default='jean.dupont@example.com')
+    parser.add_argument('--password', default='TestPassword123!')
+    parser.add_argument('--mix', choices=sorted(MIXES), default='mixed')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--duration', type=float, default=20.0, help='secondes mesurées par niveau')
+    parser.add_argument('--warmup', type=float, default=3.0, help='secondes d\'échauffement non comptées')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cursor-pages', type=int, default=10,
+                        help='pages parcourues par history_cursor en suivant next_cursor')
+    parser.add_argument('--json', dest='json_path', default='loadtest.json', help='fichier de résultats')
+    parser.add_argument('--compare', default=None, help='fichier de référence à comparer')
+    parser.add_argument('--max-regression', type=float, default=10.0, help='dégradation tolérée (%%)')
+    args = parser.parse_args()
+    
+    url = (args.url or f"http://127.0.0.1:{args.port}").rstrip('/')
+    process = start_server(args.server, args.port)
+    
+    try:
+        wait_until_healthy(url, process)
+        token = login(url, args.email, args.password)
+        accounts = [a for a in get_json(f"{url}/api/accounts/", token)['accounts'] if a['status'] == 'active']
+        if not accounts:
+            raise RuntimeError(f"Aucun compte actif pour {args.email}")
+        
+        sequence = request_sequence(args.mix, build_requests(args.email, args.password, accounts), args.seed)
+        
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'git_revision': git_revision(),
+                'server': args.server,
+                'url': url,
+                'mix': args.mix,
+                'weights': MIXES[args.mix],
+                'duration': args.duration,
+                'warmup': args.warmup,
+                'seed': args.seed,
+                'cursor_pages': args.cursor_pages,
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count()
+            },
+            'runs': []
+        }
+        
+        print(f"{'clients':>8} {'route':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+        for concurrency in args.concurrency:
+            run = measure(url, sequence, concurrency, args.duration, args.warmup, token, args.cursor_pages)
+            report['runs'].append(run)
+            for name, result in sorted(run['routes'].items()) + [('TOTAL', run['total'])]:
+                print(f"{concurrency:>8} {name:<20} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+                      f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['errors']:>8}")
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+    
+    with open(args.json_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats écrits dans {args.json_path}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n✗ {len(regressions)} dégradation(s) de plus de {args.max_regression}% :")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\n✓ aucune dégradation de plus de {args.max_regression}% par rapport à {args.compare}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# backend/benchmarks/login_throughput.py
+"""
+Mesure le débit de vérification des mots de passe selon le coût bcrypt et
+la taille du pool de hachage, pour choisir BCRYPT_ROUNDS / BCRYPT_WORKERS.
+
+Usage (depuis backend/):
+    python -m benchmarks.login_throughput
+    python -m benchmarks.login_throughput --rounds 10 11 12 13 --workers 1 2 4 --duration 5
+    python -m benchmarks.login_throughput --target 50 --json bench_login.json
+
+Chaque mesure passe par utils.security.verify_password avec le même pool
+que l'application, appelé depuis --clients threads concurrents (comme
+autant de requêtes /api/auth/login simultanées).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import security
+
+PASSWORD = 'TestPassword123!'
+
+class _Config:
+    """Configuration minimale attendue par init_security"""
+    def __init__(self, **config):
+        self.config = config
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(rounds, workers, clients, duration):
+    """Retourne débit (vérifications/s) et latences (ms) pour un réglage donné"""
+    security.init_security(_Config(BCRYPT_ROUNDS=rounds, BCRYPT_WORKERS=workers, BCRYPT_MAX_PENDING=clients))
+    hashed = security.hash_password(PASSWORD)
+    deadline = time.perf_counter() + duration
+    
+    def client():
+        latencies = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            assert security.verify_password(PASSWORD, hashed)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(lambda _: client(), range(clients)))
+    elapsed = time.perf_counter() - started
+    
+    latencies = [latency for result in results for latency in result]
+    return {
+        'rounds': rounds,
+        'workers': workers,
+        'clients': clients,
+        'verifications': len(latencies),
+        'per_second': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99)
+    }
+
+def main():
+    cpus = os.cpu_count() or 2
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, max(1, cpus // 2), cpus}))
+    parser.add_argument('--clients', type=int, default=32, help='requêtes de connexion simultanées')
+    parser.add_argument('--duration', type=float, default=3.0, help='secondes par mesure')
+    parser.add_argument('--target', type=float, default=None, help='connexions/s à tenir par processus')
+    parser.add_argument('--json', dest='json_path', default=None, help='écrit les résultats dans ce fichier')
+    args = parser.parse_args()
+    
+    print(f"{'coût':>5} {'threads':>8} {'verif/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    results = []
+    for rounds in args.rounds:
+        for workers in args.workers:
+            result = measure(rounds, workers, args.clients, args.duration)
+            results.append(result)
+            print(f"{rounds:>5} {workers:>8} {result['per_second']:>9.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+    
+    if args.target:
+        # Coût le plus élevé qui tient la cible avec le plus petit pool suffisant
+        candidates = [r for r in results if r['per_second'] >= args.target]
+        if candidates:
+            best = max(candidates, key=lambda r: (r['rounds'], -r['workers']))
+            print(f"\n→ BCRYPT_ROUNDS={best['rounds']} BCRYPT_WORKERS={best['workers']} "
+                  f"({best['per_second']:.1f} verif/s ≥ {args.target})")
+        else:
+            print(f"\n→ aucun réglage mesuré n'atteint {args.target} verif/s")
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'cpu_count': cpus, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# backend/benchmarks/prepared_statements.py
+"""
+Compare, requête par requête, l'envoi en texte (execute_query) et les
+instructions préparées gardées par connexion (execute_prepared) pour les
+requêtes fréquentes de l'API: recherche d'utilisateur à la connexion,
+contrôle de propriété d'un compte, attributs d'un compte, verrouillage,
+mise à jour du solde et INSERT d'une transaction.
+
+Usage (depuis backend/, base initialisée avec database/seed_data.sql):
+    python -m benchmarks.prepared_statements
+    python -m benchmarks.prepared_statements --iterations 20000 --json bench_prepared.json
+
+Les écritures sont annulées (ROLLBACK hors chronométrage, toutes les
+--batch itérations): la base n'est pas modifiée. Les compteurs de session
+montrent les commandes envoyées au serveur pendant la mesure: une requête
+n'est préparée qu'une fois par connexion (Com_stmt_prepare), chaque appel
+préparé est un seul aller-retour (Com_stmt_execute, sans Com_stmt_reset),
+comme chaque appel en texte (Com_select, Com_update, Com_insert).
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+from utils.database import get_db_connection, execute_query, execute_many, execute_prepared
+from utils.cache import ACCOUNT_META_QUERY
+from utils import ledger
+from routes.auth import USER_BY_EMAIL_QUERY
+from routes.accounts import ACCOUNT_BALANCE_QUERY
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def session_counters():
+    rows = execute_query("SHOW SESSION STATUS LIKE 'Com_stmt_%'")
+    return {row['Variable_name']: int(row['Value']) for row in rows}
+
+def transaction_row(account):
+    return (account['id'], 'deposit', Decimal('1.00'), account['balance'] + 1, 'Benchmark',
+            None, None, None, None, f"BENCH{uuid.uuid4().hex[:18].upper()}")
+
+def build_cases(email, account):
+    """(nom, fabrique de paramètres, exécution en texte, exécution préparée)"""
+    lock_sql = ledger._lock_sql(1, 0)
+    update_sql = ledger._update_balances_sql(1)
+    insert_sql = ledger._values_sql(ledger.INSERT_TRANSACTIONS_SQL, ledger.TRANSACTION_ROW_SQL, 1)
+    
+    def read(query):
+        return (lambda params: execute_query(query, params),
+                lambda params: execute_prepared(query, params))
+    
+    def write(query):
+        return (lambda params: execute_query(query, params, fetch=False),
+                lambda params: execute_prepared(query, params, fetch=False))
+    
+    insert = (lambda params: execute_many(insert_sql, [params], commit=False, return_id=True),
+              lambda params: execute_prepared(insert_sql, params, return_id=True))
+    
+    return [
+        ('user_by_email', lambda: (email,)) + read(USER_BY_EMAIL_QUERY),
+        ('account_ownership', lambda: (account['id'], account['user_id'])) + read(ACCOUNT_BALANCE_QUERY),
+        ('account_meta', lambda: (account['id'],)) + read(ACCOUNT_META_QUERY),
+        ('lock_account', lambda: (account['id'],)) + read(lock_sql),
+        ('balance_update', lambda: (account['id'], account['balance'], account['id'])) + write(update_sql),
+        ('transaction_insert', lambda: transaction_row(account)) + insert
+    ]
+
+def measure(run, make_params, iterations, batch):
+    connection = get_db_connection()
+    latencies = []
+    for start in range(0, iterations, batch):
+        for _ in range(min(batch, iterations - start)):
+            params = make_params()
+            started = time.perf_counter()
+            run(params)
+            latencies.append((time.perf_counter() - started) * 1_000_000)
+        # Écritures annulées; lectures: fin de l'instantané de lecture
+        connection.rollback()
+    return {
+        'mean_us': statistics.mean(latencies),
+        'p50_us': percentile(latencies, 50),
+        'p99_us': percentile(latencies, 99)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--email', default='jean.dupont@example.com')
+    parser.add_argument('--iterations', type=int, default=5000, help='exécutions par requête et par mode')
+    parser.add_argument('--batch', type=int, default=100, help='exécutions entre deux ROLLBACK')
+    parser.add_argument('--json', dest='json_path', default=None, help='écrit les résultats dans ce fichier')
+    args = parser.parse_args()
+    
+    results = []
+    with app.app_context():
+        user = execute_query(USER_BY_EMAIL_QUERY, (args.email,))
+        if not user:
+            sys.exit(f"Utilisateur {args.email} introuvable")
+        account = execute_query(
+            "SELECT id, user_id, balance FROM accounts WHERE user_id = %s AND status = 'active' ORDER BY id LIMIT 1",
+            (user[0]['id'],)
+        )[0]
+        get_db_connection().rollback()
+        
+        print(f"{'requête':<20} {'texte µs':>10} {'préparée µs':>12} {'gain':>7} {'p99 texte':>10} {'p99 prép.':>10}")
+        for name, make_params, run_text, run_prepared in build_cases(args.email, account):
+            # Échauffement: préparation et cache du serveur hors mesure
+            measure(run_text, make_params, min(200, args.iterations), args.batch)
+            measure(run_prepared, make_params, min(200, args.iterations), args.batch)
+            
+            before = session_counters()
+            prepared = measure(run_prepared, make_params, args.iterations, args.batch)
+            after = session_counters()
+            text = measure(run_text, make_params, args.iterations, args.batch)
+            
+            gain = (text['mean_us'] - prepared['mean_us']) / text['mean_us'] * 100
+            results.append({
+                'query': name,
+                'text': text,
+                'prepared': prepared,
+                'gain_pct': gain,
+                'server_prepares': after.get('Com_stmt_prepare', 0) - before.get('Com_stmt_prepare', 0),
+                'server_executes': after.get('Com_stmt_execute', 0) - before.get('Com_stmt_execute', 0),
+                'server_resets': after.get('Com_stmt_reset', 0) - before.get('Com_stmt_reset', 0)
+            })
+            print(f"{name:<20} {text['mean_us']:>10.1f} {prepared['mean_us']:>12.1f} {gain:>6.1f}% "
+                  f"{text['p99_us']:>10.1f} {prepared['p99_us']:>10.1f}")
+        
+        print("\nCommandes serveur pendant la mesure préparée (attendu: 0 préparation, 0 reset, "
+              f"{args.iterations} exécutions):")
+        for result in results:
+            print(f"  {result['query']:<20} {result['server_prepares']} préparation(s), "
+                  f"{result['server_executes']} exécution(s), {result['server_resets']} reset(s)")
+    
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'iterations': args.iterations, 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
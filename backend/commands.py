@@ -0,0 +1,57 @@
+# backend/commands.py
+import click
+from datetime import date, datetime, timedelta
+from jobs.rollups import rebuild_monthly_totals
+from jobs.interest import accrue_interest
+from jobs.statements import generate_statements, explain_statement_lines
+from utils.database import connection_settings
+
+def parse_period(value):
+    """Premier jour du mois AAAA-MM, ou du mois précédent si value est vide"""
+    if value:
+        return datetime.strptime(value, '%Y-%m').date()
+    first_of_month = date.today().replace(day=1)
+    return (first_of_month - timedelta(days=1)).replace(day=1)
+
+def register_commands(app):
+    """Enregistre les commandes d'administration (flask --app app <commande>)"""
+    
+    @app.cli.command('rebuild-rollups')
+    @click.option('--since', default=None, help="Premier mois à recalculer (AAAA-MM), tout l'historique par défaut")
+    @click.option('--chunk-size', default=5000, show_default=True, help='Comptes traités par transaction')
+    def rebuild_rollups(since, chunk_size):
+        """Recalcule les cumuls mensuels (account_monthly_totals) depuis les transactions"""
+        period = datetime.strptime(since, '%Y-%m').date() if since else None
+        rebuild_monthly_totals(since=period, chunk_size=chunk_size, log=click.echo)
+    
+    @app.cli.command('generate-statements')
+    @click.option('--period', default=None, help='Mois du relevé (AAAA-MM), le mois précédent par défaut')
+    @click.option('--output', default='statements', show_default=True, help='Répertoire des relevés')
+    @click.option('--chunk-size', default=2000, show_default=True, help='Identifiants de comptes par tranche')
+    @click.option('--workers', default=4, show_default=True, help='Processus de génération')
+    @click.option('--explain', is_flag=True, help="Affiche le plan d'exécution des requêtes d'une tranche, sans rien écrire")
+    def generate_statements_command(period, output, chunk_size, workers, explain):
+        """Écrit le relevé mensuel (CSV et texte) de chaque compte non clôturé"""
+        if explain:
+            explain_statement_lines(parse_period(period), chunk_size, log=click.echo)
+            return
+        
+        summary = generate_statements(
+            connection_settings(app.config, read=True), parse_period(period), output,
+            chunk_size=chunk_size, workers=workers, log=click.echo
+        )
+        if summary['failed']:
+            raise click.ClickException(f"{len(summary['failed'])} tranche(s) en échec")
+    
+    @app.cli.command('accrue-interest')
+    @click.option('--period', default=None, help='Mois crédité (AAAA-MM), le mois précédent par défaut')
+    @click.option('--chunk-size', default=5000, show_default=True, help='Identifiants de comptes par transaction')
+    @click.option('--workers', default=4, show_default=True, help='Processus de calcul')
+    def accrue_interest_command(period, chunk_size, workers):
+        """Crédite les intérêts mensuels des comptes d'épargne (reprend là où un lancement s'est arrêté)"""
+        summary = accrue_interest(
+            connection_settings(app.config), parse_period(period),
+            chunk_size=chunk_size, workers=workers, log=click.echo
+        )
+        if summary['failed']:
+            raise click.ClickException(f"{len(summary['failed'])} tranche(s) en échec")
@@ -0,0 +1,88 @@
+# backend/gunicorn.conf.py
+"""
+Configuration du serveur de production (gunicorn, workers préforkés)
+
+Usage (depuis backend/):
+    gunicorn -c gunicorn.conf.py app:app
+
+Rechargement sans coupure après une mise à jour du code (les anciens
+workers terminent leurs requêtes en cours, au plus graceful_timeout
+secondes); une modification de .env demande un redémarrage complet:
+    kill -HUP $(cat gunicorn.pid)
+
+Chaque worker est un processus qui importe l'application une seule fois et
+garde son propre pool de connexions MySQL pendant toute sa durée de vie.
+Un worker sert GUNICORN_THREADS requêtes à la fois: son pool compte autant
+de connexions, dans la limite de MYSQL_MAX_CONNECTIONS pour l'ensemble des
+workers. MYSQL_POOL_SIZE, BCRYPT_WORKERS et PROXY_COUNT, s'ils sont définis
+(.env ou environnement), remplacent les valeurs données ici.
+"""
+import multiprocessing
+import os
+from dotenv import load_dotenv
+from utils import ids
+
+load_dotenv()
+
+cpu_count = multiprocessing.cpu_count()
+
+# Réseau: le reverse proxy (config/apache/banking-app.conf) se connecte ici
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:5000')
+backlog = 2048
+
+# Workers: processus × threads (les requêtes attendent surtout MySQL)
+workers = int(os.getenv('GUNICORN_WORKERS', str(min(cpu_count * 2 + 1, ids.WORKERS // 2))))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+
+# Chaque worker réserve un emplacement d'identifiants (utils/ids.py). Pendant
+# un rechargement (HUP) ou un recyclage, anciens et nouveaux workers coexistent:
+# la moitié des emplacements doit suffire
+if workers * 2 > ids.WORKERS:
+    raise RuntimeError(
+        f"GUNICORN_WORKERS={workers}: {ids.WORKERS // 2} workers par machine au maximum "
+        f"({ids.WORKERS} emplacements d'identifiants, rechargements compris)"
+    )
+
+# Pas de préchargement dans le maître: le pool MySQL ouvre ses connexions à
+# l'import de l'application, elles ne doivent pas être partagées par fork
+preload_app = False
+
+# Recyclage progressif des workers (fuites mémoire) et arrêt propre
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '5000'))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+pidfile = os.getenv('GUNICORN_PIDFILE', 'gunicorn.pid')
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
+proc_name = 'banking-api'
+
+def pool_size_per_worker(workers, threads, max_connections):
+    """Une connexion par thread, sans dépasser le budget de connexions MySQL"""
+    return max(1, min(threads, max_connections // workers, 32))
+
+# Dimensionnement hérité par les workers (variables lues par app.py)
+max_connections = int(os.getenv('MYSQL_MAX_CONNECTIONS', '140'))
+os.environ.setdefault('MYSQL_POOL_SIZE', str(pool_size_per_worker(workers, threads, max_connections)))
+
+# bcrypt occupe un CPU par hachage: répartir les CPU entre les workers
+os.environ.setdefault('BCRYPT_WORKERS', str(max(1, cpu_count // workers)))
+
+# Derrière le reverse proxy: adresse du client lue dans X-Forwarded-For
+# (limites de connexion par IP, cf. utils/rate_limit.py)
+os.environ.setdefault('PROXY_COUNT', '1')
+
+def on_starting(server):
+    server.log.info(
+        "Workers: %s × %s threads, pool MySQL: %s connexions par worker, bcrypt: %s threads par worker, proxys: %s",
+        workers, threads, os.environ['MYSQL_POOL_SIZE'], os.environ['BCRYPT_WORKERS'], os.environ['PROXY_COUNT']
+    )
+
+def post_worker_init(worker):
+    # Sans emplacement libre, le worker échoue au démarrage plutôt qu'à
+    # chaque opération
+    ids.reserve_worker()
+    worker.log.info("Worker %s prêt", worker.pid)
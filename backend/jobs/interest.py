@@ -0,0 +1,222 @@
+# backend/jobs/interest.py
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import mysql.connector
+from utils.database import execute_query, run_query
+from utils.ledger import CURRENT_PERIOD_SQL
+
+# Intérêts mensuels: taux annuel (accounts.interest_rate) / 12, appliqué au
+# solde au moment du calcul et arrondi au centime
+MONTHS_PER_YEAR = 12
+
+# Référence déterministe d'un crédit d'intérêts: INT + AAAAMM + id du compte
+# sur 10 chiffres. L'unicité de transactions.reference_number garantit qu'un
+# compte n'est jamais crédité deux fois pour la même période, et les
+# références d'une tranche forment un intervalle de l'index.
+REFERENCE_SQL = "CONCAT('INT', %s, LPAD({column}, 10, '0'))"
+
+# Table de travail propre à la connexion de chaque processus: comptes
+# éligibles de la tranche, verrouillés, avec intérêts et nouveau solde
+CREATE_CHUNK_TABLE_SQL = """
+    CREATE TEMPORARY TABLE IF NOT EXISTS interest_chunk (
+        account_id INT PRIMARY KEY,
+        amount DECIMAL(15, 2) NOT NULL,
+        balance_after DECIMAL(15, 2) NOT NULL
+    ) ENGINE=MEMORY
+"""
+
+SELECT_CHUNK_SQL = f"""
+    INSERT INTO interest_chunk (account_id, amount, balance_after)
+    SELECT id,
+           ROUND(balance * interest_rate / {MONTHS_PER_YEAR}, 2),
+           balance + ROUND(balance * interest_rate / {MONTHS_PER_YEAR}, 2)
+    FROM accounts
+    WHERE id BETWEEN %s AND %s
+    AND account_type = 'epargne'
+    AND status = 'active'
+    AND ROUND(balance * interest_rate / {MONTHS_PER_YEAR}, 2) > 0
+    AND NOT EXISTS (
+        SELECT 1 FROM transactions WHERE reference_number = {REFERENCE_SQL.format(column='accounts.id')}
+    )
+    FOR UPDATE
+"""
+
+UPDATE_BALANCES_SQL = """
+    UPDATE accounts a
+    JOIN interest_chunk c ON c.account_id = a.id
+    SET a.balance = c.balance_after
+"""
+
+INSERT_TRANSACTIONS_SQL = f"""
+    INSERT INTO transactions (account_id, transaction_type, amount, balance_after,
+                            description, status, reference_number)
+    SELECT account_id, 'interest', amount, balance_after, %s, 'completed',
+           {REFERENCE_SQL.format(column='account_id')}
+    FROM interest_chunk
+"""
+
+# Les intérêts ne sont ni des revenus ni des dépenses des cumuls mensuels
+# (cf. INCOME_TYPES), mais comptent dans leur nombre de transactions
+UPSERT_MONTHLY_TOTALS_SQL = f"""
+    INSERT INTO account_monthly_totals (account_id, period, income, expenses, transaction_count)
+    SELECT account_id, {CURRENT_PERIOD_SQL}, 0, 0, 1
+    FROM interest_chunk
+    ON DUPLICATE KEY UPDATE transaction_count = transaction_count + 1
+"""
+
+CHUNK_TOTALS_SQL = "SELECT COUNT(*), COALESCE(SUM(amount), 0) FROM interest_chunk"
+
+INSERT_PROGRESS_SQL = """
+    INSERT INTO interest_runs (period, first_account_id, last_account_id, accounts, total_interest, duration_ms)
+    VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+# Connexion du processus de calcul (cf. _init_worker)
+_connection = None
+
+def _init_worker(settings):
+    """Ouvre la connexion du processus: jamais celle du processus parent"""
+    global _connection
+    _connection = mysql.connector.connect(**settings)
+    cursor = _connection.cursor()
+    try:
+        run_query(cursor, CREATE_CHUNK_TABLE_SQL)
+        _connection.commit()
+    finally:
+        cursor.close()
+
+def _accrue_chunk(period, first_id, last_id):
+    """
+    Crédite les intérêts des comptes d'épargne first_id..last_id pour period
+    (date, premier jour du mois), en une transaction qui enregistre aussi
+    l'avancement dans interest_runs
+    
+    Returns:
+        Tuple (first_id, last_id, comptes crédités, total des intérêts, durée en secondes)
+    """
+    cursor = _connection.cursor()
+    started = time.perf_counter()
+    month = period.strftime('%Y%m')
+    
+    try:
+        run_query(cursor, "DELETE FROM interest_chunk")
+        run_query(cursor, SELECT_CHUNK_SQL, (first_id, last_id, month))
+        
+        if cursor.rowcount:
+            run_query(cursor, UPDATE_BALANCES_SQL)
+            run_query(cursor, INSERT_TRANSACTIONS_SQL, (f"Intérêts {period.strftime('%Y-%m')}", month))
+            run_query(cursor, UPSERT_MONTHLY_TOTALS_SQL)
+        
+        accounts, total = run_query(cursor, CHUNK_TOTALS_SQL, fetch=True)[0]
+        elapsed = time.perf_counter() - started
+        
+        run_query(cursor, INSERT_PROGRESS_SQL, (period, first_id, last_id, accounts, total, int(elapsed * 1000)))
+        _connection.commit()
+        
+        return first_id, last_id, accounts, total, elapsed
+        
+    except Exception:
+        _connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def pending_chunks(min_id, max_id, done, chunk_size):
+    """
+    Tranches d'au plus chunk_size identifiants qui couvrent min_id..max_id
+    hors des intervalles déjà traités (first_account_id, last_account_id)
+    de interest_runs, quelle que soit la taille des tranches qui les ont
+    produits
+    """
+    chunks = []
+    start = min_id
+    for first, last in sorted(done) + [(max_id + 1, max_id + 1)]:
+        end = min(first - 1, max_id)
+        chunks.extend((low, min(low + chunk_size - 1, end)) for low in range(start, end + 1, chunk_size))
+        start = max(start, last + 1)
+    return chunks
+
+def accrue_interest(settings, period, chunk_size=5000, workers=4, log=print):
+    """
+    Crédite les intérêts du mois period à tous les comptes d'épargne actifs
+    
+    Les identifiants de comptes sont découpés en tranches de chunk_size,
+    réparties entre workers processus (une connexion chacun). Chaque tranche
+    est traitée en SQL ensembliste (aucune ligne de compte ne transite par
+    Python) et validée dans sa propre transaction avec sa ligne
+    d'avancement (intervalle d'identifiants traité): après une
+    interruption, relancer la commande avec la même période ne traite que
+    les identifiants hors des intervalles enregistrés, redécoupés selon la
+    taille de tranche courante.
+    
+    Args:
+        settings: paramètres de mysql.connector.connect des processus
+        period: date, premier jour du mois crédité
+    
+    Returns:
+        Dict de synthèse (accounts, total_interest, chunks, skipped, failed,
+        elapsed, accounts_per_second)
+    """
+    bounds = execute_query(
+        "SELECT MIN(id) as min_id, MAX(id) as max_id FROM accounts WHERE account_type = 'epargne'"
+    )[0]
+    done = [
+        (row['first_account_id'], row['last_account_id'])
+        for row in execute_query(
+            "SELECT first_account_id, last_account_id FROM interest_runs WHERE period = %s", (period,)
+        )
+    ]
+    
+    pending = []
+    if bounds['min_id'] is not None:
+        pending = pending_chunks(bounds['min_id'], bounds['max_id'], done, chunk_size)
+    
+    log(f"Intérêts {period.strftime('%Y-%m')}: {len(pending)} tranche(s) à traiter, "
+        f"{len(done)} déjà faite(s), {workers} processus")
+    
+    started = time.perf_counter()
+    accounts = 0
+    total_interest = 0
+    failed = []
+    
+    if pending:
+        # spawn: les processus n'héritent ni des sockets ni du pool du parent
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(settings,)
+        ) as executor:
+            futures = {executor.submit(_accrue_chunk, period, start, end): (start, end) for start, end in pending}
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                start, end = futures[future]
+                try:
+                    _, _, chunk_accounts, chunk_total, chunk_elapsed = future.result()
+                except Exception as e:
+                    failed.append((start, end))
+                    log(f"  ✗ comptes {start}-{end}: {e}")
+                    continue
+                
+                accounts += chunk_accounts
+                total_interest += chunk_total
+                elapsed = time.perf_counter() - started
+                log(f"  [{completed}/{len(pending)}] comptes {start}-{end}: {chunk_accounts} crédités "
+                    f"en {chunk_elapsed:.2f}s ({accounts / elapsed:.0f} comptes/s au total)")
+    
+    elapsed = time.perf_counter() - started
+    summary = {
+        'accounts': accounts,
+        'total_interest': total_interest,
+        'chunks': len(pending) - len(failed),
+        'skipped': len(done),
+        'failed': failed,
+        'elapsed': elapsed,
+        'accounts_per_second': accounts / elapsed if elapsed else 0.0
+    }
+    
+    log(f"{'✗' if failed else '✓'} {accounts} comptes crédités ({total_interest} € d'intérêts) "
+        f"en {elapsed:.1f}s, {summary['accounts_per_second']:.0f} comptes/s"
+        + (f", {len(failed)} tranche(s) en échec: relancer la commande" if failed else ""))
+    return summary
@@ -0,0 +1,77 @@
+# backend/jobs/rollups.py
+import time
+from utils.database import execute_query, get_db_connection, run_query
+from utils.ledger import INCOME_TYPES, EXPENSE_TYPES
+
+def _in_list(values):
+    return ', '.join(f"'{value}'" for value in values)
+
+def rebuild_monthly_totals(since=None, chunk_size=5000, log=print):
+    """
+    Recalcule account_monthly_totals depuis la table transactions
+    
+    Le travail est découpé par tranches d'identifiants de comptes, chacune
+    dans sa propre transaction (suppression puis INSERT ... SELECT groupé),
+    pour ne pas verrouiller toute la table pendant la reconstruction.
+    
+    Args:
+        since: date (premier jour d'un mois) à partir de laquelle recalculer;
+               None pour tout l'historique
+        chunk_size: nombre d'identifiants de comptes par tranche
+    
+    Returns:
+        Nombre de lignes de cumuls écrites
+    """
+    bounds = execute_query("SELECT MIN(id) as min_id, MAX(id) as max_id FROM accounts")[0]
+    if bounds['min_id'] is None:
+        return 0
+    
+    connection = get_db_connection()
+    cursor = connection.cursor()
+    started = time.perf_counter()
+    written = 0
+    
+    period_filter = " AND period >= %s" if since else ""
+    date_filter = " AND transaction_date >= %s" if since else ""
+    
+    try:
+        for start in range(bounds['min_id'], bounds['max_id'] + 1, chunk_size):
+            end = start + chunk_size - 1
+            params = (start, end, since) if since else (start, end)
+            
+            run_query(
+                cursor,
+                f"DELETE FROM account_monthly_totals WHERE account_id BETWEEN %s AND %s{period_filter}",
+                params
+            )
+            
+            run_query(
+                cursor,
+                f"""
+                INSERT INTO account_monthly_totals (account_id, period, income, expenses, transaction_count)
+                SELECT account_id,
+                       DATE_SUB(DATE(transaction_date), INTERVAL DAYOFMONTH(transaction_date) - 1 DAY) as period,
+                       COALESCE(SUM(CASE WHEN transaction_type IN ({_in_list(INCOME_TYPES)}) THEN amount ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN transaction_type IN ({_in_list(EXPENSE_TYPES)}) THEN amount ELSE 0 END), 0),
+                       COUNT(*)
+                FROM transactions
+                WHERE account_id BETWEEN %s AND %s{date_filter}
+                AND status = 'completed'
+                GROUP BY account_id, period
+                """,
+                params
+            )
+            written += cursor.rowcount
+            connection.commit()
+            
+            log(f"  comptes {start}-{end}: {written} cumuls écrits")
+        
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    
+    elapsed = time.perf_counter() - started
+    log(f"✓ {written} cumuls mensuels reconstruits en {elapsed:.1f}s")
+    return written
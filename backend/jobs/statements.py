@@ -0,0 +1,362 @@
+# backend/jobs/statements.py
+import csv
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+import mysql.connector
+from utils.database import execute_query, run_query
+from utils.ledger import CREDIT_TYPES
+
+# Comptes d'une tranche et solde d'ouverture de chacun: balance_after de la
+# dernière transaction avant la période (une recherche par compte dans
+# l'index (account_id, transaction_date, id), 0 si aucune)
+ACCOUNTS_SQL = """
+    SELECT a.id, a.account_number, a.account_type, a.iban, a.currency,
+           u.first_name, u.last_name,
+           COALESCE((
+               SELECT t.balance_after FROM transactions t
+               WHERE t.account_id = a.id AND t.transaction_date < %s AND t.status = 'completed'
+               ORDER BY t.transaction_date DESC, t.id DESC
+               LIMIT 1
+           ), 0) as opening_balance
+    FROM accounts a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id BETWEEN %s AND %s
+    AND a.status != 'closed'
+    AND a.created_at < %s
+    ORDER BY a.id
+"""
+
+# Lignes de la période des comptes de la tranche, dans l'ordre de l'index
+# (account_id, transaction_date, id): lues au fil du réseau, sans tri.
+# account_id IN (...) donne un intervalle (compte, période) de l'index par
+# compte, seul le mois du relevé est lu; avec account_id BETWEEN, seule la
+# première colonne de l'index borne la lecture: tout l'historique des
+# comptes de la tranche serait parcouru
+LINES_SQL = """
+    SELECT t.account_id, t.transaction_date, t.reference_number, t.transaction_type,
+           t.description, t.recipient_name, t.amount, t.balance_after
+    FROM transactions t
+    WHERE t.account_id IN ({accounts})
+    AND t.transaction_date >= %s AND t.transaction_date < %s
+    AND t.status = 'completed'
+    ORDER BY t.account_id, t.transaction_date, t.id
+"""
+
+CSV_COLUMNS = ['date', 'reference_number', 'transaction_type', 'description', 'debit', 'credit', 'balance_after']
+
+# Lignes lues par aller-retour sur le curseur non bufferisé
+FETCH_SIZE = 2000
+
+MONTHS = ('janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet',
+          'août', 'septembre', 'octobre', 'novembre', 'décembre')
+
+TEXT_WIDTH = 100
+
+# Connexion du processus de génération (cf. _init_worker)
+_connection = None
+
+@lru_cache(maxsize=16)
+def lines_sql(count):
+    """LINES_SQL pour count comptes"""
+    return LINES_SQL.format(accounts=', '.join(['%s'] * count))
+
+def _init_worker(settings):
+    """Ouvre la connexion du processus: jamais celle du processus parent"""
+    global _connection
+    _connection = mysql.connector.connect(**settings)
+
+def month_bounds(period):
+    """Premier jour de la période et premier jour du mois suivant"""
+    following = (period.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return period, following
+
+def format_amount(amount):
+    """Montant au format français: 1 234,56"""
+    return f"{amount:,.2f}".replace(',', ' ').replace('.', ',')
+
+def format_date(value):
+    return value.strftime('%d/%m/%Y')
+
+class StatementWriter:
+    """
+    Écrit le relevé d'un compte ligne à ligne, en CSV et en texte à
+    imprimer; les fichiers ne sont mis en place (os.replace) qu'une fois
+    complets
+    """
+    
+    def __init__(self, directory, account, start, end):
+        self.account = account
+        self.start = start
+        self.end = end
+        self.balance = account['opening_balance']
+        self.closing = account['opening_balance']
+        self.debits = Decimal('0')
+        self.credits = Decimal('0')
+        self.lines = 0
+        
+        base = os.path.join(directory, account['account_number'])
+        self.paths = [(f"{base}.csv.tmp", f"{base}.csv"), (f"{base}.txt.tmp", f"{base}.txt")]
+        self._csv_file = open(self.paths[0][0], 'w', newline='', encoding='utf-8')
+        self._text = open(self.paths[1][0], 'w', encoding='utf-8')
+        self._csv = csv.writer(self._csv_file)
+        
+        self._csv.writerow(CSV_COLUMNS)
+        self._csv.writerow([start.isoformat(), None, 'opening_balance', 'Solde initial', None, None, self.balance])
+        self._write_header()
+    
+    def _write_header(self):
+        account = self.account
+        last_day = self.end - timedelta(days=1)
+        title = f"RELEVÉ DE COMPTE - {MONTHS[self.start.month - 1]} {self.start.year}"
+        self._text.write(
+            f"{title}\n{'=' * len(title)}\n\n"
+            f"Titulaire : {account['first_name']} {account['last_name']}\n"
+            f"Compte    : {account['account_number']} ({account['account_type']})\n"
+            f"IBAN      : {account['iban']}\n"
+            f"Période   : du {format_date(self.start)} au {format_date(last_day)}"
+            f" - montants en {account['currency']}\n\n"
+            f"{'Date':<12}{'Libellé':<50}{'Débit':>12}{'Crédit':>12}{'Solde':>14}\n"
+            f"{'-' * TEXT_WIDTH}\n"
+            f"{format_date(self.start):<12}{'Solde initial':<50}{'':>12}{'':>12}{format_amount(self.balance):>14}\n"
+        )
+    
+    def add(self, row):
+        """Ajoute une transaction (ligne de LINES_SQL)"""
+        credit = row['transaction_type'] in CREDIT_TYPES
+        amount = row['amount']
+        if credit:
+            self.credits += amount
+            self.balance += amount
+        else:
+            self.debits += amount
+            self.balance -= amount
+        self.closing = row['balance_after']
+        self.lines += 1
+        
+        label = row['description'] or row['recipient_name'] or row['transaction_type']
+        self._csv.writerow([
+            row['transaction_date'].isoformat(), row['reference_number'], row['transaction_type'], label,
+            None if credit else amount, amount if credit else None, row['balance_after']
+        ])
+        self._text.write(
+            f"{format_date(row['transaction_date']):<12}{label[:48]:<50}"
+            f"{'' if credit else format_amount(amount):>12}{format_amount(amount) if credit else '':>12}"
+            f"{format_amount(row['balance_after']):>14}\n"
+        )
+    
+    def close(self):
+        """
+        Termine le relevé
+        
+        Returns:
+            True si le solde final correspond au solde initial plus les
+            mouvements de la période
+        """
+        last_day = self.end - timedelta(days=1)
+        self._csv.writerow([last_day.isoformat(), None, 'closing_balance', 'Solde final',
+                            self.debits, self.credits, self.closing])
+        self._text.write(
+            f"{'-' * TEXT_WIDTH}\n"
+            f"{'':<12}{'Total des mouvements':<50}{format_amount(self.debits):>12}{format_amount(self.credits):>12}\n"
+            f"{format_date(last_day):<12}{'Solde final':<50}{'':>12}{'':>12}{format_amount(self.closing):>14}\n"
+        )
+        
+        self._csv_file.close()
+        self._text.close()
+        for temporary, final in self.paths:
+            os.replace(temporary, final)
+        
+        return self.balance == self.closing
+    
+    def abort(self):
+        self._csv_file.close()
+        self._text.close()
+        for temporary, _ in self.paths:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+def _generate_chunk(period, first_id, last_id, directory):
+    """
+    Écrit les relevés des comptes first_id..last_id
+    
+    Les soldes d'ouverture et les lignes sont lus dans le même instantané
+    (REPEATABLE READ) et les lignes sont lues au fil de l'eau: la mémoire
+    utilisée ne dépend pas du nombre de transactions.
+    
+    Returns:
+        Tuple (first_id, last_id, relevés écrits, lignes, comptes incohérents, durée en secondes)
+    """
+    start, end = month_bounds(period)
+    started = time.perf_counter()
+    statements = lines = 0
+    mismatches = []
+    
+    accounts_cursor = _connection.cursor(dictionary=True)
+    lines_cursor = _connection.cursor(dictionary=True, buffered=False)
+    
+    try:
+        accounts = run_query(accounts_cursor, ACCOUNTS_SQL, (start, first_id, last_id, end), fetch=True)
+        if not accounts:
+            return first_id, last_id, 0, 0, [], time.perf_counter() - started
+        
+        account_ids = [account['id'] for account in accounts]
+        run_query(lines_cursor, lines_sql(len(account_ids)), (*account_ids, start, end))
+        pending = []
+        
+        def next_row():
+            # Lecture par lots de FETCH_SIZE lignes
+            if not pending:
+                pending.extend(reversed(lines_cursor.fetchmany(FETCH_SIZE)))
+            return pending.pop() if pending else None
+        
+        row = next_row()
+        for account in accounts:
+            # Lignes de comptes sans relevé (clôturés depuis): ignorées
+            while row is not None and row['account_id'] < account['id']:
+                row = next_row()
+            
+            writer = StatementWriter(directory, account, start, end)
+            try:
+                while row is not None and row['account_id'] == account['id']:
+                    writer.add(row)
+                    row = next_row()
+            except Exception:
+                writer.abort()
+                raise
+            
+            lines += writer.lines
+            statements += 1
+            if not writer.close():
+                mismatches.append(account['account_number'])
+        
+        return first_id, last_id, statements, lines, mismatches, time.perf_counter() - started
+        
+    finally:
+        # Lignes restantes (comptes clôturés) ou erreur en cours de lecture:
+        # le résultat non bufferisé doit être lu avant de libérer l'instantané
+        if _connection.unread_result:
+            _connection.consume_results()
+        lines_cursor.close()
+        accounts_cursor.close()
+        _connection.rollback()
+
+def generate_statements(settings, period, directory='statements', chunk_size=2000, workers=4, log=print):
+    """
+    Écrit le relevé du mois period de chaque compte non clôturé:
+    <directory>/<AAAA-MM>/<numéro de compte>.csv et .txt
+    
+    Chaque relevé contient le solde d'ouverture, toutes les transactions du
+    mois avec leur balance_after et le solde de clôture. Les comptes sont
+    découpés en tranches d'identifiants réparties entre workers processus,
+    chacun avec sa connexion; une relance réécrit tous les fichiers.
+    
+    Args:
+        settings: paramètres de mysql.connector.connect des processus
+                  (réplica en lecture de préférence)
+        period: date, premier jour du mois
+    
+    Returns:
+        Dict de synthèse (statements, lines, mismatches, failed, elapsed,
+        accounts_per_second, directory)
+    """
+    directory = os.path.join(directory, period.strftime('%Y-%m'))
+    os.makedirs(directory, exist_ok=True)
+    
+    bounds = execute_query("SELECT MIN(id) as min_id, MAX(id) as max_id FROM accounts")[0]
+    chunks = []
+    if bounds['min_id'] is not None:
+        chunks = [
+            (start, start + chunk_size - 1)
+            for start in range(bounds['min_id'], bounds['max_id'] + 1, chunk_size)
+        ]
+    
+    log(f"Relevés {period.strftime('%Y-%m')} dans {directory}: {len(chunks)} tranche(s), {workers} processus")
+    
+    started = time.perf_counter()
+    statements = lines = 0
+    mismatches = []
+    failed = []
+    
+    if chunks:
+        # spawn: les processus n'héritent ni des sockets ni du pool du parent
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(settings,)
+        ) as executor:
+            futures = {
+                executor.submit(_generate_chunk, period, start, end, directory): (start, end)
+                for start, end in chunks
+            }
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                start, end = futures[future]
+                try:
+                    _, _, chunk_statements, chunk_lines, chunk_mismatches, chunk_elapsed = future.result()
+                except Exception as e:
+                    failed.append((start, end))
+                    log(f"  ✗ comptes {start}-{end}: {e}")
+                    continue
+                
+                statements += chunk_statements
+                lines += chunk_lines
+                mismatches.extend(chunk_mismatches)
+                for account_number in chunk_mismatches:
+                    log(f"  ! compte {account_number}: solde final différent du solde initial plus les mouvements")
+                
+                elapsed = time.perf_counter() - started
+                log(f"  [{completed}/{len(chunks)}] comptes {start}-{end}: {chunk_statements} relevés, "
+                    f"{chunk_lines} lignes en {chunk_elapsed:.2f}s ({statements / elapsed:.0f} comptes/s au total)")
+    
+    elapsed = time.perf_counter() - started
+    summary = {
+        'statements': statements,
+        'lines': lines,
+        'mismatches': mismatches,
+        'failed': failed,
+        'elapsed': elapsed,
+        'accounts_per_second': statements / elapsed if elapsed else 0.0,
+        'directory': directory
+    }
+    
+    log(f"{'✗' if failed else '✓'} {statements} relevés ({lines} lignes) en {elapsed:.1f}s, "
+        f"{summary['accounts_per_second']:.0f} comptes/s"
+        + (f", {len(failed)} tranche(s) en échec: relancer la commande" if failed else ""))
+    return summary
+
+def explain_statement_lines(period, chunk_size=2000, log=print):
+    """
+    Affiche le plan d'exécution (EXPLAIN) des requêtes de la première
+    tranche: LINES_SQL doit parcourir l'index idx_account_date_id en
+    intervalles (type range), sans filesort
+    """
+    start, end = month_bounds(period)
+    first_id = execute_query("SELECT MIN(id) as min_id FROM accounts")[0]['min_id']
+    if first_id is None:
+        log("Aucun compte")
+        return []
+    
+    last_id = first_id + chunk_size - 1
+    account_ids = [row['id'] for row in execute_query(
+        "SELECT id FROM accounts WHERE id BETWEEN %s AND %s AND status != 'closed' ORDER BY id",
+        (first_id, last_id)
+    )] or [first_id]
+    
+    plans = []
+    for name, query, params in (
+        ('ACCOUNTS_SQL', ACCOUNTS_SQL, (start, first_id, last_id, end)),
+        ('LINES_SQL', lines_sql(len(account_ids)), (*account_ids, start, end))
+    ):
+        rows = execute_query(f"EXPLAIN {query}", params)
+        log(f"{name} (comptes {first_id}-{last_id}, {len(account_ids)} comptes):")
+        for row in rows:
+            log(f"  {row['table']}: type={row['type']} key={row['key']} key_len={row['key_len']} "
+                f"rows={row['rows']} Extra={row['Extra']}")
+        plans.append((name, rows))
+    return plans
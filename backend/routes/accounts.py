@@ -1,43 +1,128 @@
 # backend/routes/accounts.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.database import execute_query
+from utils.database import execute_query, execute_prepared, fetch_columns, read_only
+from utils.ledger import CURRENT_PERIOD_SQL, INCOME_TYPES, EXPENSE_TYPES
+from utils.cache import get_account_meta, invalidate_account
+from utils.pagination import parse_date
+from utils import analytics
+from routes.transactions import history_filters
 from decimal import Decimal
 
 accounts_bp = Blueprint('accounts', __name__)
 
-def decimal_to_float(obj):
-    """Convertit les Decimal en float pour la sérialisation JSON"""
-    if isinstance(obj, Decimal):
-        return float(obj)
-    raise TypeError
+# Statistiques du mois en cours, regroupées par utilisateur, lues dans les
+# cumuls mensuels tenus à jour par utils/ledger.py (une ligne par compte)
+# (utilisable seule ou comme table dérivée, cf. routes/dashboard.py)
+MONTHLY_STATS_QUERY = f"""
+    SELECT 
+        a.user_id,
+        COALESCE(SUM(m.income), 0) as monthly_income,
+        COALESCE(SUM(m.expenses), 0) as monthly_expenses
+    FROM account_monthly_totals m
+    JOIN accounts a ON m.account_id = a.id
+    WHERE a.user_id = %s 
+    AND m.period = {CURRENT_PERIOD_SQL}
+    GROUP BY a.user_id
+"""
+
+# Comptes non clôturés d'un utilisateur
+ACCOUNTS_QUERY = """
+    SELECT id, account_number, account_type, balance, currency, iban, 
+           status, overdraft_limit, interest_rate, created_at
+    FROM accounts
+    WHERE user_id = %s AND status != 'closed'
+    ORDER BY created_at ASC
+"""
+
+# Solde courant d'un compte (jamais mis en cache)
+ACCOUNT_BALANCE_QUERY = "SELECT balance FROM accounts WHERE id = %s AND user_id = %s"
+
+# Soldes cumulés des comptes actifs d'un utilisateur
+ACCOUNTS_SUMMARY_QUERY = """
+    SELECT 
+        COUNT(*) as total_accounts,
+        COALESCE(SUM(balance), 0) as total_balance,
+        COALESCE(SUM(CASE WHEN account_type = 'courant' THEN balance ELSE 0 END), 0) as checking_balance,
+        COALESCE(SUM(CASE WHEN account_type = 'epargne' THEN balance ELSE 0 END), 0) as savings_balance
+    FROM accounts
+    WHERE user_id = %s AND status = 'active'
+"""
+
+# Colonnes de l'analyse des dépenses (cf. utils/analytics.py): montants en
+# centimes entiers et mois AAAAMM calculés par MySQL, pas de Decimal ni de date.
+# Le bénéficiaire d'un paiement par carte est le commerçant, enregistré dans
+# description (recipient_name n'est renseigné que pour les virements)
+ANALYTICS_QUERY = f"""
+    SELECT t.transaction_type IN ({', '.join(f"'{t}'" for t in INCOME_TYPES)}) AS is_income,
+           CAST(t.amount * 100 AS SIGNED) AS cents,
+           EXTRACT(YEAR_MONTH FROM t.transaction_date) AS period,
+           t.category,
+           CASE WHEN t.transaction_type = 'payment' THEN t.description ELSE t.recipient_name END AS counterparty
+    FROM transactions t
+    JOIN accounts a ON t.account_id = a.id
+    WHERE {{where}}
+"""
+
+def fetch_accounts(user_id):
+    """Récupère les comptes non clôturés d'un utilisateur (lignes brutes)"""
+    return execute_query(ACCOUNTS_QUERY, (user_id,))
+
+def summarize_accounts(accounts, monthly_income=0, monthly_expenses=0):
+    """
+    Calcule le résumé à partir des lignes brutes de fetch_accounts
+    (mêmes règles que /summary: seuls les comptes actifs sont comptés)
+    """
+    active = [a for a in accounts if a['status'] == 'active']
+    
+    summary = {
+        'total_accounts': len(active),
+        'total_balance': sum((a['balance'] for a in active), Decimal('0')),
+        'checking_balance': sum((a['balance'] for a in active if a['account_type'] == 'courant'), Decimal('0')),
+        'savings_balance': sum((a['balance'] for a in active if a['account_type'] == 'epargne'), Decimal('0')),
+        'monthly_income': monthly_income or Decimal('0'),
+        'monthly_expenses': monthly_expenses or Decimal('0')
+    }
+    summary['monthly_savings'] = summary['monthly_income'] - summary['monthly_expenses']
+    
+    return summary
+
+def add_monthly_stats(summary, monthly_stats):
+    """Complète le résumé avec le résultat de MONTHLY_STATS_QUERY"""
+    # Aucune ligne si aucune transaction ce mois-ci
+    monthly = monthly_stats[0] if monthly_stats else {}
+    summary['monthly_income'] = monthly.get('monthly_income') or Decimal('0')
+    summary['monthly_expenses'] = monthly.get('monthly_expenses') or Decimal('0')
+    summary['monthly_savings'] = summary['monthly_income'] - summary['monthly_expenses']
+    return summary
+
+def account_details(meta, balance):
+    """Réponse de GET /accounts/<id> à partir des attributs en cache et du solde"""
+    return {
+        'id': meta['id'],
+        'account_number': meta['account_number'],
+        'account_type': meta['account_type'],
+        'balance': balance,
+        'currency': meta['currency'],
+        'iban': meta['iban'],
+        'status': meta['status'],
+        'overdraft_limit': meta['overdraft_limit'],
+        'interest_rate': meta['interest_rate'],
+        'created_at': meta['created_at'],
+        'first_name': meta['first_name'],
+        'last_name': meta['last_name']
+    }
 
 @accounts_bp.route('/', methods=['GET'])
 @jwt_required()
+@read_only
 def get_accounts():
     """Récupère tous les comptes de l'utilisateur"""
     try:
         current_user = get_jwt_identity()
         user_id = current_user['user_id']
         
-        accounts = execute_query(
-            """
-            SELECT id, account_number, account_type, balance, currency, iban, 
-                   status, overdraft_limit, interest_rate, created_at
-            FROM accounts
-            WHERE user_id = %s AND status != 'closed'
-            ORDER BY created_at ASC
-            """,
-            (user_id,)
-        )
-        
-        # Convertir les Decimal en float et les dates en ISO
-        for account in accounts:
-            account['balance'] = float(account['balance'])
-            account['overdraft_limit'] = float(account['overdraft_limit'])
-            account['interest_rate'] = float(account['interest_rate'])
-            if account.get('created_at'):
-                account['created_at'] = account['created_at'].isoformat()
+        accounts = fetch_accounts(user_id)
         
         return jsonify({'accounts': accounts}), 200
         
@@ -46,42 +131,95 @@ def get_accounts():
 
 @accounts_bp.route('/<int:account_id>', methods=['GET'])
 @jwt_required()
+@read_only
 def get_account_details(account_id):
     """Récupère les détails d'un compte spécifique"""
     try:
         current_user = get_jwt_identity()
         user_id = current_user['user_id']
         
-        account = execute_query(
-            """
-            SELECT a.id, a.account_number, a.account_type, a.balance, a.currency, 
-                   a.iban, a.status, a.overdraft_limit, a.interest_rate, a.created_at,
-                   u.first_name, u.last_name
-            FROM accounts a
-            JOIN users u ON a.user_id = u.id
-            WHERE a.id = %s AND a.user_id = %s
-            """,
-            (account_id, user_id)
-        )
+        # Attributs stables depuis le cache, seul le solde est lu en base
+        meta = get_account_meta(account_id)
         
-        if not account:
+        if not meta or meta['user_id'] != user_id:
             return jsonify({'error': 'Compte non trouvé'}), 404
         
-        account_data = account[0]
-        account_data['balance'] = float(account_data['balance'])
-        account_data['overdraft_limit'] = float(account_data['overdraft_limit'])
-        account_data['interest_rate'] = float(account_data['interest_rate'])
+        balance = execute_prepared(ACCOUNT_BALANCE_QUERY, (account_id, user_id))
         
-        if account_data.get('created_at'):
-            account_data['created_at'] = account_data['created_at'].isoformat()
+        if not balance:
+            invalidate_account(account_id)
+            return jsonify({'error': 'Compte non trouvé'}), 404
         
-        return jsonify({'account': account_data}), 200
+        return jsonify({'account': account_details(meta, balance[0]['balance'])}), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération du compte: {str(e)}'}), 500
 
+def parse_analytics_args(args):
+    """
+    Lit la période de l'analyse (date_from / date_to, AAAA-MM-JJ, par défaut
+    les 12 derniers mois), account_id, window et limit
+    
+    Raises:
+        ValueError si la période est invalide ou trop longue
+    """
+    date_from, date_to = analytics.default_period()
+    if args.get('date_from'):
+        date_from = parse_date(args['date_from'])
+    if args.get('date_to'):
+        date_to = parse_date(args['date_to'])
+    
+    if date_from > date_to:
+        raise ValueError("date_from doit être antérieure ou égale à date_to")
+    if analytics.month_number(date_to) - analytics.month_number(date_from) >= analytics.MAX_MONTHS:
+        raise ValueError(f"Période limitée à {analytics.MAX_MONTHS} mois")
+    
+    return {
+        'account_id': args.get('account_id', type=int),
+        'date_from': date_from,
+        'date_to': date_to,
+        'window': min(max(args.get('window', 3, type=int), 1), 12),
+        'limit': min(max(args.get('limit', 10, type=int), 1), 50)
+    }
+
+@accounts_bp.route('/analytics', methods=['GET'])
+@jwt_required()
+@read_only
+def get_accounts_analytics():
+    """Analyse des revenus et dépenses de l'utilisateur, ou d'un de ses comptes, sur une période"""
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        try:
+            params = parse_analytics_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Seules les transactions effectuées comptent, comme dans les cumuls mensuels
+        where, where_params = history_filters(
+            user_id,
+            account_id=params['account_id'],
+            date_from=params['date_from'],
+            date_to=params['date_to'],
+            types=INCOME_TYPES + EXPENSE_TYPES,
+            statuses=('completed',)
+        )
+        columns = fetch_columns(ANALYTICS_QUERY.format(where=where), tuple(where_params))
+        
+        result = analytics.spending_analytics(
+            columns, params['date_from'], params['date_to'], params['window'], params['limit']
+        )
+        result['account_id'] = params['account_id']
+        
+        return jsonify({'analytics': result}), 200
+        
+    except Exception as e:
+        return jsonify({'error': f"Erreur lors de l'analyse des dépenses: {str(e)}"}), 500
+
 @accounts_bp.route('/summary', methods=['GET'])
 @jwt_required()
+@read_only
 def get_accounts_summary():
     """Récupère un résumé de tous les comptes (solde total, etc.)"""
     try:
@@ -89,43 +227,11 @@ def get_accounts_summary():
         user_id = current_user['user_id']
         
         # Récupérer le solde total
-        result = execute_query(
-            """
-            SELECT 
-                COUNT(*) as total_accounts,
-                COALESCE(SUM(balance), 0) as total_balance,
-                COALESCE(SUM(CASE WHEN account_type = 'courant' THEN balance ELSE 0 END), 0) as checking_balance,
-                COALESCE(SUM(CASE WHEN account_type = 'epargne' THEN balance ELSE 0 END), 0) as savings_balance
-            FROM accounts
-            WHERE user_id = %s AND status = 'active'
-            """,
-            (user_id,)
-        )
-        
-        summary = result[0]
-        summary['total_balance'] = float(summary['total_balance'] or 0)
-        summary['checking_balance'] = float(summary['checking_balance'] or 0)
-        summary['savings_balance'] = float(summary['savings_balance'] or 0)
+        result = execute_query(ACCOUNTS_SUMMARY_QUERY, (user_id,))
         
         # Récupérer les statistiques mensuelles
-        monthly_stats = execute_query(
-            """
-            SELECT 
-                COALESCE(SUM(CASE WHEN t.transaction_type IN ('deposit', 'transfer_in') THEN t.amount ELSE 0 END), 0) as monthly_income,
-                COALESCE(SUM(CASE WHEN t.transaction_type IN ('withdrawal', 'transfer_out', 'payment') THEN t.amount ELSE 0 END), 0) as monthly_expenses
-            FROM transactions t
-            JOIN accounts a ON t.account_id = a.id
-            WHERE a.user_id = %s 
-            AND t.transaction_date >= DATE_FORMAT(NOW(), '%%Y-%%m-01')
-            AND t.status = 'completed'
-            """,
-            (user_id,)
-        )
-        
-        if monthly_stats:
-            summary['monthly_income'] = float(monthly_stats[0]['monthly_income'] or 0)
-            summary['monthly_expenses'] = float(monthly_stats[0]['monthly_expenses'] or 0)
-            summary['monthly_savings'] = summary['monthly_income'] - summary['monthly_expenses']
+        monthly_stats = execute_query(MONTHLY_STATS_QUERY, (user_id,))
+        summary = add_monthly_stats(result[0], monthly_stats)
         
         return jsonify({'summary': summary}), 200
         
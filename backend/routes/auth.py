@@ -1,10 +1,12 @@
 # backend/routes/auth.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.database import execute_query
+from utils.database import execute_query, execute_prepared, read_only, pin_primary
 from utils.security import (
     hash_password, 
     verify_password, 
+    password_needs_rehash,
+    PasswordWorkRejected,
     validate_password_strength,
     validate_email,
     create_user_token,
@@ -12,11 +14,14 @@ from utils.security import (
     generate_iban,
     sanitize_input
 )
+from utils.iban_index import iban_index
+from utils.rate_limit import auth_throttled
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@auth_throttled
 def register():
     """Inscription d'un nouvel utilisateur"""
     try:
@@ -79,7 +84,7 @@ def register():
         account_number = generate_account_number()
         iban = generate_iban(account_number=account_number)
         
-        execute_query(
+        account_id = execute_query(
             """
             INSERT INTO accounts (user_id, account_number, account_type, balance, 
                                 iban, overdraft_limit)
@@ -88,6 +93,11 @@ def register():
             (user_id, account_number, iban),
             commit=True
         )
+        iban_index.add(iban, account_id)
+        
+        # Lectures suivantes sur le serveur principal, le temps que le
+        # réplica reçoive le nouvel utilisateur
+        pin_primary(user_id)
         
         # Créer un token JWT
         token = create_user_token(user_id, {'username': username})
@@ -99,10 +109,22 @@ def register():
             'username': username
         }), 201
         
+    except PasswordWorkRejected as e:
+        return jsonify({'error': str(e)}), 503
+        
     except Exception as e:
         return jsonify({'error': f'Erreur lors de l\'inscription: {str(e)}'}), 500
 
+# Requêtes de la connexion, exécutées en instructions préparées
+USER_BY_EMAIL_QUERY = """
+    SELECT id, email, username, password_hash, first_name, last_name, is_active
+    FROM users WHERE email = %s
+"""
+UPDATE_LOGIN_QUERY = "UPDATE users SET last_login = %s WHERE id = %s"
+UPDATE_LOGIN_REHASH_QUERY = "UPDATE users SET last_login = %s, password_hash = %s WHERE id = %s"
+
 @auth_bp.route('/login', methods=['POST'])
+@auth_throttled
 def login():
     """Connexion d'un utilisateur"""
     try:
@@ -115,13 +137,7 @@ def login():
         email = sanitize_input(data['email'].lower())
         
         # Rechercher l'utilisateur
-        user = execute_query(
-            """
-            SELECT id, email, username, password_hash, first_name, last_name, is_active
-            FROM users WHERE email = %s
-            """,
-            (email,)
-        )
+        user = execute_prepared(USER_BY_EMAIL_QUERY, (email,))
         
         if not user:
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
@@ -136,12 +152,19 @@ def login():
         if not verify_password(data['password'], user['password_hash']):
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
         
-        # Mettre à jour la date de dernière connexion
-        execute_query(
-            "UPDATE users SET last_login = %s WHERE id = %s",
-            (datetime.now(), user['id']),
-            commit=True
-        )
+        # Mettre à jour la date de dernière connexion, et le hash s'il a été
+        # créé avec un ancien coût bcrypt (le mot de passe en clair n'est
+        # disponible qu'ici)
+        if password_needs_rehash(user['password_hash']):
+            execute_prepared(
+                UPDATE_LOGIN_REHASH_QUERY,
+                (datetime.now(), hash_password(data['password']), user['id']),
+                commit=True
+            )
+        else:
+            execute_prepared(UPDATE_LOGIN_QUERY, (datetime.now(), user['id']), commit=True)
+        
+        pin_primary(user['id'])
         
         # Créer un token JWT
         token = create_user_token(user['id'], {'username': user['username']})
@@ -158,37 +181,34 @@ def login():
             }
         }), 200
         
+    except PasswordWorkRejected as e:
+        return jsonify({'error': str(e)}), 503
+        
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la connexion: {str(e)}'}), 500
 
+# Profil public d'un utilisateur (sans le hash du mot de passe)
+PROFILE_QUERY = """
+    SELECT id, email, username, first_name, last_name, phone_number,
+           date_of_birth, address, created_at, last_login
+    FROM users WHERE id = %s
+"""
+
 @auth_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@read_only
 def get_profile():
     """Récupère le profil de l'utilisateur connecté"""
     try:
         current_user = get_jwt_identity()
         user_id = current_user['user_id']
         
-        user = execute_query(
-            """
-            SELECT id, email, username, first_name, last_name, phone_number,
-                   date_of_birth, address, created_at, last_login
-            FROM users WHERE id = %s
-            """,
-            (user_id,)
-        )
+        user = execute_query(PROFILE_QUERY, (user_id,))
         
         if not user:
             return jsonify({'error': 'Utilisateur non trouvé'}), 404
         
-        user_data = user[0]
-        
-        # Convertir les dates en chaînes ISO
-        for field in ['created_at', 'last_login', 'date_of_birth']:
-            if user_data.get(field):
-                user_data[field] = user_data[field].isoformat()
-        
-        return jsonify({'user': user_data}), 200
+        return jsonify({'user': user[0]}), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération du profil: {str(e)}'}), 500
@@ -235,5 +255,8 @@ def change_password():
         
         return jsonify({'message': 'Mot de passe modifié avec succès'}), 200
         
+    except PasswordWorkRejected as e:
+        return jsonify({'error': str(e)}), 503
+        
     except Exception as e:
         return jsonify({'error': f'Erreur lors du changement de mot de passe: {str(e)}'}), 500
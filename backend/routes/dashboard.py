@@ -0,0 +1,71 @@
+# backend/routes/dashboard.py
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from utils.database import execute_query, read_only
+from routes.accounts import MONTHLY_STATS_QUERY, fetch_accounts, summarize_accounts
+from routes.transactions import fetch_transactions, MAX_PER_PAGE
+
+dashboard_bp = Blueprint('dashboard', __name__)
+
+# Profil et statistiques du mois (paramètres: user_id, user_id)
+DASHBOARD_USER_QUERY = f"""
+    SELECT u.id, u.email, u.username, u.first_name, u.last_name, u.phone_number,
+           u.date_of_birth, u.address, u.created_at, u.last_login,
+           m.monthly_income, m.monthly_expenses
+    FROM users u
+    LEFT JOIN ({MONTHLY_STATS_QUERY}) m ON m.user_id = u.id
+    WHERE u.id = %s
+"""
+
+def dashboard_limit(args):
+    """Nombre de transactions demandé (transactions_limit, 5 par défaut)"""
+    return min(max(args.get('transactions_limit', 5, type=int), 1), MAX_PER_PAGE)
+
+def build_dashboard(user_data, accounts, transactions, next_cursor, limit):
+    """Assemble la réponse à partir des lignes brutes des requêtes de get_dashboard"""
+    monthly_income = user_data.pop('monthly_income')
+    monthly_expenses = user_data.pop('monthly_expenses')
+    
+    return {
+        'user': user_data,
+        'accounts': accounts,
+        'summary': summarize_accounts(accounts, monthly_income, monthly_expenses),
+        'transactions': transactions,
+        'pagination': {
+            'per_page': limit,
+            'has_more': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+    }
+
+@dashboard_bp.route('/', methods=['GET'])
+@jwt_required()
+@read_only
+def get_dashboard():
+    """
+    Récupère en une seule requête HTTP tout ce qu'affiche le tableau de bord:
+    profil, comptes, résumé et dernières transactions
+    
+    Quatre requêtes SQL au lieu de six: le profil est lu avec les
+    statistiques du mois (table dérivée), le résumé des soldes est calculé
+    à partir des comptes déjà chargés, les dernières transactions sont lues
+    compte par compte dans l'index (cf. history_page_query).
+    """
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        limit = dashboard_limit(request.args)
+        
+        user = execute_query(DASHBOARD_USER_QUERY, (user_id, user_id))
+        
+        if not user:
+            return jsonify({'error': 'Utilisateur non trouvé'}), 404
+        
+        accounts = fetch_accounts(user_id)
+        transactions, next_cursor = fetch_transactions(user_id, limit)
+        
+        return jsonify(build_dashboard(user[0], accounts, transactions, next_cursor, limit)), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors de la récupération du tableau de bord: {str(e)}'}), 500
@@ -1,86 +1,474 @@
 # backend/routes/transactions.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from utils.database import execute_query, get_db_connection
-from utils.security import validate_iban, generate_reference_number, sanitize_input
+from utils.database import execute_query, stream_query, get_read_connection, read_only
+from utils.security import validate_iban, sanitize_input
+from utils.pagination import encode_cursor, decode_cursor, parse_bool, parse_date, parse_list, parse_decimal
+from utils.serialization import dumps_bytes
+from utils.validators import validate_amount, parse_account_id
+from utils.ledger import (
+    post_deposit,
+    post_withdrawal,
+    post_transfer,
+    post_payment,
+    post_operations,
+    deposit_operation,
+    withdrawal_operation,
+    payment_operation,
+    transfer_operation,
+    PostingError,
+    AccountNotFoundError,
+    InsufficientFundsError,
+    OperationAbortedError
+)
 from decimal import Decimal
-from datetime import datetime
-import mysql.connector
+from datetime import date, timedelta
+import csv
+import io
+import re
 
 transactions_bp = Blueprint('transactions', __name__)
 
+# Nombre maximum de transactions par page
+MAX_PER_PAGE = 100
+
+# Nombre maximum d'opérations par appel à /batch
+MAX_BATCH_OPERATIONS = 500
+
+# Champs requis par type d'opération de /batch (mêmes règles que les routes unitaires)
+BATCH_REQUIRED_FIELDS = {
+    'deposit': ['account_id', 'amount'],
+    'withdrawal': ['account_id', 'amount'],
+    'payment': ['account_id', 'merchant', 'amount', 'category'],
+    'transfer': ['source_account_id', 'recipient_iban', 'amount', 'description']
+}
+
+# Valeurs des filtres type et status (ENUM de la table transactions)
+TRANSACTION_TYPES = ('deposit', 'withdrawal', 'transfer_out', 'transfer_in', 'payment', 'interest', 'fee')
+TRANSACTION_STATUSES = ('pending', 'completed', 'failed', 'cancelled')
+
+# Recherche plein texte (index ft_counterparty): les mots plus courts que
+# innodb_ft_min_token_size (3 par défaut) ne sont pas indexés
+SEARCH_MIN_WORD_LENGTH = 3
+SEARCH_MAX_WORDS = 5
+
+# Nombre de lignes lues par aller-retour lors d'un export
+EXPORT_BATCH_SIZE = 1000
+
+# Colonnes de l'historique (listes, export)
+HISTORY_COLUMNS = [
+    'id', 'transaction_type', 'amount', 'balance_after', 'description',
+    'recipient_name', 'category', 'status', 'transaction_date',
+    'reference_number', 'account_number', 'account_type'
+]
+
+HISTORY_SELECT = """
+    SELECT t.id, t.transaction_type, t.amount, t.balance_after, 
+           t.description, t.recipient_name, t.category, t.status, 
+           t.transaction_date, t.reference_number,
+           a.account_number, a.account_type
+    FROM transactions t
+    JOIN accounts a ON t.account_id = a.id
+"""
+
+# Comptes de l'utilisateur (clôturés compris), pour l'historique tous comptes
+USER_ACCOUNT_IDS_QUERY = "SELECT id FROM accounts WHERE user_id = %s ORDER BY id"
+
+def search_query(text):
+    """
+    Requête booléenne plein texte: chaque mot est obligatoire et pris comme
+    préfixe ("dupont loy" → "+dupont* +loy*")
+    
+    Raises:
+        ValueError si aucun mot n'est assez long pour l'index
+    """
+    words = [word for word in re.findall(r'\w+', text) if len(word) >= SEARCH_MIN_WORD_LENGTH]
+    if not words:
+        raise ValueError(f"q: au moins un mot de {SEARCH_MIN_WORD_LENGTH} caractères")
+    return ' '.join(f"+{word}*" for word in words[:SEARCH_MAX_WORDS])
+
+def parse_history_args(args):
+    """
+    Lit les filtres de l'historique dans les paramètres de la requête:
+    account_id, date_from / date_to (AAAA-MM-JJ, bornes incluses),
+    type, category, status (listes séparées par des virgules),
+    amount_min / amount_max (bornes incluses), iban (préfixe de l'IBAN
+    du bénéficiaire) et q (nom du bénéficiaire ou libellé)
+    
+    Raises:
+        ValueError si un filtre est invalide
+    """
+    filters = {'account_id': args.get('account_id', type=int)}
+    
+    if args.get('date_from'):
+        filters['date_from'] = parse_date(args['date_from'])
+    if args.get('date_to'):
+        filters['date_to'] = parse_date(args['date_to'])
+    
+    if filters.get('date_from') and filters.get('date_to') and filters['date_from'] > filters['date_to']:
+        raise ValueError("date_from doit être antérieure ou égale à date_to")
+    
+    if args.get('type'):
+        filters['types'] = parse_list(args['type'], 'type', TRANSACTION_TYPES)
+    if args.get('category'):
+        filters['categories'] = parse_list(args['category'], 'category')
+    if args.get('status'):
+        filters['statuses'] = parse_list(args['status'], 'status', TRANSACTION_STATUSES)
+    
+    if args.get('amount_min'):
+        filters['amount_min'] = parse_decimal(args['amount_min'], 'amount_min')
+    if args.get('amount_max'):
+        filters['amount_max'] = parse_decimal(args['amount_max'], 'amount_max')
+    
+    if filters.get('amount_min') is not None and filters.get('amount_max') is not None \
+            and filters['amount_min'] > filters['amount_max']:
+        raise ValueError("amount_min doit être inférieur ou égal à amount_max")
+    
+    if args.get('iban'):
+        iban = args['iban'].replace(' ', '').upper()
+        if not iban.isalnum() or len(iban) > 34:
+            raise ValueError(f"IBAN invalide: {args['iban']}")
+        filters['iban'] = iban
+    
+    if args.get('q'):
+        filters['search'] = search_query(args['q'])
+    
+    return filters
+
+def parse_history_page(args):
+    """
+    Lit les paramètres de pagination et les filtres de l'historique
+    
+    Returns:
+        dict (page, per_page, cursor_mode, include_total, filters, after)
+    
+    Raises:
+        ValueError si un filtre ou le curseur est invalide
+    """
+    cursor_mode = 'cursor' in args
+    
+    page = {
+        'page': max(args.get('page', 1, type=int), 1),
+        'per_page': min(max(args.get('per_page', 10, type=int), 1), MAX_PER_PAGE),
+        'cursor_mode': cursor_mode,
+        # Le total n'est calculé par défaut qu'en mode page
+        'include_total': parse_bool(args.get('include_total', None if cursor_mode else '1')),
+        'filters': parse_history_args(args),
+        'after': None
+    }
+    
+    if cursor_mode and args.get('cursor'):
+        page['after'] = decode_cursor(args['cursor'])
+    
+    return page
+
+def history_count_query(user_id, filters):
+    """Requête du nombre total de lignes de l'historique filtré"""
+    where, params = history_filters(user_id, **filters)
+    query = f"""
+        SELECT COUNT(*) as total
+        FROM transactions t
+        JOIN accounts a ON t.account_id = a.id
+        WHERE {where}
+    """
+    return query, tuple(params)
+
+def history_pagination(page, next_cursor, total=None):
+    """Objet pagination de la réponse de GET /transactions/"""
+    pagination = {
+        'per_page': page['per_page'],
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor
+    }
+    
+    if not page['cursor_mode']:
+        pagination['page'] = page['page']
+    
+    if total is not None:
+        pagination['total'] = total
+        pagination['pages'] = (total + page['per_page'] - 1) // page['per_page']
+    
+    return pagination
+
+def history_filters(user_id, account_id=None, date_from=None, date_to=None, types=None,
+                    categories=None, statuses=None, amount_min=None, amount_max=None,
+                    iban=None, search=None):
+    """
+    Construit la clause WHERE de l'historique d'un utilisateur
+    
+    Chaque filtre s'appuie sur un index (account_id, colonne, ...) de la
+    table transactions, parcouru pour chacun des comptes de l'utilisateur,
+    ou sur l'index plein texte ft_counterparty (cf. migration 003)
+    
+    Returns:
+        Tuple (clause SQL, liste de paramètres) sur les alias t (transactions) et a (accounts)
+    """
+    clause = "a.user_id = %s"
+    params = [user_id]
+    
+    if account_id:
+        clause += " AND t.account_id = %s"
+        params.append(account_id)
+    
+    if date_from:
+        clause += " AND t.transaction_date >= %s"
+        params.append(date_from)
+    
+    if date_to:
+        # Borne haute incluse: jusqu'au début du jour suivant (exclu)
+        clause += " AND t.transaction_date < %s"
+        params.append(date_to + timedelta(days=1))
+    
+    for column, values in (('transaction_type', types), ('category', categories), ('status', statuses)):
+        if values:
+            clause += f" AND t.{column} IN ({', '.join(['%s'] * len(values))})"
+            params.extend(values)
+    
+    if amount_min is not None:
+        clause += " AND t.amount >= %s"
+        params.append(amount_min)
+    
+    if amount_max is not None:
+        clause += " AND t.amount <= %s"
+        params.append(amount_max)
+    
+    if iban:
+        # IBAN alphanumérique: pas de caractère spécial de LIKE à échapper
+        clause += " AND t.recipient_iban LIKE %s"
+        params.append(f"{iban}%")
+    
+    if search:
+        clause += " AND MATCH(t.recipient_name, t.description) AGAINST (%s IN BOOLEAN MODE)"
+        params.append(search)
+    
+    return clause, params
+
+def needs_account_ids(filters):
+    """Indique si la page porte sur tous les comptes (cf. USER_ACCOUNT_IDS_QUERY)"""
+    return not (filters or {}).get('account_id')
+
+def fetch_transactions(user_id, per_page, filters=None, after=None, offset=None):
+    """
+    Récupère une page de l'historique, du plus récent au plus ancien
+    
+    Args:
+        filters: filtres de history_filters (cf. parse_history_args)
+        after: position (transaction_date, id) de la dernière ligne déjà vue (keyset)
+        offset: décalage LIMIT/OFFSET (mode page)
+    
+    Returns:
+        Tuple (transactions formatées, next_cursor ou None s'il n'y a plus de ligne)
+    """
+    account_ids = None
+    if needs_account_ids(filters):
+        account_ids = [row['id'] for row in execute_query(USER_ACCOUNT_IDS_QUERY, (user_id,))]
+    
+    query, params = history_page_query(user_id, per_page, filters, after, offset, account_ids)
+    return split_page(execute_query(query, params), per_page)
+
+def _history_account_query(user_id, filters, after, limit):
+    """SELECT d'une page sur un seul compte (ou sans compte précisé), trié et limité"""
+    where, params = history_filters(user_id, **filters)
+    
+    query = f"{HISTORY_SELECT} WHERE {where}"
+    
+    if after:
+        # Keyset: lignes strictement après la dernière ligne vue
+        after_date, after_id = after
+        query += " AND (t.transaction_date < %s OR (t.transaction_date = %s AND t.id < %s))"
+        params.extend([after_date, after_date, after_id])
+    
+    query += " ORDER BY t.transaction_date DESC, t.id DESC LIMIT %s"
+    params.append(limit)
+    return query, params
+
+def history_page_query(user_id, per_page, filters=None, after=None, offset=None, account_ids=None):
+    """
+    Construit la requête d'une page de l'historique (cf. fetch_transactions)
+    
+    Sur un compte, la page est lue dans l'ordre de l'index
+    idx_account_date_id (account_id, transaction_date, id): pas de tri, au
+    plus offset + per_page + 1 lignes lues. Sur tous les comptes
+    (account_ids, cf. needs_account_ids), un tri global après la jointure
+    obligerait MySQL à trier tout l'historique de l'utilisateur: la page est
+    donc l'UNION ALL des pages de chaque compte, lues chacune dans l'index,
+    triée et limitée ensuite (au plus nombre de comptes × (offset + per_page + 1)
+    lignes).
+    
+    Returns:
+        Tuple (requête SQL, tuple de paramètres)
+    """
+    filters = filters or {}
+    # Une ligne de plus que demandé pour savoir s'il reste une page
+    limit = per_page + 1
+    
+    if not account_ids or len(account_ids) == 1 or filters.get('account_id'):
+        if account_ids and not filters.get('account_id'):
+            filters = dict(filters, account_id=account_ids[0])
+        query, params = _history_account_query(user_id, filters, after, limit)
+    else:
+        subqueries = []
+        params = []
+        for account_id in account_ids:
+            subquery, subquery_params = _history_account_query(
+                user_id, dict(filters, account_id=account_id), after, limit + (offset or 0)
+            )
+            subqueries.append(f"({subquery})")
+            params.extend(subquery_params)
+        
+        query = f"{' UNION ALL '.join(subqueries)} ORDER BY transaction_date DESC, id DESC LIMIT %s"
+        params.append(limit)
+    
+    if offset:
+        query += " OFFSET %s"
+        params.append(offset)
+    
+    return query, tuple(params)
+
+def split_page(transactions, per_page):
+    """
+    Retire la ligne supplémentaire lue par history_page_query
+    
+    Returns:
+        Tuple (transactions de la page, next_cursor ou None)
+    """
+    next_cursor = None
+    if len(transactions) > per_page:
+        transactions = transactions[:per_page]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last['transaction_date'], last['id'])
+    
+    return transactions, next_cursor
+
 @transactions_bp.route('/', methods=['GET'])
 @jwt_required()
+@read_only
 def get_transactions():
-    """Récupère l'historique des transactions de l'utilisateur"""
+    """
+    Récupère l'historique des transactions de l'utilisateur
+    
+    Deux modes de pagination:
+    - page/per_page (LIMIT/OFFSET), conservé pour compatibilité
+    - cursor (keyset sur transaction_date, id): coût constant quelle que
+      soit la profondeur; passer cursor= (vide) pour la première page puis
+      la valeur de next_cursor renvoyée
+    
+    Le total n'est calculé que si include_total=1 (toujours en mode page,
+    sauf include_total=0).
+    
+    Filtres (cf. parse_history_args): account_id, date_from / date_to
+    (AAAA-MM-JJ, bornes incluses), type, category, status (listes séparées
+    par des virgules), amount_min / amount_max (bornes incluses), iban
+    (préfixe de l'IBAN du bénéficiaire), q (nom du bénéficiaire ou libellé)
+    """
     try:
         current_user = get_jwt_identity()
         user_id = current_user['user_id']
         
-        # Paramètres de pagination
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
-        account_id = request.args.get('account_id', type=int)
-        
-        offset = (page - 1) * per_page
-        
-        # Construire la requête avec filtres
-        query = """
-            SELECT t.id, t.transaction_type, t.amount, t.balance_after, 
-                   t.description, t.recipient_name, t.category, t.status, 
-                   t.transaction_date, t.reference_number,
-                   a.account_number, a.account_type
-            FROM transactions t
-            JOIN accounts a ON t.account_id = a.id
-            WHERE a.user_id = %s
-        """
-        
-        params = [user_id]
-        
-        if account_id:
-            query += " AND t.account_id = %s"
-            params.append(account_id)
-        
-        query += " ORDER BY t.transaction_date DESC LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        
-        transactions = execute_query(query, tuple(params))
-        
-        # Formater les résultats
-        for transaction in transactions:
-            transaction['amount'] = float(transaction['amount'])
-            transaction['balance_after'] = float(transaction['balance_after'])
-            if transaction.get('transaction_date'):
-                transaction['transaction_date'] = transaction['transaction_date'].isoformat()
-        
-        # Compter le total pour la pagination
-        count_query = """
-            SELECT COUNT(*) as total
-            FROM transactions t
-            JOIN accounts a ON t.account_id = a.id
-            WHERE a.user_id = %s
-        """
-        count_params = [user_id]
-        
-        if account_id:
-            count_query += " AND t.account_id = %s"
-            count_params.append(account_id)
-        
-        total = execute_query(count_query, tuple(count_params))[0]['total']
+        # Paramètres de pagination et filtres
+        try:
+            page = parse_history_page(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        transactions, next_cursor = fetch_transactions(
+            user_id,
+            page['per_page'],
+            filters=page['filters'],
+            after=page['after'],
+            offset=None if page['cursor_mode'] else (page['page'] - 1) * page['per_page']
+        )
+        
+        total = None
+        if page['include_total']:
+            # Compter le total (parcourt tout l'historique: uniquement sur demande)
+            total = execute_query(*history_count_query(user_id, page['filters']))[0]['total']
         
         return jsonify({
             'transactions': transactions,
-            'pagination': {
-                'page': page,
-                'per_page': per_page,
-                'total': total,
-                'pages': (total + per_page - 1) // per_page
-            }
+            'pagination': history_pagination(page, next_cursor, total)
         }), 200
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors de la récupération des transactions: {str(e)}'}), 500
 
+def export_csv(batches):
+    """Produit l'export CSV, un morceau par lot de lignes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    # En-tête envoyé avant l'exécution de la requête: premier octet immédiat
+    writer.writerow(HISTORY_COLUMNS)
+    yield buffer.getvalue().encode('utf-8')
+    
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            writer.writerow([
+                value.isoformat() if isinstance(value, date) else value
+                for value in (row[column] for column in HISTORY_COLUMNS)
+            ])
+        yield buffer.getvalue().encode('utf-8')
+
+def export_ndjson(batches):
+    """Produit l'export NDJSON (un objet JSON par ligne), un morceau par lot"""
+    for rows in batches:
+        yield b''.join(dumps_bytes(row) + b'\n' for row in rows)
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', export_csv),
+    'ndjson': ('application/x-ndjson', export_ndjson)
+}
+
+@transactions_bp.route('/export', methods=['GET'])
+@jwt_required()
+@read_only
+def export_transactions():
+    """
+    Exporte tout l'historique filtré, du plus ancien au plus récent
+    
+    La réponse est produite au fil de la lecture d'un curseur MySQL non
+    bufferisé: mémoire constante quel que soit le nombre de lignes, ni
+    OFFSET ni COUNT. Paramètres: format (csv ou ndjson) et les filtres de
+    l'historique (cf. parse_history_args): account_id, date_from / date_to,
+    type, category, status, amount_min / amount_max, iban, q
+    """
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        
+        export_format = request.args.get('format', 'csv').lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Format invalide (csv ou ndjson)'}), 400
+        
+        try:
+            filters = parse_history_args(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        where, params = history_filters(user_id, **filters)
+        query = f"{HISTORY_SELECT} WHERE {where} ORDER BY t.transaction_date ASC, t.id ASC"
+        
+        # Emprunter la connexion avant de répondre: un pool épuisé donne
+        # encore une erreur 500 plutôt qu'un export vide
+        get_read_connection()
+        
+        mimetype, writer = EXPORT_FORMATS[export_format]
+        batches = stream_query(query, tuple(params), batch_size=EXPORT_BATCH_SIZE)
+        
+        response = Response(stream_with_context(writer(batches)), mimetype=mimetype)
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="transactions-{date.today().isoformat()}.{export_format}"'
+        )
+        # Pas de mise en tampon par un proxy (nginx, Apache mod_proxy)
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors de l\'export des transactions: {str(e)}'}), 500
+
 @transactions_bp.route('/deposit', methods=['POST'])
 @jwt_required()
 def create_deposit():
@@ -98,58 +486,25 @@ def create_deposit():
         if amount <= 0:
             return jsonify({'error': 'Le montant doit être positif'}), 400
         
-        account_id = data['account_id']
-        description = sanitize_input(data.get('description', 'Dépôt'))
+        try:
+            account_id = parse_account_id(data['account_id'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Vérifier que le compte appartient à l'utilisateur
-        account = execute_query(
-            "SELECT id, balance FROM accounts WHERE id = %s AND user_id = %s AND status = 'active'",
-            (account_id, user_id)
-        )
+        description = sanitize_input(data.get('description', 'Dépôt'))
         
-        if not account:
+        # Vérification du compte, mise à jour du solde et écriture en une transaction
+        try:
+            result = post_deposit(user_id, account_id, amount, description)
+        except AccountNotFoundError:
             return jsonify({'error': 'Compte non trouvé ou inactif'}), 404
         
-        current_balance = account[0]['balance']
-        new_balance = current_balance + amount
-        
-        # Transaction atomique
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        try:
-            # Mettre à jour le solde du compte
-            cursor.execute(
-                "UPDATE accounts SET balance = %s WHERE id = %s",
-                (new_balance, account_id)
-            )
-            
-            # Créer la transaction
-            reference = generate_reference_number()
-            cursor.execute(
-                """
-                INSERT INTO transactions (account_id, transaction_type, amount, balance_after, 
-                                        description, status, reference_number)
-                VALUES (%s, 'deposit', %s, %s, %s, 'completed', %s)
-                """,
-                (account_id, amount, new_balance, description, reference)
-            )
-            
-            connection.commit()
-            transaction_id = cursor.lastrowid
-            
-            return jsonify({
-                'message': 'Dépôt effectué avec succès',
-                'transaction_id': transaction_id,
-                'reference': reference,
-                'new_balance': float(new_balance)
-            }), 201
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+        return jsonify({
+            'message': 'Dépôt effectué avec succès',
+            'transaction_id': result['transaction_id'],
+            'reference': result['reference'],
+            'new_balance': result['new_balance']
+        }), 201
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors du dépôt: {str(e)}'}), 500
@@ -170,65 +525,26 @@ def create_withdrawal():
         if amount <= 0:
             return jsonify({'error': 'Le montant doit être positif'}), 400
         
-        account_id = data['account_id']
-        description = sanitize_input(data.get('description', 'Retrait'))
+        try:
+            account_id = parse_account_id(data['account_id'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        account = execute_query(
-            "SELECT id, balance, overdraft_limit FROM accounts WHERE id = %s AND user_id = %s AND status = 'active'",
-            (account_id, user_id)
-        )
+        description = sanitize_input(data.get('description', 'Retrait'))
         
-        if not account:
+        try:
+            result = post_withdrawal(user_id, account_id, amount, description)
+        except AccountNotFoundError:
             return jsonify({'error': 'Compte non trouvé ou inactif'}), 404
+        except InsufficientFundsError as e:
+            return jsonify(e.to_dict()), 400
         
-        current_balance = account[0]['balance']
-        overdraft_limit = account[0]['overdraft_limit']
-        available_balance = current_balance + overdraft_limit
-        
-        if amount > available_balance:
-            return jsonify({
-                'error': 'Solde insuffisant',
-                'current_balance': float(current_balance),
-                'requested_amount': float(amount),
-                'available': float(available_balance)
-            }), 400
-        
-        new_balance = current_balance - amount
-        
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        try:
-            cursor.execute(
-                "UPDATE accounts SET balance = %s WHERE id = %s",
-                (new_balance, account_id)
-            )
-            
-            reference = generate_reference_number()
-            cursor.execute(
-                """
-                INSERT INTO transactions (account_id, transaction_type, amount, balance_after, 
-                                        description, status, reference_number)
-                VALUES (%s, 'withdrawal', %s, %s, %s, 'completed', %s)
-                """,
-                (account_id, amount, new_balance, description, reference)
-            )
-            
-            connection.commit()
-            transaction_id = cursor.lastrowid
-            
-            return jsonify({
-                'message': 'Retrait effectué avec succès',
-                'transaction_id': transaction_id,
-                'reference': reference,
-                'new_balance': float(new_balance)
-            }), 201
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+        return jsonify({
+            'message': 'Retrait effectué avec succès',
+            'transaction_id': result['transaction_id'],
+            'reference': result['reference'],
+            'new_balance': result['new_balance']
+        }), 201
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors du retrait: {str(e)}'}), 500
@@ -251,89 +567,33 @@ def create_transfer():
         if amount <= 0:
             return jsonify({'error': 'Le montant doit être positif'}), 400
         
-        recipient_iban = data['recipient_iban'].replace(' ', '')
+        # Forme enregistrée dans accounts (majuscules, sans espaces), cf. _lock_accounts
+        recipient_iban = str(data['recipient_iban']).replace(' ', '').upper()
         if not validate_iban(recipient_iban):
             return jsonify({'error': 'IBAN invalide'}), 400
         
-        source_account_id = data['source_account_id']
+        try:
+            source_account_id = parse_account_id(data['source_account_id'], 'source_account_id')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         description = sanitize_input(data['description'])
         recipient_name = sanitize_input(data.get('recipient_name', 'Bénéficiaire'))
         
-        source_account = execute_query(
-            "SELECT id, balance, overdraft_limit FROM accounts WHERE id = %s AND user_id = %s AND status = 'active'",
-            (source_account_id, user_id)
-        )
-        
-        if not source_account:
+        # Le compte destinataire est crédité dans la même transaction s'il est interne
+        try:
+            result = post_transfer(user_id, source_account_id, recipient_iban, amount, description, recipient_name)
+        except AccountNotFoundError:
             return jsonify({'error': 'Compte source non trouvé'}), 404
-        
-        current_balance = source_account[0]['balance']
-        overdraft_limit = source_account[0]['overdraft_limit']
-        available_balance = current_balance + overdraft_limit
-        
-        if amount > available_balance:
+        except InsufficientFundsError:
             return jsonify({'error': 'Solde insuffisant'}), 400
         
-        new_source_balance = current_balance - amount
-        
-        recipient_account = execute_query(
-            "SELECT id, balance FROM accounts WHERE iban = %s AND status = 'active'",
-            (recipient_iban,)
-        )
-        
-        connection = get_db_connection()
-        cursor = connection.cursor()
-        
-        try:
-            reference = generate_reference_number()
-            
-            cursor.execute(
-                "UPDATE accounts SET balance = %s WHERE id = %s",
-                (new_source_balance, source_account_id)
-            )
-            
-            cursor.execute(
-                """
-                INSERT INTO transactions (account_id, transaction_type, amount, balance_after, 
-                                        description, recipient_iban, recipient_name, status, reference_number)
-                VALUES (%s, 'transfer_out', %s, %s, %s, %s, %s, 'completed', %s)
-                """,
-                (source_account_id, amount, new_source_balance, description, recipient_iban, recipient_name, reference)
-            )
-            
-            if recipient_account:
-                recipient_id = recipient_account[0]['id']
-                recipient_balance = recipient_account[0]['balance']
-                new_recipient_balance = recipient_balance + amount
-                
-                cursor.execute(
-                    "UPDATE accounts SET balance = %s WHERE id = %s",
-                    (new_recipient_balance, recipient_id)
-                )
-                
-                cursor.execute(
-                    """
-                    INSERT INTO transactions (account_id, transaction_type, amount, balance_after, 
-                                            description, status, reference_number)
-                    VALUES (%s, 'transfer_in', %s, %s, %s, 'completed', %s)
-                    """,
-                    (recipient_id, amount, new_recipient_balance, f"Virement reçu - {description}", reference)
-                )
-            
-            connection.commit()
-            
-            return jsonify({
-                'message': 'Virement effectué avec succès',
-                'reference': reference,
-                'new_balance': float(new_source_balance),
-                'amount_transferred': float(amount)
-            }), 201
-            
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+        return jsonify({
+            'message': 'Virement effectué avec succès',
+            'reference': result['reference'],
+            'new_balance': result['new_balance'],
+            'amount_transferred': amount
+        }), 201
         
     except Exception as e:
         return jsonify({'error': f'Erreur lors du virement: {str(e)}'}), 500
@@ -356,61 +616,158 @@ def create_payment():
         if amount <= 0:
             return jsonify({'error': 'Le montant doit être positif'}), 400
         
-        account_id = data['account_id']
+        try:
+            account_id = parse_account_id(data['account_id'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         merchant = sanitize_input(data['merchant'])
         category = sanitize_input(data['category'])
         
-        account = execute_query(
-            "SELECT id, balance, overdraft_limit FROM accounts WHERE id = %s AND user_id = %s AND status = 'active'",
-            (account_id, user_id)
+        try:
+            result = post_payment(user_id, account_id, amount, merchant, category)
+        except AccountNotFoundError:
+            return jsonify({'error': 'Compte non trouvé'}), 404
+        except InsufficientFundsError:
+            return jsonify({'error': 'Solde insuffisant'}), 400
+        
+        return jsonify({
+            'message': 'Paiement effectué avec succès',
+            'transaction_id': result['transaction_id'],
+            'reference': result['reference'],
+            'new_balance': result['new_balance']
+        }), 201
+        
+    except Exception as e:
+        return jsonify({'error': f'Erreur lors du paiement: {str(e)}'}), 500
+
+def parse_batch_operation(item):
+    """
+    Valide un élément de /batch et construit l'écriture correspondante
+    
+    Raises:
+        ValueError avec le message d'erreur de l'élément
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Opération invalide')
+    
+    operation_type = item.get('type')
+    if operation_type not in BATCH_REQUIRED_FIELDS:
+        raise ValueError(f"Type d'opération invalide: {operation_type}")
+    
+    for field in BATCH_REQUIRED_FIELDS[operation_type]:
+        if field not in item or item[field] in (None, ''):
+            raise ValueError(f'Le champ {field} est requis')
+    
+    is_valid, message = validate_amount(item['amount'])
+    if not is_valid:
+        raise ValueError(message)
+    amount = Decimal(str(item['amount']))
+    
+    if operation_type == 'deposit':
+        return deposit_operation(
+            parse_account_id(item['account_id']), amount, sanitize_input(item.get('description', 'Dépôt'))
+        )
+    
+    if operation_type == 'withdrawal':
+        return withdrawal_operation(
+            parse_account_id(item['account_id']), amount, sanitize_input(item.get('description', 'Retrait'))
         )
+    
+    if operation_type == 'payment':
+        return payment_operation(
+            parse_account_id(item['account_id']),
+            amount,
+            sanitize_input(item['merchant']),
+            sanitize_input(item['category'])
+        )
+    
+    source_account_id = parse_account_id(item['source_account_id'], 'source_account_id')
+    
+    recipient_iban = str(item['recipient_iban']).replace(' ', '').upper()
+    if not validate_iban(recipient_iban):
+        raise ValueError('IBAN invalide')
+    
+    return transfer_operation(
+        source_account_id,
+        recipient_iban,
+        amount,
+        sanitize_input(item['description']),
+        sanitize_input(item.get('recipient_name', 'Bénéficiaire'))
+    )
+
+@transactions_bp.route('/batch', methods=['POST'])
+@jwt_required()
+def create_batch():
+    """
+    Effectue jusqu'à MAX_BATCH_OPERATIONS opérations en une requête et une transaction
+    
+    Corps: {"operations": [{"type": "payment", ...}, {"type": "transfer", ...}],
+            "atomic": false}
+    Avec atomic=true, une seule opération refusée annule tout le lot.
+    """
+    try:
+        current_user = get_jwt_identity()
+        user_id = current_user['user_id']
+        data = request.get_json()
         
-        if not account:
-            return jsonify({'error': 'Compte non trouvé'}), 404
+        items = data.get('operations') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'Le champ operations est requis'}), 400
         
-        current_balance = account[0]['balance']
-        overdraft_limit = account[0]['overdraft_limit']
-        available_balance = current_balance + overdraft_limit
+        if len(items) > MAX_BATCH_OPERATIONS:
+            return jsonify({'error': f'Maximum {MAX_BATCH_OPERATIONS} opérations par lot'}), 400
         
-        if amount > available_balance:
-            return jsonify({'error': 'Solde insuffisant'}), 400
+        atomic = bool(data.get('atomic', False))
         
-        new_balance = current_balance - amount
+        # Validation de tout le lot avant tout accès à la base
+        results = [None] * len(items)
+        operations = []
+        positions = []
         
-        connection = get_db_connection()
-        cursor = connection.cursor()
+        for index, item in enumerate(items):
+            try:
+                operations.append(parse_batch_operation(item))
+                positions.append(index)
+            except (ValueError, ArithmeticError) as e:
+                results[index] = {'index': index, 'status': 'failed', 'error': str(e)}
         
-        try:
-            cursor.execute(
-                "UPDATE accounts SET balance = %s WHERE id = %s",
-                (new_balance, account_id)
-            )
-            
-            reference = generate_reference_number()
-            cursor.execute(
-                """
-                INSERT INTO transactions (account_id, transaction_type, amount, balance_after, 
-                                        description, category, status, reference_number)
-                VALUES (%s, 'payment', %s, %s, %s, %s, 'completed', %s)
-                """,
-                (account_id, amount, new_balance, merchant, category, reference)
-            )
-            
-            connection.commit()
-            transaction_id = cursor.lastrowid
-            
-            return jsonify({
-                'message': 'Paiement effectué avec succès',
-                'transaction_id': transaction_id,
-                'reference': reference,
-                'new_balance': float(new_balance)
-            }), 201
+        if atomic and len(operations) < len(items):
+            for index in positions:
+                results[index] = {'index': index, 'status': 'failed', 'error': OperationAbortedError().message}
+            operations = []
+        
+        if operations:
+            posted = post_operations(user_id, operations, atomic=atomic)
             
-        except Exception as e:
-            connection.rollback()
-            raise e
-        finally:
-            cursor.close()
+            for index, result in zip(positions, posted):
+                if isinstance(result, PostingError):
+                    results[index] = {'index': index, 'status': 'failed', **result.to_dict()}
+                else:
+                    results[index] = {
+                        'index': index,
+                        'status': 'completed',
+                        'transaction_id': result['transaction_id'],
+                        'reference': result['reference'],
+                        'new_balance': result['new_balance']
+                    }
+        
+        completed = sum(1 for result in results if result['status'] == 'completed')
+        failed = len(results) - completed
+        
+        if failed == 0:
+            status_code = 201
+        elif completed:
+            status_code = 207
+        else:
+            status_code = 400
+        
+        return jsonify({
+            'message': f'{completed} opération(s) effectuée(s), {failed} refusée(s)',
+            'completed': completed,
+            'failed': failed,
+            'results': results
+        }), status_code
         
     except Exception as e:
-        return jsonify({'error': f'Erreur lors du paiement: {str(e)}'}), 500
+        return jsonify({'error': f'Erreur lors du traitement du lot: {str(e)}'}), 500
\ No newline at end of file
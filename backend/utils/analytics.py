@@ -0,0 +1,170 @@
+# backend/utils/analytics.py
+"""
+Analyse des dépenses sur une période (GET /api/accounts/analytics):
+répartition par catégorie, évolution mois par mois, moyenne glissante
+des dépenses et principaux bénéficiaires
+
+Les transactions de la période sont lues en une seule requête, colonne par
+colonne (montants en centimes entiers, mois au format AAAAMM), puis
+agrégées par NumPy: les catégories et bénéficiaires sont remplacés par des
+codes entiers et chaque total est un np.bincount, sans boucle Python par
+transaction ni Decimal. Les montants sont exacts tant que les totaux restent
+sous 2^53 centimes.
+"""
+from datetime import date
+import numpy as np
+
+# Période par défaut (mois en cours compris) et période maximale, en mois
+DEFAULT_MONTHS = 12
+MAX_MONTHS = 60
+
+def month_number(day):
+    """Numéro de mois continu (année * 12 + mois - 1)"""
+    return day.year * 12 + day.month - 1
+
+def default_period(today=None):
+    """Les DEFAULT_MONTHS derniers mois, du premier jour au jour courant"""
+    today = today or date.today()
+    first = month_number(today) - DEFAULT_MONTHS + 1
+    return date(first // 12, first % 12 + 1, 1), today
+
+def factorize(values):
+    """
+    Codes entiers des valeurs (ordre de première apparition)
+    
+    Chaque valeur est d'abord associée à la position de sa première
+    occurrence (dict.setdefault appelé par map, sans boucle Python), puis
+    ces positions sont renumérotées de 0 à n - 1.
+    
+    Returns:
+        Tuple (tableau de codes, liste des valeurs distinctes)
+    """
+    index = {}
+    count = len(values)
+    first_positions = np.fromiter(map(index.setdefault, values, range(count)), dtype=np.int64, count=count)
+    
+    renumber = np.zeros(count, dtype=np.int64)
+    renumber[np.fromiter(index.values(), dtype=np.int64, count=len(index))] = np.arange(len(index))
+    return renumber[first_positions], list(index)
+
+def _sum_by(codes, cents, size):
+    """Totaux en centimes par code (0 pour les codes sans ligne)"""
+    totals = np.bincount(codes, weights=cents, minlength=size)
+    return np.rint(totals).astype(np.int64)
+
+def _money(cents):
+    """Centimes (tableau ou entier) en euros, nombres JSON"""
+    return (np.asarray(cents) / 100).round(2).tolist()
+
+def _ranking(codes, names, cents, limit=None, skip=()):
+    """
+    Total, nombre et montant moyen par code, du plus gros total au plus petit
+    (codes sans ligne et codes de skip exclus)
+    """
+    totals = _sum_by(codes, cents, len(names))
+    counts = np.bincount(codes, minlength=len(names))
+    counts[list(skip)] = 0
+    
+    present = np.flatnonzero(counts)
+    order = present[np.argsort(-totals[present], kind='stable')][:limit]
+    
+    return [
+        {'name': names[code], 'total': total, 'count': count, 'average': average}
+        for code, total, count, average in zip(
+            order.tolist(),
+            _money(totals[order]),
+            counts[order].tolist(),
+            _money(totals[order] / counts[order])
+        )
+    ]
+
+def _monthly(first_month, months, income, expenses, window):
+    """Lignes mois par mois: variation des dépenses et moyenne glissante sur window mois"""
+    previous = np.concatenate(([0], expenses[:-1]))
+    change = np.divide((expenses - previous) * 100, previous,
+                       out=np.full(months, np.nan), where=previous > 0)
+    change[0] = np.nan
+    
+    cumulative = np.cumsum(expenses)
+    rolling = np.full(months, np.nan)
+    if months >= window:
+        rolling[window - 1:] = (cumulative[window - 1:] - np.concatenate(([0], cumulative[:-window]))) / window
+    
+    return [
+        {
+            'period': f"{(first_month + i) // 12:04d}-{(first_month + i) % 12 + 1:02d}",
+            'income': month_income,
+            'expenses': month_expenses,
+            'net': month_net,
+            'expenses_change': None if np.isnan(month_change) else round(month_change, 1),
+            'expenses_rolling_average': None if np.isnan(month_rolling) else round(month_rolling / 100, 2)
+        }
+        for i, (month_income, month_expenses, month_net, month_change, month_rolling) in enumerate(zip(
+            _money(income), _money(expenses), _money(income - expenses), change.tolist(), rolling.tolist()
+        ))
+    ]
+
+def spending_analytics(columns, date_from, date_to, window=3, top=10):
+    """
+    Calcule l'analyse à partir des colonnes lues par fetch_columns
+    
+    Args:
+        columns: (is_income, cents, period AAAAMM, category, counterparty),
+                 transactions de revenus et de dépenses de la période;
+                 counterparty est le commerçant d'un paiement, le
+                 destinataire d'un virement
+        window: nombre de mois de la moyenne glissante des dépenses
+        top: nombre de bénéficiaires retournés
+    """
+    is_income, cents, periods, categories, merchants = columns
+    
+    count = len(cents)
+    is_income = np.fromiter(is_income, dtype=bool, count=count)
+    cents = np.fromiter(cents, dtype=np.int64, count=count)
+    periods = np.fromiter(periods, dtype=np.int64, count=count)
+    is_expense = ~is_income
+    
+    first_month = month_number(date_from)
+    months = month_number(date_to) - first_month + 1
+    month_codes = periods // 100 * 12 + periods % 100 - 1 - first_month
+    
+    income_by_month = _sum_by(month_codes[is_income], cents[is_income], months)
+    expenses_by_month = _sum_by(month_codes[is_expense], cents[is_expense], months)
+    
+    expense_cents = cents[is_expense]
+    total_income = int(income_by_month.sum())
+    total_expenses = int(expenses_by_month.sum())
+    expense_count = int(is_expense.sum())
+    days = (date_to - date_from).days + 1
+    
+    # Catégories: toutes les dépenses (None = non catégorisée)
+    category_codes, category_names = factorize(categories)
+    by_category = _ranking(category_codes[is_expense], category_names, expense_cents)
+    for row in by_category:
+        row['category'] = row.pop('name')
+        row['share'] = round(row['total'] * 100 / (total_expenses / 100), 1) if total_expenses else 0.0
+    
+    # Bénéficiaires: dépenses dont le nom est renseigné (paiements, virements)
+    merchant_codes, merchant_names = factorize(merchants)
+    unnamed = [merchant_names.index(None)] if None in merchant_names else []
+    top_merchants = _ranking(merchant_codes[is_expense], merchant_names, expense_cents, top, unnamed)
+    
+    return {
+        'period': {'date_from': date_from, 'date_to': date_to, 'months': months},
+        'totals': {
+            'income': _money(total_income),
+            'expenses': _money(total_expenses),
+            'net': _money(total_income - total_expenses),
+            'transactions': count,
+            'expense_transactions': expense_count
+        },
+        'averages': {
+            'monthly_income': round(total_income / months / 100, 2),
+            'monthly_expenses': round(total_expenses / months / 100, 2),
+            'daily_expenses': round(total_expenses / days / 100, 2),
+            'expense_amount': round(total_expenses / expense_count / 100, 2) if expense_count else 0.0
+        },
+        'categories': by_category,
+        'monthly': _monthly(first_month, months, income_by_month, expenses_by_month, window),
+        'top_merchants': top_merchants
+    }
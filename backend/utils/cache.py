@@ -0,0 +1,101 @@
+# backend/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+from utils.database import execute_prepared
+
+class TTLCache:
+    """Cache LRU borné en taille, dont les entrées expirent après ttl secondes"""
+    
+    def __init__(self, maxsize=10000, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        """Retourne la valeur en cache ou None (absente ou expirée)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+    
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._data), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+# Attributs des comptes qui changent rarement (propriétaire, statut, type,
+# découvert, IBAN...). Le solde n'y figure jamais: il est toujours lu en base.
+account_cache = TTLCache()
+
+ACCOUNT_META_QUERY = """
+    SELECT a.id, a.user_id, a.account_number, a.account_type, a.currency,
+           a.iban, a.status, a.overdraft_limit, a.interest_rate, a.created_at,
+           u.first_name, u.last_name
+    FROM accounts a
+    JOIN users u ON a.user_id = u.id
+    WHERE a.id = %s
+"""
+
+def init_cache(app):
+    """Dimensionne le cache des comptes depuis la configuration"""
+    global account_cache
+    account_cache = TTLCache(
+        maxsize=app.config.get('ACCOUNT_CACHE_SIZE', 10000),
+        ttl=app.config.get('ACCOUNT_CACHE_TTL', 60)
+    )
+
+def get_account_meta(account_id):
+    """
+    Retourne les attributs stables d'un compte (sans le solde), depuis le cache
+    ou la base de données
+    
+    Returns:
+        dict (user_id, account_number, account_type, currency, iban, status,
+        overdraft_limit, interest_rate, created_at, first_name, last_name) ou None
+    """
+    meta = account_cache.get(account_id)
+    if meta is not None:
+        return dict(meta)
+    
+    return cache_account_meta(account_id, execute_prepared(ACCOUNT_META_QUERY, (account_id,)))
+
+def cache_account_meta(account_id, rows):
+    """Met en cache le résultat de ACCOUNT_META_QUERY et retourne la ligne (ou None)"""
+    if not rows:
+        return None
+    
+    account_cache.set(account_id, dict(rows[0]))
+    return rows[0]
+
+def peek_account_meta(account_id):
+    """Comme get_account_meta, mais sans accès à la base en cas d'absence"""
+    meta = account_cache.get(account_id)
+    return dict(meta) if meta is not None else None
+
+def invalidate_account(account_id):
+    """À appeler après toute modification des attributs d'un compte"""
+    account_cache.invalidate(account_id)
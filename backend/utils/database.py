@@ -1,44 +1,344 @@
 # backend/utils/database.py
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from operator import itemgetter
 import mysql.connector
 from mysql.connector import pooling
-from flask import g, current_app
+from mysql.connector.cursor import MySQLCursorPreparedDict
+try:
+    from mysql.connector.cursor_cext import CMySQLCursorPreparedDict
+except ImportError:
+    CMySQLCursorPreparedDict = None
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity
+from utils import local_store
 
-# Pool de connexions MySQL
-connection_pool = None
+class BoundedPool:
+    """
+    Pool mysql-connector dont les emprunts attendent une connexion libre
+    
+    Le pool mysql-connector échoue immédiatement lorsqu'il est vide: les
+    emprunts simultanés sont limités ici au nombre de connexions, chacun
+    attendant au plus timeout secondes qu'une connexion soit rendue.
+    """
+    
+    def __init__(self, pool, pool_size, timeout):
+        self.pool = pool
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(pool_size)
+        # Compteurs d'utilisation (cf. stats)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'pool_size': pool_size,
+            'checkouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'exhausted': 0,
+            'waiting': 0,
+            'in_use': 0,
+            'in_use_max': 0
+        }
+    
+    def checkout(self):
+        """Emprunte une connexion en attendant au plus timeout secondes"""
+        started = time.perf_counter()
+        
+        with self._stats_lock:
+            self._stats['waiting'] += 1
+        
+        acquired = self._slots.acquire(timeout=self.timeout)
+        waited = time.perf_counter() - started
+        
+        with self._stats_lock:
+            self._stats['waiting'] -= 1
+            self._stats['wait_time_total'] += waited
+            self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+            if not acquired:
+                self._stats['exhausted'] += 1
+        
+        if not acquired:
+            raise mysql.connector.errors.PoolError(
+                f"Aucune connexion disponible après {self.timeout}s (pool épuisé)"
+            )
+        
+        try:
+            connection = self.pool.get_connection()
+        except Exception:
+            self._slots.release()
+            raise
+        
+        with self._stats_lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['in_use_max'] = max(self._stats['in_use_max'], self._stats['in_use'])
+        
+        return connection
+    
+    def release(self, connection):
+        """Rend une connexion au pool, sans transaction ni instantané de lecture ouvert"""
+        try:
+            # Le pool ne réinitialise pas la session (pool_reset_session=False)
+            try:
+                connection.rollback()
+            except mysql.connector.Error:
+                pass
+            connection.close()
+        finally:
+            with self._stats_lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+    
+    def stats(self):
+        """
+        Instantané des compteurs
+        
+        checkouts: emprunts réussis, wait_time_*: attente pour obtenir une
+        connexion (secondes), exhausted: emprunts abandonnés après le délai,
+        waiting/in_use: requêtes en attente / connexions empruntées
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        
+        stats['wait_time_avg'] = stats['wait_time_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+# Pool du serveur principal (toutes les écritures) et, si MYSQL_READ_HOST
+# est défini, pool des réplicas pour les routes en lecture seule
+primary_pool = None
+read_pool = None
+
+# Durée pendant laquelle les lectures d'un utilisateur restent sur le
+# serveur principal après une écriture (cf. pin_primary)
+_read_your_writes = 5.0
+
+# Replis sur le serveur principal quand le réplica est injoignable
+_read_fallbacks = 0
+
+# Observateurs appelés après chaque requête SQL (cf. add_query_listener)
+_query_listeners = []
+
+# Instructions préparées gardées par connexion (cf. execute_prepared)
+_prepared_enabled = True
+_prepared_max = 32
+
+def _create_pool(name, size, host, port, user, password, database):
+    return mysql.connector.pooling.MySQLConnectionPool(
+        pool_name=name,
+        pool_size=size,
+        host=host,
+        port=port,
+        user=user,
+        password=password,
+        database=database,
+        charset='utf8mb4',
+        collation='utf8mb4_unicode_ci',
+        autocommit=False,
+        # COM_RESET_CONNECTION libérerait les instructions préparées de la
+        # connexion à chaque retour au pool: la transaction en cours est
+        # annulée par BoundedPool.release à la place
+        pool_reset_session=False
+    )
+
+def connection_settings(config, read=False):
+    """
+    Paramètres de mysql.connector.connect hors pool: serveur principal, ou
+    réplica si read et MYSQL_READ_HOST est défini (traitements en lecture seule)
+    """
+    if read and config.get('MYSQL_READ_HOST'):
+        return dict(
+            connection_settings(config),
+            host=config['MYSQL_READ_HOST'],
+            port=config.get('MYSQL_READ_PORT') or config['MYSQL_PORT'],
+            user=config.get('MYSQL_READ_USER') or config['MYSQL_USER'],
+            password=config.get('MYSQL_READ_PASSWORD') or config['MYSQL_PASSWORD']
+        )
+    return dict(
+        host=config['MYSQL_HOST'],
+        port=config['MYSQL_PORT'],
+        user=config['MYSQL_USER'],
+        password=config['MYSQL_PASSWORD'],
+        database=config['MYSQL_DATABASE'],
+        charset='utf8mb4',
+        collation='utf8mb4_unicode_ci'
+    )
 
 def init_db(app):
-    """Initialise le pool de connexions à la base de données"""
-    global connection_pool
+    """Initialise les pools de connexions à la base de données"""
+    global primary_pool, read_pool, _read_your_writes, _prepared_enabled, _prepared_max
+    
+    pool_size = app.config.get('MYSQL_POOL_SIZE', 5)
+    timeout = app.config.get('MYSQL_POOL_TIMEOUT', 5.0)
+    _prepared_enabled = app.config.get('MYSQL_PREPARED_STATEMENTS', True)
+    _prepared_max = app.config.get('MYSQL_PREPARED_MAX', 32)
+    _read_your_writes = app.config.get('READ_YOUR_WRITES_SECONDS', 5.0)
     
     try:
-        connection_pool = mysql.connector.pooling.MySQLConnectionPool(
-            pool_name="banking_pool",
-            pool_size=5,
-            host=app.config['MYSQL_HOST'],
-            port=app.config['MYSQL_PORT'],
-            user=app.config['MYSQL_USER'],
-            password=app.config['MYSQL_PASSWORD'],
-            database=app.config['MYSQL_DATABASE'],
-            charset='utf8mb4',
-            collation='utf8mb4_unicode_ci',
-            autocommit=False
+        primary_pool = BoundedPool(
+            _create_pool(
+                "banking_pool", pool_size,
+                app.config['MYSQL_HOST'], app.config['MYSQL_PORT'],
+                app.config['MYSQL_USER'], app.config['MYSQL_PASSWORD'], app.config['MYSQL_DATABASE']
+            ),
+            pool_size,
+            timeout
         )
         print("✓ Connexion à MySQL établie avec succès")
     except mysql.connector.Error as err:
         print(f"✗ Erreur de connexion à MySQL: {err}")
         raise
+    
+    if app.config.get('MYSQL_READ_HOST'):
+        read_size = app.config.get('MYSQL_READ_POOL_SIZE') or pool_size
+        try:
+            read_pool = BoundedPool(
+                _create_pool(
+                    "banking_read_pool", read_size,
+                    app.config['MYSQL_READ_HOST'],
+                    app.config.get('MYSQL_READ_PORT') or app.config['MYSQL_PORT'],
+                    app.config.get('MYSQL_READ_USER') or app.config['MYSQL_USER'],
+                    app.config.get('MYSQL_READ_PASSWORD') or app.config['MYSQL_PASSWORD'],
+                    app.config['MYSQL_DATABASE']
+                ),
+                read_size,
+                timeout
+            )
+            print(f"✓ Réplica MySQL en lecture: {app.config['MYSQL_READ_HOST']}")
+        except mysql.connector.Error as err:
+            # L'API reste disponible: toutes les lectures vont au serveur principal
+            print(f"✗ Réplica MySQL injoignable, lectures sur le serveur principal: {err}")
+            read_pool = None
+    
+    # Rendre les connexions aux pools à la fin de chaque requête ou contexte
+    # applicatif (commandes CLI, tâches lancées avec app.app_context())
+    app.teardown_appcontext(close_db_connection)
+    
+    # Épingler sur le serveur principal l'utilisateur qui vient d'écrire
+    app.after_request(_pin_after_write)
 
 def get_db_connection():
-    """Obtient une connexion depuis le pool"""
+    """Obtient une connexion au serveur principal depuis le pool"""
     if 'db_connection' not in g:
-        g.db_connection = connection_pool.get_connection()
+        g.db_connection = primary_pool.checkout()
     return g.db_connection
 
+def get_read_connection():
+    """
+    Connexion des lectures de la requête: réplica pour une route marquée
+    read_only dont l'utilisateur n'a pas écrit récemment, serveur principal sinon
+    """
+    global _read_fallbacks
+    
+    if read_pool is None or not g.get('db_read_only') or 'db_connection' in g:
+        return get_db_connection()
+    
+    if 'db_read_connection' not in g:
+        if _is_pinned(_current_user_id()):
+            return get_db_connection()
+        try:
+            g.db_read_connection = read_pool.checkout()
+        except mysql.connector.Error as err:
+            _read_fallbacks += 1
+            print(f"✗ Réplica indisponible, lecture sur le serveur principal: {err}")
+            return get_db_connection()
+    return g.db_read_connection
+
+def read_only(view):
+    """
+    Décorateur des routes qui ne font que des SELECT: leurs lectures
+    peuvent être servies par le réplica (à placer sous @jwt_required)
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+def _current_user_id():
+    """Utilisateur du jeton JWT vérifié de la requête, None sans jeton"""
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        return None
+    return identity.get('user_id') if isinstance(identity, dict) else identity
+
+def pin_primary(user_id):
+    """
+    Dirige les lectures de user_id vers le serveur principal pendant
+    READ_YOUR_WRITES_SECONDS (tous les workers: magasin local partagé)
+    """
+    if read_pool is None or user_id is None:
+        return
+    local_store.local_store.set(f"pin:{user_id}", '1', _read_your_writes)
+
+def _is_pinned(user_id):
+    return user_id is not None and local_store.local_store.get(f"pin:{user_id}") is not None
+
+def _pin_after_write(response):
+    # Toute requête authentifiée réussie qui n'est pas une lecture peut
+    # avoir écrit; les routes sans jeton (inscription, connexion) appellent
+    # pin_primary elles-mêmes
+    if read_pool is not None and request.method not in ('GET', 'HEAD', 'OPTIONS') and response.status_code < 400:
+        pin_primary(_current_user_id())
+    return response
+
 def close_db_connection(e=None):
-    """Ferme la connexion à la base de données"""
+    """Rend les connexions de la requête à leurs pools"""
     connection = g.pop('db_connection', None)
-    if connection is not None:
-        connection.close()
+    read_connection = g.pop('db_read_connection', None)
+    try:
+        if connection is not None:
+            primary_pool.release(connection)
+    finally:
+        if read_connection is not None:
+            read_pool.release(read_connection)
+
+def get_pool_stats():
+    """Retourne un instantané des compteurs du pool principal (cf. BoundedPool.stats)"""
+    return primary_pool.stats()
+
+def get_read_pool_stats():
+    """Compteurs du pool des réplicas (None sans réplica), replis compris"""
+    if read_pool is None:
+        return None
+    return dict(read_pool.stats(), fallbacks=_read_fallbacks)
+
+def add_query_listener(listener):
+    """
+    Enregistre une fonction appelée après chaque requête passée par run_query:
+    listener(query, params, duration, rowcount, error), duration en secondes,
+    error l'exception levée ou None
+    
+    Les observateurs s'exécutent dans le thread de la requête: ils doivent
+    rester rapides et ne jamais lever d'exception.
+    """
+    _query_listeners.append(listener)
+
+def run_query(cursor, query, params=None, many=False, fetch=False):
+    """
+    Point de passage unique des requêtes SQL: exécute query sur cursor
+    (executemany si many) et la chronomètre pour les observateurs
+    
+    Returns:
+        Les lignes lues si fetch (lecture comprise dans la durée), sinon None
+    """
+    started = time.perf_counter()
+    error = None
+    try:
+        if many:
+            cursor.executemany(query, params)
+        else:
+            cursor.execute(query, params or ())
+        return cursor.fetchall() if fetch else None
+    except Exception as err:
+        error = err
+        raise
+    finally:
+        if _query_listeners:
+            duration = time.perf_counter() - started
+            for listener in _query_listeners:
+                listener(query, params, duration, cursor.rowcount, error)
 
 def execute_query(query, params=None, fetch=True, commit=False):
     """
@@ -53,43 +353,232 @@ def execute_query(query, params=None, fetch=True, commit=False):
     Returns:
         Résultats de la requête ou ID du dernier insert
     """
-    connection = get_db_connection()
+    # Les SELECT d'une route read_only peuvent aller au réplica
+    connection = get_read_connection() if fetch and not commit else get_db_connection()
     cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute(query, params or ())
+        results = run_query(cursor, query, params, fetch=fetch and not commit)
         
         if commit:
             connection.commit()
             return cursor.lastrowid
         
-        if fetch:
-            results = cursor.fetchall()
-            return results
+        return results
         
-        return None
+    except mysql.connector.Error as err:
+        if commit:
+            connection.rollback()
+        raise err
+    finally:
+        cursor.close()
+
+def fetch_columns(query, params=None):
+    """
+    Exécute un SELECT et retourne ses colonnes plutôt que ses lignes
+    (curseur à tuples, sans dictionnaire par ligne), pour les calculs
+    vectorisés (cf. utils/analytics.py)
+    
+    Returns:
+        Tuple de colonnes (une séquence par colonne du SELECT, dans l'ordre),
+        colonnes vides si aucune ligne
+    """
+    connection = get_read_connection()
+    cursor = connection.cursor()
+    
+    try:
+        rows = run_query(cursor, query, params, fetch=True)
+        # Une liste par colonne: zip(*rows) est bien plus lent sur de grands résultats
+        return tuple(list(map(itemgetter(i), rows)) for i in range(len(cursor.description or ())))
+    finally:
+        cursor.close()
+
+class _WithoutStatementReset:
+    """
+    Connexion vue par un curseur préparé de execute_prepared
+    
+    Le curseur du connecteur envoie un COM_STMT_RESET (un aller-retour
+    serveur) avant chaque exécution. Il ne sert qu'à effacer les paramètres
+    envoyés par morceaux (COM_STMT_SEND_LONG_DATA, objets fichier) et à
+    fermer un curseur serveur ouvert: execute_prepared n'utilise ni l'un ni
+    l'autre et lit tout le résultat avant l'exécution suivante.
+    """
+    
+    __slots__ = ('_target',)
+    
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+    
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+    
+    def cmd_stmt_reset(self, statement):
+        pass
+
+class _PreparedCursor(MySQLCursorPreparedDict):
+    """Curseur préparé (Python pur), une exécution = un aller-retour"""
+    
+    def __init__(self, connection=None):
+        super().__init__(connection)
+        self._connection = _WithoutStatementReset(self._connection)
+
+if CMySQLCursorPreparedDict is not None:
+    class _CPreparedCursor(CMySQLCursorPreparedDict):
+        """Curseur préparé (extension C), une exécution = un aller-retour"""
+        
+        def __init__(self, connection):
+            super().__init__(connection)
+            self._cnx = _WithoutStatementReset(self._cnx)
+
+def _prepared_cursor(cnx):
+    if CMySQLCursorPreparedDict is not None and not isinstance(cnx, mysql.connector.MySQLConnection):
+        return cnx.cursor(cursor_class=_CPreparedCursor)
+    return cnx.cursor(cursor_class=_PreparedCursor)
+
+def _prepared_statement(connection, query):
+    """
+    Retourne (texte, curseur préparé) de la connexion pour query, en le
+    préparant au premier appel; au plus MYSQL_PREPARED_MAX par connexion
+    
+    Le curseur ne réutilise sa préparation que si on lui repasse le même
+    objet texte: c'est le texte mémorisé qui doit être exécuté.
+    """
+    # Le pool crée une nouvelle enveloppe à chaque emprunt: le cache est
+    # porté par la connexion réelle, et invalidé si elle a été rouverte
+    cnx = getattr(connection, '_cnx', connection)
+    cache = getattr(cnx, 'banking_statements', None)
+    if cache is None or cache[0] != cnx.connection_id:
+        cache = (cnx.connection_id, OrderedDict())
+        cnx.banking_statements = cache
+    statements = cache[1]
+    
+    entry = statements.get(query)
+    if entry is not None:
+        statements.move_to_end(query)
+        return entry
+    
+    entry = statements[query] = (query, _prepared_cursor(cnx))
+    if len(statements) > _prepared_max:
+        _, (_, oldest) = statements.popitem(last=False)
+        _close_quietly(oldest)
+    return entry
+
+def _forget_statement(connection, query):
+    cnx = getattr(connection, '_cnx', connection)
+    cache = getattr(cnx, 'banking_statements', None)
+    if cache is not None:
+        entry = cache[1].pop(query, None)
+        if entry is not None:
+            _close_quietly(entry[1])
+
+def _close_quietly(cursor):
+    try:
+        cursor.close()
+    except mysql.connector.Error:
+        pass
+
+def execute_prepared(query, params=None, fetch=True, commit=False, return_id=False):
+    """
+    Comme execute_query, mais par une instruction préparée côté serveur,
+    gardée par la connexion du pool: les requêtes fréquentes à texte fixe
+    ne sont analysées par MySQL qu'une fois par connexion
+    
+    Réservé aux textes en nombre borné (constantes, ou listes de longueur
+    limitée) et aux paramètres en tuple.
+    
+    Args:
+        return_id: Si True, retourne l'ID du dernier insert sans commit
+                   (écritures groupées, cf. utils/ledger.py)
+    """
+    read = fetch and not (commit or return_id)
+    connection = get_read_connection() if read else get_db_connection()
+    if _prepared_enabled:
+        query, cursor = _prepared_statement(connection, query)
+    else:
+        cursor = connection.cursor(dictionary=True)
+    
+    try:
+        results = run_query(cursor, query, params, fetch=read)
+        
+        if commit:
+            connection.commit()
+            return cursor.lastrowid
+        
+        if return_id:
+            return cursor.lastrowid
+        
+        return results
         
     except mysql.connector.Error as err:
+        # Instruction peut-être invalide (connexion rouverte, table modifiée):
+        # elle sera préparée à nouveau au prochain appel
+        if _prepared_enabled:
+            _forget_statement(connection, query)
         if commit:
             connection.rollback()
         raise err
     finally:
+        if not _prepared_enabled:
+            cursor.close()
+
+def stream_query(query, params=None, batch_size=1000):
+    """
+    Exécute un SELECT sur un curseur non bufferisé et produit les lignes
+    par lots de batch_size au fil de leur lecture sur le réseau
+    
+    La mémoire utilisée ne dépend pas du nombre de lignes. La connexion de
+    la requête reste occupée jusqu'à épuisement ou fermeture du générateur
+    (à utiliser avec stream_with_context pour une réponse Flask).
+    
+    Yields:
+        Listes de dictionnaires (au plus batch_size lignes)
+    """
+    connection = get_read_connection()
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    
+    try:
+        # Seul l'envoi de la requête est chronométré: la lecture des lots
+        # dépend du rythme du client
+        run_query(cursor, query, params)
+        
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        # Client déconnecté en cours de route: lire le reste du résultat
+        # pour que la connexion puisse être réutilisée par le pool
+        if connection.unread_result:
+            connection.consume_results()
         cursor.close()
 
-def execute_many(query, data_list):
+def execute_many(query, data_list, commit=True, return_id=False):
     """
     Exécute une requête avec plusieurs ensembles de paramètres
-    Utile pour les insertions multiples
+    Utile pour les insertions multiples: un INSERT ... VALUES est envoyé
+    par mysql-connector en une seule requête multi-lignes
+    
+    Args:
+        commit: Si False, laisse la transaction ouverte (écritures groupées
+                dans une transaction plus large, cf. utils/ledger.py)
+        return_id: Si True, retourne l'ID de la première ligne insérée
+                   au lieu du nombre de lignes
     """
     connection = get_db_connection()
     cursor = connection.cursor()
     
     try:
-        cursor.executemany(query, data_list)
-        connection.commit()
-        return cursor.rowcount
+        run_query(cursor, query, data_list, many=True)
+        if commit:
+            connection.commit()
+        return cursor.lastrowid if return_id else cursor.rowcount
     except mysql.connector.Error as err:
-        connection.rollback()
+        if commit:
+            connection.rollback()
         raise err
     finally:
-        cursor.close()
+        cursor.close()
\ No newline at end of file
@@ -0,0 +1,126 @@
+# backend/utils/iban_index.py
+"""
+Index en mémoire des IBAN internes, pour router un virement sans requête
+de recherche (cf. utils/ledger.py, _lock_accounts)
+
+- IBAN d'une autre banque (pays et 10 premiers caractères du BBAN, soit en
+  France le code banque et le code guichet, absents de la table accounts):
+  virement externe, aucune lecture du destinataire
+- IBAN connu de l'index: identifiant du compte, verrouillé par clé primaire
+  avec le compte débité
+- IBAN de la banque absent de l'index (compte ouvert depuis par un autre
+  processus): recherche par IBAN en base, puis ajout à l'index
+
+L'index n'est qu'un raccourci: le statut et le propriétaire du compte sont
+toujours lus sur la ligne verrouillée, et un identifiant dont l'IBAN ne
+correspond pas est ignoré. Il est chargé au démarrage de chaque processus
+sous forme de deux tableaux NumPy triés (empreinte 64 bits de l'IBAN,
+identifiant): 16 octets par compte.
+"""
+import threading
+import numpy as np
+from utils.database import fetch_columns
+from utils.security import BANK_CODE, BRANCH_CODE
+
+LOAD_QUERY = "SELECT id, iban FROM accounts"
+
+def bank_prefix(iban):
+    """Pays + 10 premiers caractères du BBAN (sans la clé de contrôle)"""
+    return iban[:2] + iban[4:14]
+
+class IbanIndex:
+    """IBAN internes → identifiant de compte (propre au processus, utilisable par plusieurs threads)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hashes = np.empty(0, dtype=np.int64)
+        self._ids = np.empty(0, dtype=np.int64)
+        self._added = {}
+        self.prefixes = None
+        self.external = 0
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def loaded(self):
+        return self.prefixes is not None
+    
+    def load(self, account_ids, ibans):
+        """Remplace le contenu de l'index (colonnes id et iban de accounts)"""
+        count = len(ibans)
+        hashes = np.fromiter(map(hash, ibans), dtype=np.int64, count=count)
+        order = np.argsort(hashes, kind='stable')
+        
+        prefixes = set(map(bank_prefix, ibans))
+        # Préfixe des IBAN générés par l'application (cf. generate_iban)
+        prefixes.add(f"FR{BANK_CODE}{BRANCH_CODE}")
+        
+        with self._lock:
+            self._hashes = hashes[order]
+            self._ids = np.fromiter(account_ids, dtype=np.int64, count=count)[order]
+            self._added = {}
+            self.prefixes = prefixes
+    
+    def add(self, iban, account_id):
+        """Ajoute un compte ouvert depuis le chargement"""
+        with self._lock:
+            self._added[iban] = account_id
+            if self.prefixes is not None:
+                self.prefixes.add(bank_prefix(iban))
+    
+    def lookup(self, iban):
+        """
+        Route un IBAN de destinataire
+        
+        Returns:
+            Tuple (internal, account_id):
+            (False, None): IBAN d'une autre banque, aucune lecture nécessaire;
+            (True, id): compte candidat, à confirmer sur la ligne verrouillée;
+            (True, None): IBAN inconnu de l'index, à rechercher en base
+        """
+        iban = iban.upper()
+        if self.prefixes is None:
+            return True, None
+        if bank_prefix(iban) not in self.prefixes:
+            self.external += 1
+            return False, None
+        
+        account_id = self._added.get(iban)
+        if account_id is None:
+            hashes = self._hashes
+            key = hash(iban)
+            position = int(np.searchsorted(hashes, key))
+            if position < len(hashes) and hashes[position] == key:
+                account_id = int(self._ids[position])
+        
+        if account_id is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return True, account_id
+    
+    def stats(self):
+        return {
+            'size': len(self._hashes) + len(self._added),
+            'external': self.external,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+iban_index = IbanIndex()
+
+def init_iban_index(app):
+    """
+    Charge l'index depuis la base (IBAN_INDEX); en cas d'échec, les
+    virements recherchent le destinataire en base comme sans index
+    """
+    if not app.config.get('IBAN_INDEX', True):
+        return
+    
+    try:
+        with app.app_context():
+            account_ids, ibans = fetch_columns(LOAD_QUERY) or ([], [])
+        iban_index.load(account_ids, ibans)
+        print(f"✓ Index des IBAN internes: {len(ibans)} comptes")
+    except Exception as e:
+        print(f"✗ Index des IBAN internes non chargé, recherche en base: {e}")
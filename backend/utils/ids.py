@@ -0,0 +1,246 @@
+# backend/utils/ids.py
+"""
+Identifiants uniques par construction, croissants dans le temps, sans
+lecture en base (références de transactions, numéros de compte)
+
+Un identifiant est un entier composé, des bits de poids fort aux bits de
+poids faible, de:
+    | temps depuis EPOCH | nœud (machine) | worker (processus) | séquence |
+
+- nœud: ID_NODE, distinct pour chaque machine qui exécute le backend
+- worker: emplacement réservé par le processus dans le magasin local
+  partagé de la machine (utils/local_store.py), renouvelé tant que le
+  processus génère des identifiants et libéré à sa sortie
+- séquence: compteur du processus dans l'unité de temps; s'il déborde, ou
+  si l'horloge recule, l'unité suivante est empruntée plutôt que d'attendre
+
+Deux processus n'ont donc jamais le même couple (nœud, worker), et un
+processus ne produit jamais deux fois le même (temps, séquence).
+"""
+import atexit
+import os
+import threading
+import time
+import uuid
+from utils import local_store
+
+# 2024-01-01T00:00:00Z en millisecondes
+EPOCH_MS = 1704067200000
+
+NODE_BITS = 5
+WORKER_BITS = 8
+WORKERS = 1 << WORKER_BITS
+
+BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+# Nœud de la machine (cf. init_ids)
+_node = 0
+
+# Générateurs du processus (cf. WorkerLease.release)
+_generators = []
+
+def _ahead_ms(now_ms):
+    """Millisecondes empruntées d'avance par les générateurs du processus"""
+    ahead_ms = max(((generator._last + 1) * generator.unit_ms + EPOCH_MS - now_ms for generator in _generators), default=0)
+    return max(ahead_ms, 0)
+
+class WorkerLease:
+    """Emplacement de worker réservé par ce processus dans le magasin local"""
+    
+    # Durée de la réservation et intervalle de renouvellement (millisecondes):
+    # l'emplacement d'un processus tué sans atexit (SIGKILL) est libre après
+    # TTL_MS, plus les unités de temps qu'il avait empruntées d'avance
+    TTL_MS = 120 * 1000
+    RENEW_MS = 30 * 1000
+    QUARANTINE_MS = 5 * 1000
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        # Processus fils (fork): l'emplacement du parent ne lui appartient pas
+        self.slot = None
+        self.instance = None
+        self.token = f"{os.getpid()}:{uuid.uuid4().hex}"
+        self.renew_at = 0
+    
+    def _key(self, slot):
+        return f"ids:worker:{_node}:{slot}"
+    
+    def refresh(self, now_ms):
+        """
+        Renouvelle la réservation (ou réserve un emplacement libre)
+        
+        Returns:
+            Bits (nœud, worker) de ce processus
+        
+        Raises:
+            RuntimeError si les WORKERS emplacements de la machine sont pris
+        """
+        store = local_store.get_local_store()
+        ttl = self.TTL_MS / 1000
+        
+        with self._lock:
+            if now_ms < self.renew_at and self.instance is not None:
+                return self.instance
+            
+            ttl += _ahead_ms(now_ms) / 1000
+            if self.slot is not None and store.get(self._key(self.slot)) == self.token:
+                store.set(self._key(self.slot), self.token, ttl)
+            else:
+                self.slot = next((slot for slot in range(WORKERS) if store.add(self._key(slot), self.token, ttl)), None)
+                if self.slot is None:
+                    raise RuntimeError(f"Aucun emplacement de worker libre ({WORKERS} processus par machine au maximum)")
+            
+            self.instance = (_node << WORKER_BITS) | self.slot
+            self.renew_at = now_ms + self.RENEW_MS
+            return self.instance
+    
+    def release(self):
+        """
+        Libère l'emplacement à la sortie du processus, après une quarantaine
+        qui couvre les unités de temps empruntées d'avance par le processus:
+        le suivant ne peut pas les réutiliser
+        """
+        if self.slot is None:
+            return
+        ahead_ms = _ahead_ms(time.time_ns() // 1_000_000)
+        store = local_store.get_local_store()
+        if store.get(self._key(self.slot)) == self.token:
+            store.set(self._key(self.slot), 'released', (ahead_ms + self.QUARANTINE_MS) / 1000)
+        self.slot = None
+        self.instance = None
+        self.renew_at = 0
+
+_lease = WorkerLease()
+atexit.register(_lease.release)
+os.register_at_fork(after_in_child=_lease.reset)
+
+class IdGenerator:
+    """
+    Générateur d'identifiants d'un format donné (propre au processus,
+    utilisable par plusieurs threads)
+    
+    Args:
+        time_bits: bits du temps écoulé depuis EPOCH, en unités de unit_ms
+        sequence_bits: bits de la séquence (identifiants par unité de temps)
+    """
+    
+    def __init__(self, time_bits, sequence_bits, unit_ms=1):
+        self.unit_ms = unit_ms
+        self.sequence_bits = sequence_bits
+        self.time_shift = sequence_bits + NODE_BITS + WORKER_BITS
+        self.max_time = (1 << time_bits) - 1
+        self._sequence_mask = (1 << sequence_bits) - 1
+        self._lock = threading.Lock()
+        self._last = -1
+        self._sequence = 0
+        _generators.append(self)
+    
+    def next_id(self):
+        now_ms = time.time_ns() // 1_000_000
+        instance = _lease.instance if now_ms < _lease.renew_at else _lease.refresh(now_ms)
+        now = (now_ms - EPOCH_MS) // self.unit_ms
+        
+        with self._lock:
+            if now > self._last:
+                self._last = now
+                self._sequence = 0
+            else:
+                self._sequence = (self._sequence + 1) & self._sequence_mask
+                if self._sequence == 0:
+                    self._last += 1
+            last = self._last
+            sequence = self._sequence
+        
+        if last > self.max_time:
+            raise OverflowError("Capacité de temps des identifiants épuisée")
+        return (last << self.time_shift) | (instance << self.sequence_bits) | sequence
+    
+    def next_ids(self, count):
+        """
+        count identifiants croissants en une seule prise du verrou (lots)
+        
+        Dans une même unité de temps, les identifiants d'un processus sont des
+        entiers consécutifs: le lot est formé d'un range par unité de temps.
+        """
+        now_ms = time.time_ns() // 1_000_000
+        instance = _lease.instance if now_ms < _lease.renew_at else _lease.refresh(now_ms)
+        now = (now_ms - EPOCH_MS) // self.unit_ms
+        per_unit = self._sequence_mask + 1
+        
+        with self._lock:
+            if now > self._last:
+                first_unit, first_sequence = now, 0
+            else:
+                first_unit, first_sequence = divmod(self._last * per_unit + self._sequence + 1, per_unit)
+            self._last, self._sequence = divmod(first_unit * per_unit + first_sequence + count - 1, per_unit)
+            last_unit = self._last
+        
+        if last_unit > self.max_time:
+            raise OverflowError("Capacité de temps des identifiants épuisée")
+        
+        ids = []
+        base = instance << self.sequence_bits
+        sequence = first_sequence
+        for unit in range(first_unit, last_unit + 1):
+            start = (unit << self.time_shift) | base
+            end = start + (self._sequence + 1 if unit == last_unit else per_unit)
+            ids.extend(range(start + sequence, end))
+            sequence = 0
+        return ids
+    
+    def timestamp(self, value):
+        """Date (secondes epoch Unix) à laquelle value a été généré"""
+        return ((value >> self.time_shift) * self.unit_ms + EPOCH_MS) / 1000
+
+# Références de transactions: 63 bits, milliseconde (69 ans), 512 par ms et par processus
+transaction_ids = IdGenerator(time_bits=41, sequence_bits=9)
+
+# Numéros de compte: 56 bits (11 caractères en base 36), seconde (136 ans),
+# 2048 par seconde et par processus
+account_ids = IdGenerator(time_bits=32, sequence_bits=11, unit_ms=1000)
+
+def to_base36(value, width):
+    """Écriture en base 36 (0-9, A-Z) sur width caractères: l'ordre des textes suit celui des nombres"""
+    digits = []
+    for _ in range(width):
+        value, digit = divmod(value, 36)
+        digits.append(BASE36[digit])
+    if value:
+        raise OverflowError(f"{width} caractères en base 36 ne suffisent pas")
+    return ''.join(reversed(digits))
+
+def reference_number():
+    """Référence de transaction: TRX + 16 chiffres hexadécimaux, triable par date"""
+    return f"TRX{transaction_ids.next_id():016X}"
+
+def reference_numbers(count):
+    """count références de transactions (insertions en masse)"""
+    return list(map('TRX%016X'.__mod__, transaction_ids.next_ids(count)))
+
+def account_number():
+    """Numéro de compte de 11 caractères alphanumériques (format des comptes français)"""
+    return to_base36(account_ids.next_id(), 11)
+
+def reserve_worker():
+    """
+    Réserve l'emplacement de worker du processus dès son démarrage
+    (cf. gunicorn.conf.py, post_worker_init)
+    
+    Raises:
+        RuntimeError si les WORKERS emplacements de la machine sont pris
+    """
+    return _lease.refresh(time.time_ns() // 1_000_000)
+
+def init_ids(app):
+    """Fixe le nœud de la machine (ID_NODE, de 0 à 31, distinct par machine)"""
+    global _node
+    node = app.config.get('ID_NODE', 0)
+    if not 0 <= node < (1 << NODE_BITS):
+        raise ValueError(f"ID_NODE doit être compris entre 0 et {(1 << NODE_BITS) - 1}")
+    if node != _node:
+        _node = node
+        _lease.release()
+        _lease.reset()
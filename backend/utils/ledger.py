@@ -0,0 +1,498 @@
+# backend/utils/ledger.py
+#
+# Moteur d'écritures partagé par toutes les routes qui déplacent de l'argent.
+# Chaque appel à post_operations tient en une transaction MySQL et en un
+# nombre fixe d'allers-retours, quel que soit le nombre d'écritures:
+#   1. SELECT ... FOR UPDATE des comptes visés (propriétaire, statut, solde)
+#   2. UPDATE accounts de tous les nouveaux soldes
+#   3. INSERT INTO transactions multi-lignes
+#   4. INSERT ... ON DUPLICATE KEY UPDATE des cumuls mensuels
+#   5. COMMIT
+# (plus une relecture des identifiants des lignes pour un lot de plusieurs
+# écritures, cf. _transaction_ids)
+# Les soldes sont calculés sur des lignes verrouillées: deux requêtes
+# concurrentes sur un même compte sont sérialisées par InnoDB.
+#
+# Les étapes 1 à 4 passent par des instructions préparées (une par nombre
+# de comptes ou de lignes) tant que le lot reste petit, soit le cas de
+# toutes les routes unitaires (dépôt, retrait, paiement, virement).
+from decimal import Decimal
+from functools import lru_cache
+from utils.database import get_db_connection, execute_query, execute_many, execute_prepared
+from utils.security import generate_reference_number
+from utils.cache import peek_account_meta, invalidate_account
+from utils.iban_index import iban_index
+
+CREDIT_TYPES = ('deposit', 'transfer_in', 'interest')
+DEBIT_TYPES = ('withdrawal', 'transfer_out', 'payment', 'fee')
+
+# Types comptés dans les revenus / dépenses mensuels (account_monthly_totals)
+INCOME_TYPES = ('deposit', 'transfer_in')
+EXPENSE_TYPES = ('withdrawal', 'transfer_out', 'payment')
+
+# Premier jour du mois courant, calculé par MySQL comme transaction_date
+CURRENT_PERIOD_SQL = "DATE_SUB(CURDATE(), INTERVAL DAYOFMONTH(CURDATE()) - 1 DAY)"
+
+# Au-delà de ce nombre de comptes ou de lignes, les requêtes d'un lot sont
+# envoyées en texte: une instruction préparée par taille de lot ne serait
+# pas réutilisée
+PREPARED_MAX_ROWS = 4
+
+INSERT_TRANSACTIONS_SQL = """
+    INSERT INTO transactions (account_id, transaction_type, amount, balance_after,
+                            description, recipient_account_id, recipient_iban,
+                            recipient_name, category, status, reference_number)
+    VALUES {rows}
+"""
+TRANSACTION_ROW_SQL = "(%s, %s, %s, %s, %s, %s, %s, %s, %s, 'completed', %s)"
+
+UPSERT_MONTHLY_TOTALS_SQL = f"""
+    INSERT INTO account_monthly_totals (account_id, period, income, expenses, transaction_count)
+    VALUES {{rows}}
+    ON DUPLICATE KEY UPDATE
+        income = income + VALUES(income),
+        expenses = expenses + VALUES(expenses),
+        transaction_count = transaction_count + VALUES(transaction_count)
+"""
+MONTHLY_TOTALS_ROW_SQL = f"(%s, {CURRENT_PERIOD_SQL}, %s, %s, %s)"
+
+class PostingError(Exception):
+    """Écriture refusée; status_code et details servent à construire la réponse HTTP"""
+    status_code = 400
+    
+    def __init__(self, message, **details):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+    
+    def to_dict(self):
+        """Représentation JSON de l'erreur"""
+        return {'error': self.message, **self.details}
+
+class AccountNotFoundError(PostingError):
+    """Compte inexistant, inactif ou n'appartenant pas à l'utilisateur"""
+    status_code = 404
+    
+    def __init__(self, account_id=None, message='Compte non trouvé ou inactif'):
+        super().__init__(message, account_id=account_id)
+
+class OperationAbortedError(PostingError):
+    """Écriture valide annulée parce qu'une autre écriture du même lot a été refusée"""
+    status_code = 409
+    
+    def __init__(self):
+        super().__init__('Écriture annulée: une autre écriture du lot a été refusée')
+
+class InsufficientFundsError(PostingError):
+    """Montant supérieur au solde disponible (solde + découvert autorisé)"""
+    
+    def __init__(self, current_balance, requested_amount, available):
+        super().__init__(
+            'Solde insuffisant',
+            current_balance=current_balance,
+            requested_amount=requested_amount,
+            available=available
+        )
+
+def entry(transaction_type, amount, account_id=None, iban=None, description=None,
+          recipient_iban=None, recipient_name=None, category=None,
+          owned=True, optional=False):
+    """
+    Décrit une ligne d'écriture
+    
+    Args:
+        account_id / iban: compte visé (l'un ou l'autre)
+        owned: le compte doit appartenir à l'utilisateur qui poste
+        optional: ligne ignorée si le compte n'est pas trouvé
+                  (crédit d'un virement vers un IBAN externe)
+    """
+    return {
+        'transaction_type': transaction_type,
+        'amount': amount,
+        'account_id': account_id,
+        'iban': iban,
+        'description': description,
+        'recipient_iban': recipient_iban,
+        'recipient_name': recipient_name,
+        'category': category,
+        'owned': owned,
+        'optional': optional
+    }
+
+def operation(*entries, reference=None):
+    """Regroupe des lignes appliquées ensemble sous une même référence"""
+    return {
+        'reference': reference or generate_reference_number(),
+        'entries': list(entries)
+    }
+
+def deposit_operation(account_id, amount, description):
+    return operation(entry('deposit', amount, account_id=account_id, description=description))
+
+def withdrawal_operation(account_id, amount, description):
+    return operation(entry('withdrawal', amount, account_id=account_id, description=description))
+
+def payment_operation(account_id, amount, merchant, category):
+    return operation(entry('payment', amount, account_id=account_id, description=merchant, category=category))
+
+def transfer_operation(source_account_id, recipient_iban, amount, description, recipient_name):
+    """Virement: débit du compte source, crédit du destinataire s'il est interne"""
+    return operation(
+        entry(
+            'transfer_out', amount,
+            account_id=source_account_id,
+            description=description,
+            recipient_iban=recipient_iban,
+            recipient_name=recipient_name
+        ),
+        entry(
+            'transfer_in', amount,
+            iban=recipient_iban,
+            description=f"Virement reçu - {description}",
+            owned=False,
+            optional=True
+        )
+    )
+
+def post_operations(user_id, operations, atomic=True):
+    """
+    Applique des écritures dans une seule transaction MySQL
+    
+    Args:
+        user_id: utilisateur qui poste (propriétaire des comptes débités)
+        operations: liste construite avec operation() / *_operation()
+        atomic: si True, une seule écriture refusée annule tout le lot;
+                sinon les écritures valides sont enregistrées
+    
+    Returns:
+        Liste alignée sur operations: dict de résultat
+        (transaction_id, reference, new_balance, amount) ou PostingError
+    """
+    # Refus immédiat, sans transaction, des comptes connus du cache comme
+    # inactifs ou appartenant à un autre utilisateur
+    rejected = {}
+    for index, op in enumerate(operations):
+        try:
+            _precheck(user_id, op)
+        except PostingError as e:
+            rejected[index] = e
+    
+    if atomic and rejected:
+        return [rejected.get(index, OperationAbortedError()) for index in range(len(operations))]
+    
+    if len(rejected) == len(operations):
+        return [rejected[index] for index in range(len(operations))]
+    
+    connection = get_db_connection()
+    
+    try:
+        accounts = _lock_accounts([op for index, op in enumerate(operations) if index not in rejected])
+        by_id = {account['id']: account for account in accounts}
+        by_iban = {account['iban']: account for account in accounts}
+        balances = {account['id']: account['balance'] for account in accounts}
+        _refresh_cache(accounts)
+        
+        results = []
+        rows = []
+        
+        for index, op in enumerate(operations):
+            if index in rejected:
+                results.append(rejected[index])
+                continue
+            
+            try:
+                op_rows = _apply(user_id, op, by_id, by_iban, balances)
+            except PostingError as e:
+                results.append(e)
+                continue
+            
+            results.append({
+                'row_index': len(rows),
+                'reference': op['reference'],
+                'new_balance': op_rows[0][3],
+                'amount': op_rows[0][2]
+            })
+            rows.extend(op_rows)
+        
+        failed = any(isinstance(result, PostingError) for result in results)
+        
+        if atomic and failed:
+            connection.rollback()
+            return [
+                result if isinstance(result, PostingError) else OperationAbortedError()
+                for result in results
+            ]
+        
+        if not rows:
+            connection.rollback()
+            return results
+        
+        first_id = _write(balances, rows)
+        _transaction_ids(first_id, results)
+        connection.commit()
+        
+        return results
+        
+    except Exception:
+        connection.rollback()
+        raise
+
+def post_one(user_id, op):
+    """Applique une seule écriture; lève PostingError si elle est refusée"""
+    result = post_operations(user_id, [op])[0]
+    if isinstance(result, PostingError):
+        raise result
+    return result
+
+def post_deposit(user_id, account_id, amount, description):
+    return post_one(user_id, deposit_operation(account_id, amount, description))
+
+def post_withdrawal(user_id, account_id, amount, description):
+    return post_one(user_id, withdrawal_operation(account_id, amount, description))
+
+def post_payment(user_id, account_id, amount, merchant, category):
+    return post_one(user_id, payment_operation(account_id, amount, merchant, category))
+
+def post_transfer(user_id, source_account_id, recipient_iban, amount, description, recipient_name):
+    return post_one(user_id, transfer_operation(source_account_id, recipient_iban, amount, description, recipient_name))
+
+def _precheck(user_id, op):
+    """Valide les comptes débités d'après le cache (la base reste l'autorité)"""
+    for e in op['entries']:
+        if e['account_id'] is None or not e['owned']:
+            continue
+        
+        meta = peek_account_meta(e['account_id'])
+        if meta is not None and (meta['status'] != 'active' or meta['user_id'] != user_id):
+            raise AccountNotFoundError(e['account_id'])
+
+def _refresh_cache(accounts):
+    """Écarte du cache les comptes dont les attributs ont changé en base"""
+    for account in accounts:
+        meta = peek_account_meta(account['id'])
+        if meta is not None and (
+                meta['status'] != account['status']
+                or meta['user_id'] != account['user_id']
+                or meta['overdraft_limit'] != account['overdraft_limit']):
+            invalidate_account(account['id'])
+
+@lru_cache(maxsize=64)
+def _lock_sql(id_count, iban_count):
+    """Texte du verrouillage pour un nombre donné d'ids et d'IBAN (même objet à chaque appel)"""
+    conditions = []
+    if id_count:
+        conditions.append(f"id IN ({', '.join(['%s'] * id_count)})")
+    if iban_count:
+        conditions.append(f"iban IN ({', '.join(['%s'] * iban_count)})")
+    return f"""
+        SELECT id, user_id, balance, overdraft_limit, status, iban
+        FROM accounts
+        WHERE {' OR '.join(conditions)}
+        ORDER BY id
+        FOR UPDATE
+        """
+
+def _lock_query(account_ids, ibans):
+    params = tuple(sorted(account_ids)) + tuple(sorted(ibans))
+    if len(params) <= PREPARED_MAX_ROWS:
+        return execute_prepared(_lock_sql(len(account_ids), len(ibans)), params)
+    return execute_query(_lock_sql(len(account_ids), len(ibans)), params)
+
+def _lock_accounts(operations):
+    """
+    Verrouille en une requête tous les comptes visés, par id ou par IBAN
+    
+    Les IBAN sont d'abord routés par l'index en mémoire (utils/iban_index.py):
+    ceux d'autres banques ne sont pas lus, ceux de l'index sont verrouillés
+    par clé primaire, les autres sont recherchés par IBAN.
+    """
+    account_ids = set()
+    resolved = {}
+    ibans = set()
+    
+    for op in operations:
+        for e in op['entries']:
+            if e['account_id'] is not None:
+                account_ids.add(e['account_id'])
+            elif e['iban']:
+                internal, account_id = iban_index.lookup(e['iban'])
+                if account_id is not None:
+                    resolved[e['iban']] = account_id
+                elif internal:
+                    ibans.add(e['iban'])
+    
+    if not account_ids and not resolved and not ibans:
+        return []
+    
+    accounts = _lock_query(account_ids | set(resolved.values()), ibans)
+    
+    # Identifiant de l'index qui ne correspond pas à l'IBAN (empreinte en
+    # collision): recherche par IBAN, dans la même transaction
+    found = {account['iban'] for account in accounts}
+    unmatched = {iban for iban in resolved if iban not in found}
+    if unmatched:
+        accounts = sorted(accounts + _lock_query((), unmatched), key=lambda account: account['id'])
+    
+    for account in accounts:
+        if account['iban'] in ibans or account['iban'] in unmatched:
+            iban_index.add(account['iban'], account['id'])
+    return accounts
+
+def _apply(user_id, op, by_id, by_iban, balances):
+    """
+    Valide une écriture et calcule ses lignes; balances n'est modifié que
+    si toutes les lignes de l'écriture sont acceptées
+    """
+    pending = {}
+    rows = []
+    reference = op['reference']
+    
+    for e in op['entries']:
+        if e['account_id'] is not None:
+            account = by_id.get(e['account_id'])
+        else:
+            account = by_iban.get(e['iban'])
+        
+        if (account is None or account['status'] != 'active'
+                or (e['owned'] and account['user_id'] != user_id)):
+            if e['optional']:
+                continue
+            raise AccountNotFoundError(e['account_id'])
+        
+        account_id = account['id']
+        amount = e['amount']
+        balance = pending.get(account_id, balances[account_id])
+        
+        if e['transaction_type'] in DEBIT_TYPES:
+            available = balance + account['overdraft_limit']
+            if amount > available:
+                raise InsufficientFundsError(balance, amount, available)
+            balance -= amount
+        else:
+            balance += amount
+        
+        pending[account_id] = balance
+        
+        # Virement vers un compte interne: lien vers le compte crédité
+        recipient = by_iban.get(e['recipient_iban']) if e['recipient_iban'] else None
+        recipient_account_id = recipient['id'] if recipient and recipient['status'] == 'active' else None
+        
+        # reference_number est unique: les lignes suivantes sont suffixées
+        row_reference = reference if not rows else f"{reference}-{len(rows)}"
+        
+        rows.append((
+            account_id,
+            e['transaction_type'],
+            amount,
+            balance,
+            e['description'],
+            recipient_account_id,
+            e['recipient_iban'],
+            e['recipient_name'],
+            e['category'],
+            row_reference
+        ))
+    
+    balances.update(pending)
+    return rows
+
+@lru_cache(maxsize=64)
+def _update_balances_sql(count):
+    cases = ' '.join(['WHEN %s THEN %s'] * count)
+    return f"""
+        UPDATE accounts
+        SET balance = CASE id {cases} END
+        WHERE id IN ({', '.join(['%s'] * count)})
+        """
+
+@lru_cache(maxsize=64)
+def _values_sql(template, row_sql, count):
+    """INSERT de count lignes explicites, pour une instruction préparée"""
+    return template.format(rows=', '.join([row_sql] * count))
+
+def _write(balances, rows):
+    """Enregistre les nouveaux soldes et les lignes; retourne l'id de la première ligne"""
+    changed = sorted({row[0] for row in rows})
+    
+    params = []
+    for account_id in changed:
+        params.extend([account_id, balances[account_id]])
+    params.extend(changed)
+    
+    # Même connexion, donc même transaction que le verrouillage des comptes
+    if len(changed) <= PREPARED_MAX_ROWS:
+        execute_prepared(_update_balances_sql(len(changed)), tuple(params), fetch=False)
+    else:
+        execute_query(_update_balances_sql(len(changed)), tuple(params), fetch=False)
+    
+    if len(rows) <= PREPARED_MAX_ROWS:
+        first_id = execute_prepared(
+            _values_sql(INSERT_TRANSACTIONS_SQL, TRANSACTION_ROW_SQL, len(rows)),
+            tuple(value for row in rows for value in row),
+            return_id=True
+        )
+    else:
+        first_id = execute_many(
+            INSERT_TRANSACTIONS_SQL.format(rows=TRANSACTION_ROW_SQL),
+            rows,
+            commit=False,
+            return_id=True
+        )
+    
+    _update_monthly_totals(rows)
+    
+    return first_id
+
+@lru_cache(maxsize=64)
+def _reference_ids_sql(count):
+    return f"SELECT id, reference_number FROM transactions WHERE reference_number IN ({', '.join(['%s'] * count)})"
+
+def _transaction_ids(first_id, results):
+    """
+    Renseigne transaction_id (id de la première ligne) de chaque écriture
+    enregistrée
+    
+    LAST_INSERT_ID() donne l'id de la première ligne de l'INSERT
+    multi-lignes, mais les suivantes ne sont pas forcément consécutives
+    (innodb_autoinc_lock_mode=2, défaut de MySQL 8): les autres écritures
+    sont relues par leur référence (unique), dans la même transaction.
+    """
+    written = [result for result in results if not isinstance(result, PostingError)]
+    others = [result for result in written if result['row_index'] != 0]
+    
+    ids = {}
+    if others:
+        references = tuple(result['reference'] for result in others)
+        query = _reference_ids_sql(len(references))
+        if len(references) <= PREPARED_MAX_ROWS:
+            rows = execute_prepared(query, references)
+        else:
+            rows = execute_query(query, references)
+        ids = {row['reference_number']: row['id'] for row in rows}
+    
+    for result in written:
+        result['transaction_id'] = first_id if result.pop('row_index') == 0 else ids[result['reference']]
+
+def _update_monthly_totals(rows):
+    """Ajoute les lignes écrites aux cumuls du mois courant (une ligne par compte)"""
+    totals = {}
+    for row in rows:
+        account_id, transaction_type, amount = row[0], row[1], row[2]
+        income, expenses, count = totals.get(account_id, (Decimal('0'), Decimal('0'), 0))
+        
+        if transaction_type in INCOME_TYPES:
+            income += amount
+        elif transaction_type in EXPENSE_TYPES:
+            expenses += amount
+        
+        totals[account_id] = (income, expenses, count + 1)
+    
+    rows = [(account_id,) + totals[account_id] for account_id in sorted(totals)]
+    if len(rows) <= PREPARED_MAX_ROWS:
+        execute_prepared(
+            _values_sql(UPSERT_MONTHLY_TOTALS_SQL, MONTHLY_TOTALS_ROW_SQL, len(rows)),
+            tuple(value for row in rows for value in row),
+            fetch=False
+        )
+    else:
+        execute_many(UPSERT_MONTHLY_TOTALS_SQL.format(rows=MONTHLY_TOTALS_ROW_SQL), rows, commit=False)
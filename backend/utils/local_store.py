@@ -0,0 +1,135 @@
+# backend/utils/local_store.py
+"""
+Magasin clé → valeur à expiration, partagé par tous les processus de la
+machine (workers gunicorn) via un fichier SQLite
+
+Sert aux états courts qui doivent être vus par le worker qui traitera la
+requête suivante, quel qu'il soit: épinglage des lectures sur le serveur
+principal après une écriture (utils/database.py), emplacements des
+générateurs d'identifiants (utils/ids.py), seaux à jetons des limites de
+connexion (utils/rate_limit.py). Les données sont
+jetables: le fichier peut être supprimé à tout moment, y compris au
+redémarrage.
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+class LocalStore:
+    """Clés à durée de vie, une connexion SQLite par thread"""
+    
+    # Nettoyage des clés expirées toutes les PURGE_EVERY écritures (par thread)
+    PURGE_EVERY = 1000
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+    
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Mode autocommit; WAL: les lectures ne bloquent pas les écritures
+            connection = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+            self._local.writes = 0
+        return connection
+    
+    def get(self, key):
+        """Valeur de key, ou None si absente ou expirée"""
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+    
+    def set(self, key, value, ttl):
+        """Enregistre value (texte) pour ttl secondes"""
+        connection = self._connection()
+        connection.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, str(value), time.time() + ttl)
+        )
+        self._local.writes += 1
+        if self._local.writes % self.PURGE_EVERY == 0:
+            self.purge()
+    
+    def add(self, key, value, ttl):
+        """
+        Enregistre value pour ttl secondes seulement si key est absente ou
+        expirée (réservation atomique entre processus)
+        
+        Returns:
+            True si la valeur a été enregistrée
+        """
+        connection = self._connection()
+        now = time.time()
+        connection.execute("DELETE FROM entries WHERE key = ? AND expires <= ?", (key, now))
+        cursor = connection.execute(
+            "INSERT OR IGNORE INTO entries (key, value, expires) VALUES (?, ?, ?)",
+            (key, str(value), now + ttl)
+        )
+        return cursor.rowcount == 1
+    
+    def take(self, key, rate, burst):
+        """
+        Retire un jeton du seau key (burst jetons au plus, rate jetons par
+        seconde), en une instruction atomique entre processus
+        
+        Le seau est enregistré comme l'instant où il sera de nouveau plein
+        (expires): une clé absente ou expirée est un seau plein.
+        
+        Returns:
+            Tuple (accepté, secondes avant le prochain jeton si refusé)
+        """
+        connection = self._connection()
+        now = time.time()
+        interval = 1.0 / rate
+        cursor = connection.execute(
+            "INSERT INTO entries (key, value, expires) VALUES (?, '', ?)"
+            " ON CONFLICT (key) DO UPDATE SET expires = MAX(expires, ?) + ?"
+            " WHERE MAX(expires, ?) + ? - ? <= ?",
+            (key, now + interval, now, interval, now, interval, now, burst * interval)
+        )
+        if cursor.rowcount == 1:
+            return True, 0.0
+        
+        full_at = connection.execute("SELECT expires FROM entries WHERE key = ?", (key,)).fetchone()
+        return False, max(0.0, (full_at[0] if full_at else now) - now - (burst - 1) * interval)
+    
+    def delete(self, key):
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+    
+    def purge(self):
+        """Supprime les clés expirées"""
+        self._connection().execute("DELETE FROM entries WHERE expires <= ?", (time.time(),))
+
+# Magasin de l'application (cf. init_local_store)
+local_store = None
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'banking-local-store.sqlite3')
+
+def init_local_store(app):
+    """Ouvre le magasin partagé (LOCAL_STORE_PATH, dans le répertoire temporaire par défaut)"""
+    global local_store
+    local_store = LocalStore(app.config.get('LOCAL_STORE_PATH') or DEFAULT_PATH)
+    return local_store
+
+def get_local_store():
+    """Magasin de l'application, ou magasin par défaut hors application (scripts)"""
+    global local_store
+    if local_store is None:
+        local_store = LocalStore(os.getenv('LOCAL_STORE_PATH') or DEFAULT_PATH)
+    return local_store
@@ -0,0 +1,279 @@
+# backend/utils/metrics.py
+"""
+Métriques de l'API au format texte Prometheus (GET /api/metrics)
+
+Par route: nombre de requêtes par statut, histogramme des latences, nombre
+de requêtes SQL et temps passé en base par requête HTTP. Par type de
+requête SQL (verbe et table): nombre, erreurs et histogramme des durées.
+Jauges du pool de connexions et du cache des comptes lues au moment du scrape.
+
+Les compteurs sont propres au processus: avec plusieurs workers gunicorn,
+chaque scrape ne voit que le worker qui le reçoit (cf. docs/INSTALLATION.md).
+Coût mesuré: quelques microsecondes par requête SQL et par requête HTTP.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, request, has_app_context, current_app
+from utils.database import add_query_listener, get_pool_stats, get_read_pool_stats
+from utils import cache
+from utils.iban_index import iban_index
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Compteur monotone par combinaison d'étiquettes"""
+    
+    type = 'counter'
+    
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for label_values, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+class Histogram:
+    """Histogramme à seuils fixes (cumulés seulement à l'export)"""
+    
+    type = 'histogram'
+    
+    def __init__(self, name, help, buckets, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, label_values, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # [effectifs par seuil (+Inf en dernier), somme, nombre]
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def samples(self):
+        with self._lock:
+            snapshot = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+        
+        for label_values, (counts, total, count) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = bound if bound == '+Inf' else _format_value(float(bound))
+                yield (f'{self.name}_bucket',
+                       _format_labels(self.labels + ('le',), label_values + (le,)), cumulative)
+            labels = _format_labels(self.labels, label_values)
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+class Gauge:
+    """Jauges lues au moment de l'export par une fonction qui retourne {étiquettes: valeur}"""
+    
+    type = 'gauge'
+    
+    def __init__(self, name, help, read, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.read = read
+    
+    def samples(self):
+        for label_values, value in sorted(self.read().items()):
+            yield self.name, _format_labels(self.labels, label_values), value
+
+class ReadCounter(Gauge):
+    """
+    Compteurs monotones tenus ailleurs (pools de connexions), lus au moment
+    de l'export: exposés en counter pour rate() et increase()
+    """
+    
+    type = 'counter'
+
+http_requests = Counter(
+    'banking_http_requests_total', 'Requêtes HTTP traitées', ('method', 'route', 'status'))
+http_errors = Counter(
+    'banking_http_errors_total', 'Requêtes HTTP terminées par une erreur serveur (5xx)', ('method', 'route'))
+http_duration = Histogram(
+    'banking_http_request_duration_seconds', 'Durée de traitement des requêtes HTTP',
+    LATENCY_BUCKETS, ('method', 'route'))
+request_queries = Histogram(
+    'banking_http_request_db_queries', 'Nombre de requêtes SQL par requête HTTP',
+    QUERY_COUNT_BUCKETS, ('route',))
+request_db_time = Histogram(
+    'banking_http_request_db_seconds', 'Temps cumulé passé en base par requête HTTP',
+    LATENCY_BUCKETS, ('route',))
+db_duration = Histogram(
+    'banking_db_query_duration_seconds', 'Durée des requêtes SQL par verbe et table',
+    QUERY_BUCKETS, ('statement',))
+db_errors = Counter(
+    'banking_db_query_errors_total', 'Requêtes SQL terminées par une erreur', ('statement',))
+
+def _pools():
+    pools = {'primary': get_pool_stats()}
+    read_stats = get_read_pool_stats()
+    if read_stats is not None:
+        pools['read'] = read_stats
+    return pools
+
+def _pool_gauges():
+    return {
+        (pool, key): stats[key]
+        for pool, stats in _pools().items()
+        for key in ('pool_size', 'in_use', 'in_use_max', 'waiting')
+    }
+
+def _pool_counter(key):
+    """Lecture d'un cumul des pools depuis le démarrage, par pool"""
+    def read():
+        return {(pool,): stats[key] for pool, stats in _pools().items() if key in stats}
+    return read
+
+def _cache_gauges():
+    stats = cache.account_cache.stats()
+    return {(key,): value for key, value in stats.items()}
+
+def _iban_index_gauges():
+    return {(key,): value for key, value in iban_index.stats().items()}
+
+METRICS = [
+    http_requests,
+    http_errors,
+    http_duration,
+    request_queries,
+    request_db_time,
+    db_duration,
+    db_errors,
+    Gauge('banking_db_pool', 'État des pools de connexions MySQL du processus', _pool_gauges, ('pool', 'stat')),
+    ReadCounter('banking_db_pool_checkouts_total', 'Connexions empruntées aux pools', _pool_counter('checkouts'), ('pool',)),
+    ReadCounter('banking_db_pool_exhausted_total', "Emprunts abandonnés après le délai d'attente",
+                _pool_counter('exhausted'), ('pool',)),
+    ReadCounter('banking_db_pool_wait_seconds_total', "Temps cumulé d'attente d'une connexion libre",
+                _pool_counter('wait_time_total'), ('pool',)),
+    ReadCounter('banking_db_pool_fallbacks_total', 'Lectures du réplica repliées sur le serveur principal',
+                _pool_counter('fallbacks'), ('pool',)),
+    Gauge('banking_account_cache', 'Cache des attributs de comptes (taille, succès, échecs)', _cache_gauges, ('stat',)),
+    Gauge('banking_iban_index', 'Index des IBAN internes (taille, virements externes, trouvés, absents)',
+          _iban_index_gauges, ('stat',))
+]
+
+# Étiquette (verbe, table) de chaque texte SQL déjà rencontré: les requêtes
+# sont presque toutes des constantes, l'analyse n'est faite qu'une fois
+_STATEMENT_PATTERN = re.compile(
+    r'^\s*(?:(select|delete)\b.*?\bfrom\s+`?(\w+)|(insert|replace)\b.*?\binto\s+`?(\w+)|(update)\s+`?(\w+)|(\w+))',
+    re.IGNORECASE | re.DOTALL
+)
+_statement_labels = {}
+_STATEMENT_LABELS_MAX = 2000
+
+def statement_label(query):
+    """Verbe et table principale d'une requête SQL ("select transactions")"""
+    label = _statement_labels.get(query)
+    if label is None:
+        match = _STATEMENT_PATTERN.match(query)
+        parts = [part.lower() for part in match.groups() if part] if match else ['other']
+        label = ' '.join(parts)
+        # Les listes IN (%s, %s, ...) de longueur variable produisent des
+        # textes distincts: borner le dictionnaire
+        if len(_statement_labels) < _STATEMENT_LABELS_MAX:
+            _statement_labels[query] = label
+    return label
+
+def _record_query(query, params, duration, rowcount, error):
+    label = (statement_label(query),)
+    db_duration.observe(label, duration)
+    if error is not None:
+        db_errors.inc(label)
+    
+    if has_app_context():
+        g.metrics_db_queries = g.get('metrics_db_queries', 0) + 1
+        g.metrics_db_time = g.get('metrics_db_time', 0.0) + duration
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+def _record_request(response):
+    started = g.pop('metrics_started', None)
+    if started is None or request.path == '/api/metrics':
+        return response
+    
+    duration = time.perf_counter() - started
+    route = _route_label()
+    method = request.method
+    
+    http_requests.inc((method, route, str(response.status_code)))
+    http_duration.observe((method, route), duration)
+    if response.status_code >= 500:
+        http_errors.inc((method, route))
+    
+    request_queries.observe((route,), g.get('metrics_db_queries', 0))
+    request_db_time.observe((route,), g.get('metrics_db_time', 0.0))
+    return response
+
+def _record_exception(error):
+    # Exception non gérée: after_request n'a pas été appelé
+    if error is not None and g.get('metrics_started') is not None:
+        route = _route_label()
+        http_requests.inc((request.method, route, '500'))
+        http_errors.inc((request.method, route))
+        http_duration.observe((request.method, route), time.perf_counter() - g.pop('metrics_started'))
+
+def render():
+    """Texte d'exposition Prometheus de toutes les métriques"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        for name, labels, value in metric.samples():
+            lines.append(f'{name}{labels} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+def metrics_endpoint():
+    """Export des métriques; protégé par METRICS_TOKEN s'il est défini"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    
+    return Response(render(), headers={'Content-Type': CONTENT_TYPE, 'Cache-Control': 'no-store'})
+
+def init_metrics(app):
+    """Active la collecte (requêtes HTTP et SQL) et la route GET /api/metrics"""
+    add_query_listener(_record_query)
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.teardown_request(_record_exception)
+    app.add_url_rule('/api/metrics', 'metrics', metrics_endpoint, methods=['GET'])
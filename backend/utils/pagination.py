@@ -0,0 +1,79 @@
+# backend/utils/pagination.py
+import base64
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+def encode_cursor(transaction_date, transaction_id):
+    """Encode la position (date, id) d'une ligne en curseur opaque"""
+    if isinstance(transaction_date, datetime):
+        transaction_date = transaction_date.isoformat()
+    raw = f"{transaction_date}|{transaction_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """
+    Décode un curseur opaque
+    
+    Returns:
+        Tuple (transaction_date, transaction_id)
+    
+    Raises:
+        ValueError si le curseur est invalide
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(cursor + padding).decode('utf-8')
+        date_part, id_part = raw.split('|', 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+def parse_bool(value):
+    """Interprète un paramètre de requête booléen ('1', 'true', 'yes', 'on')"""
+    if value is None:
+        return False
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+def parse_date(value):
+    """
+    Interprète un paramètre de date (AAAA-MM-JJ)
+    
+    Raises:
+        ValueError si la date est invalide
+    """
+    try:
+        return date.fromisoformat(value.strip())
+    except (AttributeError, ValueError):
+        raise ValueError(f"Date invalide: {value} (format attendu AAAA-MM-JJ)")
+
+def parse_list(value, name, allowed=None, max_items=10):
+    """
+    Interprète un paramètre à valeurs multiples séparées par des virgules
+    ("payment,withdrawal"); allowed restreint les valeurs acceptées
+    
+    Raises:
+        ValueError si une valeur est invalide ou si la liste est trop longue
+    """
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    if len(items) > max_items:
+        raise ValueError(f"{name}: {max_items} valeurs au maximum")
+    if allowed is not None:
+        invalid = [item for item in items if item not in allowed]
+        if invalid:
+            raise ValueError(f"{name} invalide: {', '.join(invalid)} (valeurs possibles: {', '.join(allowed)})")
+    return list(dict.fromkeys(items))
+
+def parse_decimal(value, name):
+    """
+    Interprète un montant positif ou nul ("12.50")
+    
+    Raises:
+        ValueError si le montant est invalide
+    """
+    try:
+        amount = Decimal(value.strip())
+    except (AttributeError, InvalidOperation):
+        raise ValueError(f"{name} invalide: {value}")
+    if not amount.is_finite() or amount < 0:
+        raise ValueError(f"{name} invalide: {value}")
+    return amount
@@ -0,0 +1,89 @@
+# backend/utils/rate_limit.py
+"""
+Contrôle d'admission des routes d'authentification (connexion, inscription)
+
+Avant toute requête SQL et tout hachage bcrypt, une requête doit:
+1. obtenir un jeton du seau de son adresse IP, puis de celui de l'email
+   visé (seaux à jetons partagés par les workers de la machine via le
+   magasin local, cf. LocalStore.take), sinon 429 + Retry-After;
+2. réserver une place du pool de hachage du processus (BCRYPT_WORKERS +
+   BCRYPT_MAX_PENDING, cf. password_work_slot), sinon 503 + Retry-After.
+
+Une rafale de tentatives est donc refusée pour quelques dizaines de
+microsecondes chacune, sans occuper de connexion MySQL ni de CPU bcrypt:
+les autres routes gardent leur latence.
+"""
+import sqlite3
+from functools import wraps
+from math import ceil
+from flask import request, jsonify
+from utils.local_store import get_local_store
+from utils.security import password_work_slot, PasswordWorkRejected
+
+# Limites par défaut (tentatives par minute et rafale), cf. init_rate_limit
+_limits = {
+    'ip': (30, 10),
+    'email': (5, 5)
+}
+
+# Nombre de proxys de confiance devant l'application (Apache: 1)
+_proxy_count = 0
+
+def init_rate_limit(app):
+    """Lit les limites (0 tentative par minute = pas de limite) et le nombre de proxys"""
+    global _proxy_count
+    _limits['ip'] = (app.config.get('AUTH_IP_PER_MINUTE', 30), app.config.get('AUTH_IP_BURST', 10))
+    _limits['email'] = (app.config.get('AUTH_EMAIL_PER_MINUTE', 5), app.config.get('AUTH_EMAIL_BURST', 5))
+    _proxy_count = app.config.get('PROXY_COUNT', 0)
+
+def client_ip():
+    """
+    Adresse du client: celle de la connexion, ou celle ajoutée à
+    X-Forwarded-For par le premier des PROXY_COUNT proxys de confiance
+    (les valeurs précédentes peuvent être forgées par le client)
+    """
+    if _proxy_count:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= _proxy_count:
+            return forwarded[-_proxy_count]
+    return request.remote_addr or 'unknown'
+
+def _throttled(scope, value):
+    """Secondes à attendre si le seau (scope, value) est vide, 0 sinon"""
+    per_minute, burst = _limits[scope]
+    if not per_minute or not value:
+        return 0
+    
+    try:
+        accepted, retry_after = get_local_store().take(f"auth:{scope}:{value}", per_minute / 60, burst)
+    except sqlite3.Error as e:
+        # Magasin indisponible: la connexion reste possible, limitée par le pool de hachage
+        print(f"✗ Limite de connexion non appliquée: {e}")
+        return 0
+    return 0 if accepted else max(retry_after, 0.001)
+
+def _rejected(message, status_code, retry_after):
+    response = jsonify({'error': message, 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status_code
+
+def auth_throttled(f):
+    """Décorateur des routes qui vérifient ou hachent un mot de passe"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        data = request.get_json(silent=True)
+        email = data.get('email') if isinstance(data, dict) else None
+        email = email.strip().lower() if isinstance(email, str) else None
+        
+        for scope, value in (('ip', client_ip()), ('email', email)):
+            retry_after = _throttled(scope, value)
+            if retry_after:
+                return _rejected("Trop de tentatives, réessayez plus tard", 429, ceil(retry_after))
+        
+        try:
+            with password_work_slot():
+                return f(*args, **kwargs)
+        except PasswordWorkRejected as e:
+            return _rejected(str(e), 503, 1)
+    
+    return decorated
@@ -1,23 +1,115 @@
 # backend/utils/security.py
 import bcrypt
+import os
 import re
-import random
-import string
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
 from flask_jwt_extended import create_access_token, get_jwt_identity
+from utils import ids
 
-def hash_password(password):
-    """Hash un mot de passe avec bcrypt"""
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+# Coût bcrypt des nouveaux hashs (2^rounds itérations)
+bcrypt_rounds = 12
+
+# Pool dédié au hachage: bcrypt libère le GIL, le nombre de threads borne
+# donc le CPU consommé par les connexions / inscriptions et laisse de la
+# marge aux autres routes. Sans init_security, le hachage reste en ligne.
+_password_executor = None
+_password_slots = None
+
+# Place du pool déjà réservée par la requête du thread (cf. password_work_slot)
+_admitted = threading.local()
+
+# Banque et guichet des comptes ouverts par l'application (cf. generate_iban)
+BANK_CODE = '12345'
+BRANCH_CODE = '67890'
+
+# Conversion des lettres d'un numéro de compte pour la clé RIB
+# (A-I → 1-9, J-R → 1-9, S-Z → 2-9)
+RIB_LETTERS = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', '12345678912345678923456789')
+
+class PasswordWorkRejected(Exception):
+    """File d'attente du hachage pleine: la requête doit être refusée (503)"""
+    pass
+
+def init_security(app):
+    """Configure le coût bcrypt et le pool de hachage depuis la configuration"""
+    global bcrypt_rounds, _password_executor, _password_slots
+    
+    bcrypt_rounds = app.config.get('BCRYPT_ROUNDS', 12)
+    workers = app.config.get('BCRYPT_WORKERS') or max(1, (os.cpu_count() or 2) // 2)
+    max_pending = app.config.get('BCRYPT_MAX_PENDING', 32)
+    
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=False)
+    
+    _password_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+    
+    # Travaux en cours + en attente; au-delà on refuse immédiatement
+    _password_slots = threading.BoundedSemaphore(workers + max_pending)
+
+def _run_password_work(func, *args):
+    """Exécute func dans le pool de hachage (ou en ligne s'il n'est pas configuré)"""
+    if _password_executor is None:
+        return func(*args)
+    
+    if getattr(_admitted, 'active', False):
+        return _password_executor.submit(func, *args).result()
+    
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordWorkRejected("Trop de demandes d'authentification en cours")
+    
+    try:
+        return _password_executor.submit(func, *args).result()
+    finally:
+        _password_slots.release()
+
+@contextmanager
+def password_work_slot():
+    """
+    Réserve une place du pool de hachage pour toute une requête
+    d'authentification, avant sa première requête SQL; les hachages de la
+    requête l'utilisent sans en prendre une autre
+    
+    Raises:
+        PasswordWorkRejected si toutes les places sont prises
+    """
+    if _password_slots is None or getattr(_admitted, 'active', False):
+        yield
+        return
+    
+    if not _password_slots.acquire(blocking=False):
+        raise PasswordWorkRejected("Trop de demandes d'authentification en cours")
+    
+    _admitted.active = True
+    try:
+        yield
+    finally:
+        _admitted.active = False
+        _password_slots.release()
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _checkpw(password, hashed_password):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+def hash_password(password, rounds=None):
+    """Hash un mot de passe avec bcrypt (coût BCRYPT_ROUNDS par défaut)"""
+    return _run_password_work(_hashpw, password, rounds or bcrypt_rounds)
 
 def verify_password(password, hashed_password):
     """Vérifie un mot de passe contre son hash"""
-    return bcrypt.checkpw(
-        password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    return _run_password_work(_checkpw, password, hashed_password)
+
+def password_needs_rehash(hashed_password):
+    """Indique si un hash a été créé avec un coût différent de BCRYPT_ROUNDS"""
+    try:
+        # Format: $2b$<coût>$<sel+hash>
+        return int(hashed_password.split('$')[2]) != bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
 
 def validate_password_strength(password):
     """
@@ -47,23 +139,32 @@ def validate_email(email):
     return re.match(pattern, email) is not None
 
 def generate_account_number():
-    """Génère un numéro de compte bancaire unique à 11 chiffres"""
-    return ''.join(random.choices(string.digits, k=11))
+    """
+    Génère un numéro de compte unique de 11 caractères alphanumériques,
+    sans lecture en base (cf. utils/ids.py)
+    """
+    return ids.account_number()
+
+def rib_key(bank_code, branch_code, account_number):
+    """Clé RIB (2 chiffres) d'un compte français; les lettres du numéro sont converties en chiffres"""
+    account = int(account_number.upper().translate(RIB_LETTERS))
+    return 97 - ((89 * int(bank_code) + 15 * int(branch_code) + 3 * account) % 97)
 
-def generate_iban(country_code='FR', bank_code='12345678', branch_code='90000', account_number=None):
+def generate_iban(country_code='FR', bank_code=BANK_CODE, branch_code=BRANCH_CODE, account_number=None):
     """
-    Génère un IBAN français valide
-    Format: FR76 1234 5678 9000 XXXX XXXX XXX
+    Génère un IBAN français valide (27 caractères), unique si account_number l'est
+    Format: FR76 BBBB BGGG GGCC CCCC CCCC CKK (banque, guichet, compte, clé RIB)
     """
     if not account_number:
         account_number = generate_account_number()
     
-    # Calcul de la clé de contrôle IBAN (simplifié)
-    iban_base = f"{bank_code}{branch_code}{account_number}00"
-    check_digits = 98 - (int(iban_base) % 97)
+    bban = f"{bank_code}{branch_code}{account_number}{rib_key(bank_code, branch_code, account_number):02d}"
+    
+    # Clé de contrôle ISO 13616: BBAN + pays + 00, lettres converties (A = 10 ... Z = 35), modulo 97
+    rearranged = ''.join(str(int(char, 36)) for char in f"{bban}{country_code}00")
+    check_digits = 98 - (int(rearranged) % 97)
     
-    iban = f"{country_code}{check_digits:02d}{bank_code}{branch_code}{account_number}"
-    return iban
+    return f"{country_code}{check_digits:02d}{bban}"
 
 def validate_iban(iban):
     """Valide le format d'un IBAN"""
@@ -79,10 +180,8 @@ def validate_iban(iban):
     return True
 
 def generate_reference_number():
-    """Génère un numéro de référence unique pour les transactions"""
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"TRX{timestamp}{random_part}"
+    """Génère un numéro de référence unique, triable par date, pour les transactions (cf. utils/ids.py)"""
+    return ids.reference_number()
 
 def create_user_token(user_id, additional_claims=None):
     """Crée un token JWT pour un utilisateur"""
@@ -0,0 +1,68 @@
+# backend/utils/serialization.py
+import json
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # encodeur optionnel, repli sur le module json standard
+    orjson = None
+
+def json_default(obj):
+    """
+    Convertit les types renvoyés par le connecteur MySQL qui ne sont pas
+    sérialisables nativement (Decimal -> float, dates -> ISO 8601)
+    """
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode('utf-8')
+    if isinstance(obj, set):
+        return list(obj)
+    raise TypeError(f"Type non sérialisable en JSON: {type(obj).__name__}")
+
+def dumps_bytes(obj, sort_keys=False):
+    """Sérialise directement en octets UTF-8 (sans passer par str avec orjson)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=json_default, option=option)
+    return json.dumps(
+        obj, default=json_default, ensure_ascii=False, sort_keys=sort_keys, separators=(',', ':')
+    ).encode('utf-8')
+
+class BankingJSONProvider(JSONProvider):
+    """
+    Fournisseur JSON de l'application: les lignes de execute_query peuvent
+    être passées telles quelles à jsonify, sans conversion préalable
+    """
+    
+    sort_keys = True
+    mimetype = 'application/json'
+    
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        if orjson is not None and set(kwargs) <= {'sort_keys'}:
+            return dumps_bytes(obj, kwargs['sort_keys']).decode('utf-8')
+        kwargs.setdefault('default', json_default)
+        kwargs.setdefault('ensure_ascii', False)
+        return json.dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj, self.sort_keys), mimetype=self.mimetype)
+
+def init_serialization(app):
+    """Remplace le fournisseur JSON par défaut de Flask"""
+    app.json = BankingJSONProvider(app)
@@ -0,0 +1,167 @@
+# backend/utils/slow_queries.py
+"""
+Journal des requêtes SQL lentes, sans activer le slow log global de MySQL
+
+Toute requête passée par run_query (utils/database.py) qui dépasse
+SLOW_QUERY_MS est écrite, une ligne JSON par requête, dans SLOW_QUERY_LOG
+(fichier à rotation): SQL normalisé, forme des paramètres (types, jamais
+les valeurs), durée, nombre de lignes et route appelante.
+
+Le plan d'exécution (EXPLAIN) de chaque requête lente distincte est relevé
+une seule fois, par un thread dédié sur sa propre connexion: la connexion
+de la requête HTTP, qui peut tenir des verrous ou un résultat non lu,
+n'est jamais utilisée.
+"""
+import json
+import logging
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+import mysql.connector
+from flask import request, has_request_context
+from utils.database import add_query_listener, connection_settings
+
+logger = logging.getLogger('banking.slow_queries')
+
+_threshold = None
+_explain_queue = None
+_explained = set()
+_explained_lock = threading.Lock()
+
+# Nombre maximal de plans relevés par processus et de requêtes en attente
+EXPLAIN_MAX = 1000
+EXPLAIN_QUEUE_SIZE = 100
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_CASE_LIST = re.compile(r'(WHEN %s THEN %s)(?:\s+WHEN %s THEN %s)+', re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+
+def normalize_sql(query):
+    """
+    Texte SQL canonique: espaces réduits, listes IN (%s, %s, ...) et
+    CASE ... WHEN de longueur variable repliées, littéraux remplacés par ?
+    """
+    sql = _SPACES.sub(' ', query).strip()
+    sql = _IN_LIST.sub('(%s, ...)', sql)
+    sql = _CASE_LIST.sub(r'\1 ...', sql)
+    sql = _STRING.sub('?', sql)
+    return _NUMBER.sub('?', sql)
+
+def params_shape(params, many=False):
+    """Types des paramètres, sans leurs valeurs: "(int, str)", "250 × (int, Decimal)" """
+    if params is None:
+        return None
+    if many:
+        rows = list(params)
+        return f"{len(rows)} × {params_shape(rows[0])}" if rows else '0 × ()'
+    if isinstance(params, dict):
+        return '{' + ', '.join(f"{key}: {type(value).__name__}" for key, value in params.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in params) + ')'
+
+def _caller():
+    if not has_request_context():
+        return None
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    return f"{request.method} {rule}"
+
+def _record(query, params, duration, rowcount, error):
+    if duration < _threshold:
+        return
+    
+    sql = normalize_sql(query)
+    # executemany reçoit une liste d'ensembles de paramètres
+    many = isinstance(params, list) and bool(params) and isinstance(params[0], (tuple, list, dict))
+    
+    logger.warning(json.dumps({
+        'time': datetime.now().isoformat(timespec='milliseconds'),
+        'type': 'slow_query',
+        'route': _caller(),
+        'duration_ms': round(duration * 1000, 2),
+        'rows': rowcount,
+        'error': str(error) if error is not None else None,
+        'sql': sql,
+        'params': params_shape(params, many)
+    }, ensure_ascii=False))
+    
+    # EXPLAIN n'a pas de sens pour une insertion multiple; le plan est
+    # relevé avec les paramètres de la première occurrence
+    if many or sql.split(' ', 1)[0].upper() not in ('SELECT', 'UPDATE', 'DELETE'):
+        return
+    
+    with _explained_lock:
+        if sql in _explained or len(_explained) >= EXPLAIN_MAX:
+            return
+        _explained.add(sql)
+    
+    try:
+        _explain_queue.put_nowait((sql, query, params))
+    except queue.Full:
+        with _explained_lock:
+            _explained.discard(sql)
+
+def _explain_worker(connect):
+    """Relève les plans en file sur une connexion dédiée (rouverte après une erreur)"""
+    connection = None
+    while True:
+        sql, query, params = _explain_queue.get()
+        try:
+            if connection is None or not connection.is_connected():
+                connection = connect()
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute(f"EXPLAIN {query}", params or ())
+                plan = cursor.fetchall()
+            finally:
+                cursor.close()
+            logger.warning(json.dumps({
+                'time': datetime.now().isoformat(timespec='milliseconds'),
+                'type': 'explain',
+                'sql': sql,
+                'plan': plan
+            }, ensure_ascii=False, default=str))
+        except mysql.connector.Error as err:
+            connection = None
+            logger.warning(json.dumps({'type': 'explain_error', 'sql': sql, 'error': str(err)}, ensure_ascii=False))
+
+def init_slow_query_log(app):
+    """
+    Active le journal si SLOW_QUERY_MS > 0; SLOW_QUERY_LOG peut contenir
+    {pid} pour un fichier par worker gunicorn (rotation sans concurrence)
+    """
+    global _threshold, _explain_queue
+    
+    threshold_ms = app.config.get('SLOW_QUERY_MS', 0)
+    if threshold_ms <= 0:
+        return
+    
+    path = app.config.get('SLOW_QUERY_LOG', 'logs/slow_queries.log').format(pid=os.getpid())
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=app.config.get('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024),
+        backupCount=app.config.get('SLOW_QUERY_LOG_BACKUPS', 5),
+        encoding='utf-8'
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+    
+    settings = dict(connection_settings(app.config), autocommit=True)
+    _explain_queue = queue.Queue(maxsize=EXPLAIN_QUEUE_SIZE)
+    threading.Thread(
+        target=_explain_worker,
+        args=(lambda: mysql.connector.connect(**settings),),
+        name='slow-query-explain',
+        daemon=True
+    ).start()
+    
+    _threshold = threshold_ms / 1000
+    add_query_listener(_record)
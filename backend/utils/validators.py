@@ -14,6 +14,23 @@ def validate_amount(amount):
     except:
         return False, "Format de montant invalide"
 
+def parse_account_id(value, name='account_id'):
+    """
+    Interprète un identifiant de compte: entier positif, ou texte de
+    chiffres ("12") comme MySQL l'accepterait
+    
+    Raises:
+        ValueError si l'identifiant est invalide (liste, objet, décimal...)
+    """
+    if isinstance(value, str) and value.strip().isdecimal():
+        value = int(value.strip())
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError(f"{name} invalide")
+    return value
+
 def validate_account_type(account_type):
     """Valide le type de compte"""
     valid_types = ['courant', 'epargne', 'joint']
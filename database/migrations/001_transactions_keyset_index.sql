@@ -0,0 +1,11 @@
+-- Migration 001: index composite pour la pagination keyset de l'historique
+-- Utilisation: mysql -u root -p banking_system < migrations/001_transactions_keyset_index.sql
+-- (inutile pour une base créée avec la version actuelle de schema.sql)
+
+USE banking_system;
+
+-- L'index (account_id, transaction_date, id) couvre aussi la clé étrangère account_id,
+-- l'ancien index idx_account_id devient redondant
+ALTER TABLE transactions
+    ADD INDEX idx_account_date_id (account_id, transaction_date, id),
+    DROP INDEX idx_account_id;
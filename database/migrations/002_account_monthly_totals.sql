@@ -0,0 +1,17 @@
+-- Migration 002: cumuls mensuels par compte pour le résumé des comptes
+-- Utilisation: mysql -u root -p banking_system < migrations/002_account_monthly_totals.sql
+-- puis remplir la table depuis l'historique: cd backend && flask --app app rebuild-rollups
+
+USE banking_system;
+
+CREATE TABLE IF NOT EXISTS account_monthly_totals (
+    account_id INT NOT NULL,
+    period DATE NOT NULL,
+    income DECIMAL(15, 2) NOT NULL DEFAULT 0.00,
+    expenses DECIMAL(15, 2) NOT NULL DEFAULT 0.00,
+    transaction_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (account_id, period),
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+    INDEX idx_period (period)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -0,0 +1,19 @@
+-- Migration 003: index des filtres de l'historique (type, catégorie, montant, IBAN, recherche)
+-- Utilisation: mysql -u root -p banking_system < migrations/003_transactions_filter_indexes.sql
+-- (inutile pour une base créée avec la version actuelle de schema.sql)
+
+USE banking_system;
+
+-- L'historique est toujours lu compte par compte: chaque index commence par account_id.
+-- (account_id, colonne, transaction_date, id) sert le filtre et l'ordre de la page;
+-- pas d'index sur status, trop peu sélectif (presque toutes les lignes sont 'completed')
+ALTER TABLE transactions
+    ADD INDEX idx_account_type_date (account_id, transaction_type, transaction_date, id),
+    ADD INDEX idx_account_category_date (account_id, category, transaction_date, id),
+    ADD INDEX idx_account_amount (account_id, amount),
+    ADD INDEX idx_account_iban (account_id, recipient_iban);
+
+-- Recherche sur le bénéficiaire et le libellé (paramètre q);
+-- un index FULLTEXT se crée seul (reconstruction de la table)
+ALTER TABLE transactions
+    ADD FULLTEXT INDEX ft_counterparty (recipient_name, description);
@@ -0,0 +1,19 @@
+-- Migration 004: suivi des crédits d'intérêts mensuels des comptes d'épargne
+-- Utilisation: mysql -u root -p banking_system < migrations/004_interest_runs.sql
+-- (inutile pour une base créée avec la version actuelle de schema.sql)
+
+USE banking_system;
+
+-- Une ligne par tranche d'identifiants de comptes traitée, écrite dans la même
+-- transaction que les crédits: flask --app app accrue-interest reprend après
+-- la dernière tranche validée
+CREATE TABLE IF NOT EXISTS interest_runs (
+    period DATE NOT NULL,
+    first_account_id INT NOT NULL,
+    last_account_id INT NOT NULL,
+    accounts INT NOT NULL,
+    total_interest DECIMAL(15, 2) NOT NULL,
+    duration_ms INT NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, first_account_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -63,13 +63,48 @@ CREATE TABLE IF NOT EXISTS transactions (
     metadata JSON NULL,
     FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
     FOREIGN KEY (recipient_account_id) REFERENCES accounts(id) ON DELETE SET NULL,
-    INDEX idx_account_id (account_id),
+    -- Pagination keyset de l'historique: ORDER BY transaction_date DESC, id DESC par compte
+    INDEX idx_account_date_id (account_id, transaction_date, id),
+    -- Filtres de l'historique (type, catégorie, montant, IBAN du bénéficiaire, recherche)
+    INDEX idx_account_type_date (account_id, transaction_type, transaction_date, id),
+    INDEX idx_account_category_date (account_id, category, transaction_date, id),
+    INDEX idx_account_amount (account_id, amount),
+    INDEX idx_account_iban (account_id, recipient_iban),
+    FULLTEXT INDEX ft_counterparty (recipient_name, description),
     INDEX idx_transaction_date (transaction_date),
     INDEX idx_transaction_type (transaction_type),
     INDEX idx_reference (reference_number),
     CONSTRAINT chk_amount CHECK (amount > 0)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Cumuls mensuels par compte (revenus / dépenses du résumé)
+-- Mis à jour dans la même transaction que chaque écriture (backend/utils/ledger.py),
+-- reconstruits depuis transactions par: flask --app app rebuild-rollups
+CREATE TABLE IF NOT EXISTS account_monthly_totals (
+    account_id INT NOT NULL,
+    period DATE NOT NULL,
+    income DECIMAL(15, 2) NOT NULL DEFAULT 0.00,
+    expenses DECIMAL(15, 2) NOT NULL DEFAULT 0.00,
+    transaction_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (account_id, period),
+    FOREIGN KEY (account_id) REFERENCES accounts(id) ON DELETE CASCADE,
+    INDEX idx_period (period)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Avancement des crédits d'intérêts mensuels (backend/jobs/interest.py):
+-- une ligne par tranche de comptes, écrite dans la transaction des crédits
+CREATE TABLE IF NOT EXISTS interest_runs (
+    period DATE NOT NULL,
+    first_account_id INT NOT NULL,
+    last_account_id INT NOT NULL,
+    accounts INT NOT NULL,
+    total_interest DECIMAL(15, 2) NOT NULL,
+    duration_ms INT NOT NULL,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (period, first_account_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- Table des cartes bancaires
 CREATE TABLE IF NOT EXISTS cards (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -37,3 +37,15 @@ INSERT INTO savings_goals (user_id, goal_name, target_amount, current_amount, ta
 VALUES
 (1, 'Vacances d\'\u00e9té', 5000.00, 3300.00, '2026-07-01'),
 (1, 'Nouvelle voiture', 20000.00, 8500.00, '2027-12-31');
+
+-- Cumuls mensuels correspondant aux transactions de test
+-- (équivalent de: flask --app app rebuild-rollups)
+INSERT INTO account_monthly_totals (account_id, period, income, expenses, transaction_count)
+SELECT account_id,
+       DATE_SUB(DATE(transaction_date), INTERVAL DAYOFMONTH(transaction_date) - 1 DAY) as period,
+       SUM(CASE WHEN transaction_type IN ('deposit', 'transfer_in') THEN amount ELSE 0 END),
+       SUM(CASE WHEN transaction_type IN ('withdrawal', 'transfer_out', 'payment') THEN amount ELSE 0 END),
+       COUNT(*)
+FROM transactions
+WHERE status = 'completed'
+GROUP BY account_id, period;
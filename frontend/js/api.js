@@ -105,6 +105,15 @@ const AccountsAPI = {
     }
 };
 
+// Tableau de bord (profil, comptes, résumé et dernières transactions en une requête)
+const DashboardAPI = {
+    async get(transactionsLimit = 5) {
+        return await apiRequest(`/dashboard/?transactions_limit=${transactionsLimit}`, {
+            method: 'GET'
+        });
+    }
+};
+
 // Gestion des transactions
 const TransactionsAPI = {
     async getAll(page = 1, perPage = 10, accountId = null) {
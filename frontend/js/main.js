@@ -6,10 +6,7 @@ let transactions = [];
 // Initialisation de l'application
 document.addEventListener('DOMContentLoaded', async () => {
     try {
-        await loadUserProfile();
-        await loadAccounts();
-        await loadSummary();
-        await loadTransactions();
+        await loadDashboard();
         setupEventListeners();
     } catch (error) {
         showError('Erreur lors du chargement des données');
@@ -17,29 +14,32 @@ document.addEventListener('DOMContentLoaded', async () => {
     }
 });
 
-// Charger le profil utilisateur
-async function loadUserProfile() {
+// Charger tout le tableau de bord en une seule requête
+async function loadDashboard() {
     try {
-        const { user } = await AuthAPI.getProfile();
-        document.getElementById('userName').textContent = `${user.first_name} ${user.last_name}`;
-    } catch (error) {
-        console.error('Erreur chargement profil:', error);
-    }
-}
-
-// Charger les comptes
-async function loadAccounts() {
-    try {
-        const data = await AccountsAPI.getAll();
+        const data = await DashboardAPI.get(5);
+        
+        displayUserProfile(data.user);
+        
         accounts = data.accounts;
         displayAccounts(accounts);
         populateAccountSelects(accounts);
+        
+        displaySummary(data.summary);
+        
+        transactions = data.transactions;
+        displayTransactions(transactions);
     } catch (error) {
-        console.error('Erreur chargement comptes:', error);
-        showError('Impossible de charger les comptes');
+        console.error('Erreur chargement tableau de bord:', error);
+        showError('Impossible de charger le tableau de bord');
     }
 }
 
+// Afficher le profil utilisateur
+function displayUserProfile(user) {
+    document.getElementById('userName').textContent = `${user.first_name} ${user.last_name}`;
+}
+
 // Afficher les comptes
 function displayAccounts(accounts) {
     const accountsList = document.getElementById('accountsList');
@@ -96,27 +96,11 @@ function populateAccountSelects(accounts) {
     });
 }
 
-// Charger le résumé
-async function loadSummary() {
-    try {
-        const { summary } = await AccountsAPI.getSummary();
-        document.getElementById('totalBalance').textContent = formatCurrency(summary.total_balance);
-        document.getElementById('monthlyIncome').textContent = formatCurrency(summary.monthly_income || 0);
-        document.getElementById('monthlyExpenses').textContent = formatCurrency(summary.monthly_expenses || 0);
-    } catch (error) {
-        console.error('Erreur chargement résumé:', error);
-    }
-}
-
-// Charger les transactions
-async function loadTransactions() {
-    try {
-        const data = await TransactionsAPI.getAll(1, 5);
-        transactions = data.transactions;
-        displayTransactions(transactions);
-    } catch (error) {
-        console.error('Erreur chargement transactions:', error);
-    }
+// Afficher le résumé
+function displaySummary(summary) {
+    document.getElementById('totalBalance').textContent = formatCurrency(summary.total_balance);
+    document.getElementById('monthlyIncome').textContent = formatCurrency(summary.monthly_income || 0);
+    document.getElementById('monthlyExpenses').textContent = formatCurrency(summary.monthly_expenses || 0);
 }
 
 // Afficher les transactions
@@ -289,7 +273,5 @@ async function handlePayment(e) {
 
 // Rafraîchir les données
 async function refreshData() {
-    await loadAccounts();
-    await loadSummary();
-    await loadTransactions();
+    await loadDashboard();
 }
@@ -1,7 +1,13 @@
 #!/bin/bash
 
 # Script de démarrage rapide pour l'application bancaire
-# Usage: ./start.sh
+# Usage: ./start.sh          (serveur de développement Flask)
+#        ./start.sh --prod   (gunicorn, workers multiples, cf. backend/gunicorn.conf.py)
+
+MODE="dev"
+if [ "$1" = "--prod" ]; then
+    MODE="prod"
+fi
 
 echo "🏦 Application Bancaire - Démarrage"
 echo "======================================"
@@ -34,7 +40,11 @@ if [ ! -f "backend/.env" ]; then
 fi
 
 echo ""
-echo "🚀 Démarrage du serveur Flask..."
+if [ "$MODE" = "prod" ]; then
+    echo "🚀 Démarrage du serveur de production (gunicorn)..."
+else
+    echo "🚀 Démarrage du serveur Flask..."
+fi
 echo ""
 echo "API disponible sur: http://localhost:5000"
 echo "Frontend disponible sur: http://localhost:8888/banking-app/frontend/login.html"
@@ -47,4 +57,9 @@ echo "Appuyez sur Ctrl+C pour arrêter le serveur"
 echo ""
 
 cd backend
-python3 app.py
+if [ "$MODE" = "prod" ]; then
+    # Rechargement sans coupure: kill -HUP $(cat backend/gunicorn.pid)
+    exec gunicorn -c gunicorn.conf.py app:app
+else
+    python3 app.py
+fi